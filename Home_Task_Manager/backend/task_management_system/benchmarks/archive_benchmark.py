@@ -0,0 +1,120 @@
+"""
+Task archive benchmark: dashboard and task list latency as completed
+history piles up, with every task in core_task vs old ones archived.
+
+    python benchmarks/archive_benchmark.py
+    python benchmarks/archive_benchmark.py --history 0 50000 250000 --repeat 50
+
+Runs against a throwaway test database. For each --history size a fresh
+synthetic household (tests.synthetic, --active tasks of current work) gets
+that many tasks completed one to three years ago, then the endpoints below
+are timed (median of --repeat requests, cache cleared before each) before
+and after the archive_tasks command moves the old completions out:
+
+  dashboard     GET /api/dashboard/
+  task-list     GET /api/tasks/
+  open-tasks    GET /api/tasks/?completed=false
+  with-archive  GET /api/tasks/?include_archived=true
+
+Archived, each column should stay flat down the table however much
+history the household has.
+"""
+import argparse
+import io
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_management_system.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.cache import cache  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import F  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from core.models import Task  # noqa: E402
+from tests.synthetic import BATCH_SIZE, CHORES, build_household  # noqa: E402
+
+ENDPOINTS = {
+    "dashboard": "/api/dashboard/",
+    "task-list": "/api/tasks/",
+    "open-tasks": "/api/tasks/?completed=false",
+    "with-archive": "/api/tasks/?include_archived=true",
+}
+
+
+def add_history(synthetic, count, seed):
+    """`count` tasks completed one to three years ago, created a day before completion."""
+    rng = random.Random(seed)
+    now = timezone.now()
+    rows = []
+    for i in range(count):
+        done = now - timedelta(days=rng.uniform(365, 3 * 365))
+        rows.append(
+            Task(household=synthetic.household, title=f"{rng.choice(CHORES)} (old) #{i}", due_date=done,
+                 completed=True, completed_at=done, assignee_member=rng.choice(synthetic.members))
+        )
+    Task.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+    Task.objects.filter(household=synthetic.household, title__contains="(old)").update(
+        created_at=F("completed_at") - timedelta(days=1)
+    )
+
+
+def measure(client, repeat):
+    results = {}
+    for name, url in ENDPOINTS.items():
+        latencies = []
+        for _ in range(repeat):
+            cache.clear()
+            started = time.perf_counter()
+            res = client.get(url)
+            latencies.append(time.perf_counter() - started)
+            assert res.status_code == 200, (url, res.status_code)
+        results[name] = statistics.median(latencies) * 1000
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, nargs="+", default=[0, 10000, 50000, 200000])
+    parser.add_argument("--active", type=int, default=500, help="tasks of current work per household")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+    try:
+        print(f"{args.active} active tasks per household, backend: {connection.vendor}, median ms")
+        header = " ".join(f"{name + ' ' + when:>20}" for name in ENDPOINTS for when in ("hot", "archived"))
+        print(f"{'history':>8} {header}")
+        for size in args.history:
+            synthetic = build_household(args.active, seed=args.seed, name=f"History {size}")
+            add_history(synthetic, size, args.seed)
+            client = APIClient()
+            client.force_authenticate(user=synthetic.admin)
+
+            before = measure(client, args.repeat)
+            call_command("archive_tasks", "--household", str(synthetic.household.pk), stdout=io.StringIO())
+            after = measure(client, args.repeat)
+
+            cells = " ".join(f"{before[name]:>20.1f} {after[name]:>20.1f}" for name in ENDPOINTS)
+            print(f"{size:>8} {cells}", flush=True)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
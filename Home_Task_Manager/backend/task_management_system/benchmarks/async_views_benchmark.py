@@ -0,0 +1,183 @@
+"""
+Google login under concurrent load: the DRF view on a thread pool (WSGI)
+vs the async view on one event loop (ASGI), against a slow local stand-in
+for Google.
+
+    python benchmarks/async_views_benchmark.py
+    python benchmarks/async_views_benchmark.py --logins 500 --latency 0.3 --workers 8
+
+Runs against a throwaway test database. Every login verifies its token
+with one HTTP call to a local stub that answers after --latency seconds
+(in production that wait is the certificate fetch and the network), then
+logs a returning user in. The sync view runs on --workers threads, like a
+WSGI server's worker pool; the async view runs --concurrency logins at a
+time on a single thread.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_management_system.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+import httpx  # noqa: E402
+import requests  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection, connections  # noqa: E402
+from django.test import AsyncRequestFactory, RequestFactory  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from core import async_views, views  # noqa: E402
+from core.models import Household, Member  # noqa: E402
+
+User = get_user_model()
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Hundreds of logins connect at once.
+    request_queue_size = 1024
+
+
+class SlowTokenInfo:
+    """Answers GET /tokeninfo?id_token=<email> with that user's claims, after `latency` seconds."""
+
+    def __init__(self, latency):
+        server = self
+        self.latency = latency
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                time.sleep(server.latency)
+                email = parse_qs(urlparse(self.path).query)["id_token"][0]
+                body = json.dumps({"email": email, "given_name": "Bench", "family_name": "User"}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = Server(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/tokeninfo"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def seed(n):
+    household = Household.objects.create(name="Benchmark")
+    users = User.objects.bulk_create(
+        [
+            User(username=f"bench{i}", email=f"bench{i}@example.com", first_name="Bench", last_name="User",
+                 household=household, auth_provider="google")
+            for i in range(n)
+        ]
+    )
+    Member.objects.bulk_create([Member(household=household, user=user, name=user.username) for user in users])
+    return [user.email for user in users]
+
+
+def summary(name, latencies, elapsed):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<22} {elapsed:>7.2f} {len(latencies) / elapsed:>9.1f} "
+          f"{statistics.median(latencies) * 1000:>8.0f} {p95 * 1000:>8.0f}")
+
+
+def run_sync(stub, emails, workers):
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=workers))
+    views.verify_google_id_token = lambda token, audience: session.get(stub.url, params={"id_token": token}).json()
+    view = views.GoogleAuthView.as_view()
+    factory = RequestFactory()
+
+    def login(email):
+        started = time.perf_counter()
+        try:
+            request = factory.post("/api/auth/google/", {"id_token": email}, content_type="application/json")
+            response = view(request)
+            assert response.status_code == 200, response.content
+        finally:
+            connections.close_all()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        latencies = list(pool.map(login, emails))
+    return latencies, time.perf_counter() - started
+
+
+async def run_async(stub, emails, concurrency):
+    factory = AsyncRequestFactory()
+    limit = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=concurrency)) as client:
+
+        async def verify(token, audience):
+            return (await client.get(stub.url, params={"id_token": token})).json()
+
+        async_views.averify_google_id_token = verify
+
+        async def login(email):
+            async with limit:
+                started = time.perf_counter()
+                request = factory.post("/api/auth/google/", json.dumps({"id_token": email}),
+                                       content_type="application/json")
+                response = await async_views.google_auth(request)
+                assert response.status_code == 200, response.content
+                return time.perf_counter() - started
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(login(email) for email in emails))
+        return latencies, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds the stub takes to answer")
+    parser.add_argument("--workers", type=int, default=8, help="threads for the sync view")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 50, 200],
+                        help="logins in flight at once for the async view")
+    args = parser.parse_args()
+
+    settings.GOOGLE_OAUTH_CLIENT_ID = settings.GOOGLE_OAUTH_CLIENT_ID or "benchmark"
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+    stub = SlowTokenInfo(args.latency)
+    try:
+        emails = seed(args.logins)
+
+        print(f"{args.logins} logins, {args.latency * 1000:.0f} ms upstream latency, backend: {connection.vendor}")
+        print(f"{'view':<22} {'total s':>7} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+        summary(f"sync, {args.workers} threads", *run_sync(stub, emails, args.workers))
+        for concurrency in args.concurrency:
+            summary(f"async, {concurrency} in flight", *asyncio.run(run_async(stub, emails, concurrency)))
+    finally:
+        stub.close()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Bulk task endpoint benchmark: one POST /api/tasks/bulk/ vs one request per task.
+
+    python benchmarks/bulk_benchmark.py
+    python benchmarks/bulk_benchmark.py --items 1000
+
+Runs against a throwaway test database. Three workloads at --items tasks
+each: create, complete, and delete. The per-request loop goes through
+TaskViewSet exactly as the frontend does today.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_management_system.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from core.models import Household, Task  # noqa: E402
+
+User = get_user_model()
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def per_request(client, household, n):
+    def create():
+        for i in range(n):
+            client.post("/api/tasks/", {"title": f"Task {i}"}, format="json")
+
+    ids = []
+
+    def complete():
+        ids.extend(Task.objects.filter(household=household).values_list("id", flat=True))
+        for pk in ids:
+            client.patch(f"/api/tasks/{pk}/", {"completed": True}, format="json")
+
+    def delete():
+        for pk in ids:
+            client.delete(f"/api/tasks/{pk}/")
+
+    return timed(create), timed(complete), timed(delete)
+
+
+def bulk(client, household, n):
+    def send(operations):
+        res = client.post("/api/tasks/bulk/", {"operations": operations}, format="json")
+        assert res.status_code == 200, res.content
+
+    ids = []
+
+    def create():
+        send([{"op": "create", "data": {"title": f"Task {i}"}} for i in range(n)])
+
+    def complete():
+        ids.extend(Task.objects.filter(household=household).values_list("id", flat=True))
+        send([{"op": "complete", "id": pk} for pk in ids])
+
+    def delete():
+        send([{"op": "delete", "id": pk} for pk in ids])
+
+    return timed(create), timed(complete), timed(delete)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+    try:
+        household = Household.objects.create(name="Benchmark")
+        user = User.objects.create_user(username="bench", password="pass12345", household=household, role="admin")
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        loop = per_request(client, household, args.items)
+        batch = bulk(client, household, args.items)
+
+        print(f"{args.items} items, backend: {connection.vendor}")
+        print(f"{'operation':<10} {'per-request s':>14} {'bulk s':>8} {'speedup':>8}")
+        for name, slow, fast in zip(("create", "complete", "delete"), loop, batch):
+            print(f"{name:<10} {slow:>14.2f} {fast:>8.2f} {slow / fast:>7.1f}x")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
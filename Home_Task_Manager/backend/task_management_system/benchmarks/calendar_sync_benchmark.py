@@ -0,0 +1,95 @@
+"""
+Outbound Google Calendar sync benchmark against a local fake Calendar API.
+
+    python benchmarks/calendar_sync_benchmark.py
+    python benchmarks/calendar_sync_benchmark.py --tasks 10000 --latency 0.05
+
+Runs against a throwaway test database. --latency adds a delay to every
+HTTP request to stand in for the round trip to Google. For each worker
+count, --tasks pending tasks are pushed (inserts), edited and pushed again
+(patches). The baseline sends one call per request, one at a time, on a
+--baseline-tasks sample.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_management_system.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from core.calendar_sync import CalendarClient, CalendarSyncEngine  # noqa: E402
+from core.models import Household, Task  # noqa: E402
+from tests.fake_calendar import FakeCalendarServer  # noqa: E402
+
+CALENDAR = "bench@group.calendar.google.com"
+
+
+def seed(household, n):
+    Task.objects.filter(household=household).delete()
+    now = timezone.now()
+    Task.objects.bulk_create(
+        [
+            Task(household=household, title=f"Task {i}", due_date=now,
+                 google_calendar_id=CALENDAR, google_sync_status=Task.SYNC_PENDING)
+            for i in range(n)
+        ],
+        batch_size=1000,
+    )
+
+
+def push(server, n, batch_size, workers):
+    engine = CalendarSyncEngine(CalendarClient(server.url, pool_size=workers), batch_size=batch_size, workers=workers)
+    started = time.perf_counter()
+    stats = engine.run()
+    elapsed = time.perf_counter() - started
+    assert stats["synced"] == n, stats
+    return elapsed, stats["batches"]
+
+
+def report(label, n, elapsed, batches):
+    print(f"{label:<28} {elapsed:8.2f}s {n / elapsed:10.0f} tasks/s {batches:8d} requests")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--baseline-tasks", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+    server = FakeCalendarServer(latency=args.latency)
+    try:
+        household = Household.objects.create(name="Bench")
+        print(f"{args.tasks} pending tasks, {args.latency * 1000:.0f}ms per HTTP request\n")
+
+        seed(household, args.baseline_tasks)
+        elapsed, batches = push(server, args.baseline_tasks, batch_size=1, workers=1)
+        report(f"one call per request ({args.baseline_tasks})", args.baseline_tasks, elapsed, batches)
+
+        for workers in args.workers:
+            server.events.clear()
+            seed(household, args.tasks)
+            elapsed, batches = push(server, args.tasks, batch_size=50, workers=workers)
+            report(f"batched, {workers} workers: insert", args.tasks, elapsed, batches)
+
+            Task.objects.filter(household=household).update(title="Edited", google_sync_status=Task.SYNC_PENDING)
+            elapsed, batches = push(server, args.tasks, batch_size=50, workers=workers)
+            report(f"batched, {workers} workers: patch", args.tasks, elapsed, batches)
+    finally:
+        server.close()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
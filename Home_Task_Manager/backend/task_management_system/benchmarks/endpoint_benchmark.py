@@ -0,0 +1,147 @@
+"""
+Latency, query count and serialization time for every route in core.urls,
+on synthetic households of growing size, checked against stored baselines.
+
+    python benchmarks/endpoint_benchmark.py
+    python benchmarks/endpoint_benchmark.py --sizes 10 1000 --only task-list dashboard
+    python benchmarks/endpoint_benchmark.py --update-baseline
+
+    DATABASE_URL=postgres://localhost/home_tasks DATABASE_SSL_REQUIRE=False \\
+        python benchmarks/endpoint_benchmark.py
+
+Runs against a throwaway test database: SQLite by default, or whatever
+DATABASE_URL points at. For each size one household is built with
+tests.synthetic.build_household, then every request in tests.endpoints is
+sent --repeat times (after --warmup untimed calls) through the full
+middleware and JWT authentication stack.
+
+Queries and serialization time (serializer .data plus rendering the
+response to JSON) are measured with core.timing, like the
+REQUEST_TIMING middleware does in production.
+
+Baselines live in benchmarks/baselines/endpoints-<database vendor>.json.
+A run fails (exit status 1) when a request makes more queries than its
+baseline, or when its median latency is more than --tolerance above the
+baseline and at least --min-delta-ms slower. --update-baseline records
+this run as the new baseline instead; latency baselines are only
+meaningful on the machine that recorded them, query counts anywhere.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_management_system.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from core import timing  # noqa: E402
+from tests.endpoints import ENDPOINTS, client_for, send  # noqa: E402
+from tests.synthetic import build_household  # noqa: E402
+
+BASELINES = Path(__file__).resolve().parent / "baselines"
+SIZES = [10, 1000, 10000, 100000]
+
+
+def measure(h, name, repeat, warmup, cold):
+    latencies, queries, serialization = [], [], []
+    for i in range(warmup + repeat):
+        call = ENDPOINTS[name](h)
+        client = client_for(h, call)
+        if cold:
+            cache.clear()
+        with timing.timed() as timings:
+            send(client, call)
+        if i >= warmup:
+            latencies.append(timings.total)
+            queries.append(timings.queries)
+            serialization.append(timings.serialize)
+    latencies.sort()
+    return {
+        "queries": max(queries),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[max(0, int(len(latencies) * 0.95) - 1)] * 1000, 2),
+        "serialize_ms": round(statistics.median(serialization) * 1000, 2),
+    }
+
+
+def regressions(result, baseline, tolerance, min_delta_ms):
+    if baseline is None:
+        return []
+    found = []
+    if result["queries"] > baseline["queries"]:
+        found.append(f"{result['queries']} queries, baseline {baseline['queries']}")
+    slower = result["p50_ms"] - baseline["p50_ms"]
+    if result["p50_ms"] > baseline["p50_ms"] * (1 + tolerance) and slower >= min_delta_ms:
+        found.append(f"p50 {result['p50_ms']:.1f} ms, baseline {baseline['p50_ms']:.1f} ms")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="tasks per household")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="endpoint names (see tests/endpoints.py)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--cold", action="store_true", help="clear the cache before every request")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative p50 slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="ignore p50 slowdowns smaller than this")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--baseline", type=Path, help="baseline file (default: by database vendor)")
+    args = parser.parse_args()
+
+    names = args.only or sorted(ENDPOINTS)
+    unknown = set(names) - ENDPOINTS.keys()
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    timing.instrument()
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+    try:
+        baseline_path = args.baseline or BASELINES / f"endpoints-{connection.vendor}.json"
+        baselines = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        results, failures = {}, []
+
+        print(f"backend: {connection.vendor}, baseline: {baseline_path.name if baselines else 'none'}")
+        print(f"{'tasks':>7} {'endpoint':<28} {'queries':>7} {'p50 ms':>8} {'p95 ms':>8} {'ser ms':>7}")
+        for size in args.sizes:
+            started = time.perf_counter()
+            h = build_household(size, name=f"Benchmark {size}")
+            print(f"{size:>7} built in {time.perf_counter() - started:.1f}s")
+            for name in names:
+                result = measure(h, name, args.repeat, args.warmup, args.cold)
+                results.setdefault(str(size), {})[name] = result
+                found = regressions(result, baselines.get(str(size), {}).get(name), args.tolerance,
+                                    args.min_delta_ms)
+                failures += [f"{name} at {size} tasks: {problem}" for problem in found]
+                print(f"{size:>7} {name:<28} {result['queries']:>7} {result['p50_ms']:>8.1f} "
+                      f"{result['p95_ms']:>8.1f} {result['serialize_ms']:>7.1f}{'  REGRESSED' if found else ''}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    if args.update_baseline:
+        for size, rows in results.items():
+            baselines.setdefault(size, {}).update(rows)
+        baseline_path.parent.mkdir(exist_ok=True)
+        baseline_path.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {baseline_path}")
+    elif failures:
+        print(f"\n{len(failures)} regression(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+Traffic replay against a running server: synthetic users log in through
+/api/token/ and send a weighted mix of everyday requests, --concurrency
+at a time, for --duration seconds.
+
+    python manage.py generate_households --households 100
+    python manage.py runserver --noreload   # or gunicorn/uvicorn
+    python benchmarks/load_test.py --households 1-100 --concurrency 20 --duration 60
+    python benchmarks/load_test.py --mix dashboard=5 complete=5 --output run.json
+
+Users are the household admins made by generate_households
+(hh<household id>-admin0); --users names others. Each virtual user logs in
+once, then loops: pick a request from the mix, send it, wait --think-time
+(exponentially distributed around that mean, 0 for as fast as possible).
+
+The mix (--mix name=weight, defaults below):
+  dashboard       GET /api/dashboard/
+  task-list       GET /api/tasks/?completed=false (its results feed "complete")
+  task-search     GET /api/tasks/?search=<chore word>
+  calendar-month  GET /api/calendar/tasks/ for one of the last 12 months
+  complete        PATCH /api/tasks/<open task>/ {"completed": true}
+  redeem          POST /api/rewards/redeem/ {"points": 1}
+
+The report is JSON on stdout (or --output): overall and per-endpoint
+request counts, throughput, p50/p95/p99/max latency in ms, status codes
+and error rate (transport errors and 4xx/5xx responses), plus the run's
+settings so runs can be compared. A summary table goes to stderr.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import date
+
+import httpx
+
+MIX = {
+    "dashboard": 30,
+    "task-list": 20,
+    "task-search": 10,
+    "calendar-month": 15,
+    "complete": 15,
+    "redeem": 5,
+}
+SEARCH_TERMS = ["laundry", "dishes", "vacuum", "dog", "plants", "bathroom", "groceries", "bins", "windows"]
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of sorted `values`."""
+    if not values:
+        return None
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+
+def month_range(months_back):
+    today = date.today()
+    index = today.year * 12 + today.month - 1 - months_back
+    start = date(index // 12, index % 12 + 1, 1)
+    end = date((index + 1) // 12, (index + 1) % 12 + 1, 1)
+    return f"start={start.isoformat()}&end={end.isoformat()}"
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = 0
+
+    def add(self, seconds, status):
+        self.latencies.append(seconds)
+        self.statuses[str(status)] += 1
+        if not isinstance(status, int) or status >= 400:
+            self.errors += 1
+
+    def report(self, duration):
+        latencies = sorted(self.latencies)
+        ms = lambda value: None if value is None else round(value * 1000, 2)  # noqa: E731
+        count = len(latencies)
+        return {
+            "requests": count,
+            "throughput_rps": round(count / duration, 2) if duration else None,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "p50_ms": ms(percentile(latencies, 0.50)),
+            "p95_ms": ms(percentile(latencies, 0.95)),
+            "p99_ms": ms(percentile(latencies, 0.99)),
+            "max_ms": ms(latencies[-1] if latencies else None),
+            "statuses": dict(sorted(self.statuses.items())),
+        }
+
+
+class VirtualUser:
+    def __init__(self, client, username, password, rng, stats):
+        self.client = client
+        self.username = username
+        self.password = password
+        self.rng = rng
+        self.stats = stats
+        self.access = self.refresh = None
+        self.open_tasks = []
+
+    async def request(self, name, method, path, json=None):
+        """Send one request and record it under `name`; None on transport errors."""
+        for attempt in range(2):
+            started = time.perf_counter()
+            try:
+                response = await self.client.request(
+                    method, path, json=json, headers={"Authorization": f"Bearer {self.access}"}
+                )
+            except httpx.HTTPError as exc:
+                self.stats[name].add(time.perf_counter() - started, type(exc).__name__)
+                return None
+            elapsed = time.perf_counter() - started
+            # Access tokens are short-lived; an expired one isn't the server's fault.
+            if response.status_code == 401 and attempt == 0 and await self.refresh_token():
+                continue
+            self.stats[name].add(elapsed, response.status_code)
+            return response
+
+    async def login(self):
+        started = time.perf_counter()
+        try:
+            response = await self.client.post(
+                "/api/token/", json={"username": self.username, "password": self.password}
+            )
+        except httpx.HTTPError as exc:
+            self.stats["login"].add(time.perf_counter() - started, type(exc).__name__)
+            return False
+        self.stats["login"].add(time.perf_counter() - started, response.status_code)
+        if response.status_code != 200:
+            return False
+        tokens = response.json()
+        self.access, self.refresh = tokens["access"], tokens["refresh"]
+        return True
+
+    async def refresh_token(self):
+        try:
+            response = await self.client.post("/api/token/refresh/", json={"refresh": self.refresh})
+        except httpx.HTTPError:
+            return False
+        if response.status_code != 200:
+            return await self.login()
+        tokens = response.json()
+        self.access = tokens["access"]
+        self.refresh = tokens.get("refresh", self.refresh)
+        return True
+
+    async def task_list(self):
+        response = await self.request("task-list", "GET", "/api/tasks/?completed=false")
+        if response is not None and response.status_code == 200:
+            self.open_tasks = [task["id"] for task in response.json()["results"]]
+
+    async def complete(self):
+        if not self.open_tasks:
+            await self.task_list()
+        if self.open_tasks:
+            pk = self.open_tasks.pop(self.rng.randrange(len(self.open_tasks)))
+            await self.request("complete", "PATCH", f"/api/tasks/{pk}/", {"completed": True})
+
+    async def send(self, name):
+        if name == "dashboard":
+            await self.request(name, "GET", "/api/dashboard/")
+        elif name == "task-list":
+            await self.task_list()
+        elif name == "task-search":
+            await self.request(name, "GET", f"/api/tasks/?search={self.rng.choice(SEARCH_TERMS)}")
+        elif name == "calendar-month":
+            await self.request(name, "GET", f"/api/calendar/tasks/?{month_range(self.rng.randrange(12))}")
+        elif name == "complete":
+            await self.complete()
+        elif name == "redeem":
+            await self.request(name, "POST", "/api/rewards/redeem/", {"points": 1})
+
+    async def run(self, mix, deadline, think_time):
+        names, weights = list(mix), list(mix.values())
+        while time.perf_counter() < deadline:
+            await self.send(self.rng.choices(names, weights)[0])
+            if think_time:
+                await asyncio.sleep(min(self.rng.expovariate(1 / think_time), max(0, deadline - time.perf_counter())))
+
+
+async def load_test(args, usernames, mix):
+    # "complete" may list tasks even when task-list isn't in the mix.
+    stats = defaultdict(Stats, {name: Stats() for name in ["login", *mix]})
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        users = [
+            VirtualUser(client, usernames[i % len(usernames)], args.password, random.Random(rng.random()), stats)
+            for i in range(args.concurrency)
+        ]
+        logged_in = await asyncio.gather(*(user.login() for user in users))
+        users = [user for user, ok in zip(users, logged_in) if ok]
+        if not users:
+            raise SystemExit(f"no user could log in: {dict(stats['login'].statuses)}")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user.run(mix, started + args.duration, args.think_time) for user in users))
+        duration = time.perf_counter() - started
+
+    login = stats.pop("login")
+    total = Stats()
+    for endpoint in stats.values():
+        total.latencies += endpoint.latencies
+        total.statuses.update(endpoint.statuses)
+        total.errors += endpoint.errors
+    return {
+        "settings": {
+            "url": args.url,
+            "concurrency": args.concurrency,
+            "users": len(usernames),
+            "logged_in": len(users),
+            "duration_s": args.duration,
+            "think_time_s": args.think_time,
+            "mix": mix,
+            "seed": args.seed,
+        },
+        "duration_s": round(duration, 2),
+        "total": total.report(duration),
+        "login": login.report(None),
+        "endpoints": {name: endpoint.report(duration) for name, endpoint in stats.items()},
+    }
+
+
+def print_summary(report, file):
+    print(f"{'endpoint':<16} {'requests':>8} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}",
+          file=file)
+    rows = [*report["endpoints"].items(), ("total", report["total"])]
+    for name, row in rows:
+        cells = [f"{row[key]:>8.1f}" if row[key] is not None else f"{'-':>8}"
+                 for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")]
+        print(f"{name:<16} {row['requests']:>8} {' '.join(cells)} {row['error_rate']:>7.1%}", file=file)
+
+
+def parse_households(value):
+    first, _, last = value.partition("-")
+    return [f"hh{pk}-admin0" for pk in range(int(first), int(last or first) + 1)]
+
+
+def parse_mix(items, parser):
+    mix = dict(MIX)
+    if items:
+        mix = dict.fromkeys(MIX, 0)
+        for item in items:
+            name, _, weight = item.partition("=")
+            if name not in MIX or not weight.isdigit():
+                parser.error(f"--mix expects name=weight with a name from {', '.join(MIX)}, got {item!r}")
+            mix[name] = int(weight)
+    mix = {name: weight for name, weight in mix.items() if weight}
+    if not mix:
+        parser.error("--mix needs at least one positive weight")
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="server to load")
+    parser.add_argument("--households", type=parse_households, default=parse_households("1-100"),
+                        metavar="FIRST-LAST", help="log in as hh<id>-admin0 for these household ids")
+    parser.add_argument("--users", nargs="+", metavar="USERNAME", help="log in as these users instead")
+    parser.add_argument("--password", default="pass12345")
+    parser.add_argument("--concurrency", type=int, default=10, help="virtual users sending requests at once")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean seconds between a user's requests")
+    parser.add_argument("--mix", nargs="+", metavar="NAME=WEIGHT", help="replace the default mix")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix, parser)
+    report = asyncio.run(load_test(args, args.users or args.households, mix))
+
+    print_summary(report, sys.stderr)
+    text = json.dumps(report, indent=2) + "\n"
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    main()
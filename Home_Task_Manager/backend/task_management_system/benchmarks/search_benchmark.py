@@ -0,0 +1,95 @@
+"""
+Task search benchmark: full-text backend (core.search) vs the old icontains scan.
+
+    python benchmarks/search_benchmark.py
+    python benchmarks/search_benchmark.py --sizes 10000 100000 1000000 --repeat 20
+
+Runs against a throwaway test database created from the configured one
+(in-memory SQLite locally, test_<name> on Postgres when DATABASE_URL is
+set). All tasks live in one household, the worst case for a household-
+scoped query. Times are the median of --repeat runs of a first page
+(50 rows, best match first).
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_management_system.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+
+from core.models import Household, Task  # noqa: E402
+from core.search import get_search_backend, IContainsSearch  # noqa: E402
+
+WORDS = (
+    "wash dishes laundry vacuum lounge hallway kitchen bathroom mop floor walk dog feed cat "
+    "water plants mow lawn rake leaves clean oven fridge windows car garage bins recycling "
+    "shopping groceries homework tidy bedroom dust shelves iron shirts change sheets pay bills"
+).split()
+
+QUERIES = ["dish", "vacuum hall", "walk dog", "groceries", "zzz-no-match"]
+
+
+def add_tasks(household, count, rng, batch_size=5000):
+    for start in range(0, count, batch_size):
+        Task.objects.bulk_create(
+            [
+                Task(
+                    household=household,
+                    title=" ".join(rng.choices(WORDS, k=3)),
+                    description=" ".join(rng.choices(WORDS, k=12)),
+                )
+                for _ in range(min(batch_size, count - start))
+            ]
+        )
+
+
+def time_query(backend, qs, query, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        list(backend.search(qs, query).order_by("search_rank", "-created_at", "-id")[:50])
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+    try:
+        rng = random.Random(args.seed)
+        household = Household.objects.create(name="Benchmark")
+        qs = Task.objects.filter(household=household)
+        fts, icontains = get_search_backend(), IContainsSearch()
+
+        print(f"backend: {connection.vendor} / {type(fts).__name__}")
+        print(f"{'tasks':>10}  {'query':<14} {'icontains ms':>13} {'fulltext ms':>12} {'speedup':>8}")
+
+        total = 0
+        for size in sorted(args.sizes):
+            add_tasks(household, size - total, rng)
+            total = size
+            for query in QUERIES:
+                slow = time_query(icontains, qs, query, args.repeat)
+                fast = time_query(fts, qs, query, args.repeat)
+                print(f"{size:>10}  {query:<14} {slow:>13.2f} {fast:>12.2f} {slow / fast:>7.1f}x")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Hot / cold storage for tasks.
+
+core_task only has to hold active work: tasks completed more than
+TASK_ARCHIVE_AFTER_DAYS ago are moved, row for row and keeping their ids,
+to ArchivedTask (core_archivedtask) by the archive_tasks command. The
+household-scoped indexes, the dashboard queries and the task list then
+cost the same however much history a household has.
+
+A household is archived in batches, each one transaction: copy the rows
+with INSERT ... SELECT, point their ledger entries at the archived row and
+delete them from core_task. A batch either happens completely or not at
+all, so an interrupted run is resumed simply by running again.
+
+Points stay as they were: balances are sums of the ledger, whose entries
+only swap PointsLedgerEntry.task for archived_task, and the rows are
+raw-deleted so the completion rollups (core.rollups) keep counting them.
+Archived tasks leave the set delta sync serves, so each batch records a
+delete tombstone for them (core.changes) and sync clients drop them as
+they would a deleted task; they stay retrievable from the task API.
+Archived occurrences still count as stored (recurrence.stored_occurrences).
+Tasks still waiting to be pushed to Google Calendar stay until they are.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import changes
+from .cache import bump_household_version
+from .models import ArchivedTask, PointsLedgerEntry, Task
+
+# ArchivedTask mirrors every Task column; archived_at is its only own one.
+COLUMNS = [field.column for field in ArchivedTask._meta.concrete_fields if field.name != "archived_at"]
+
+
+def cutoff(days=None):
+    """Tasks completed before this are archived."""
+    if days is None:
+        days = settings.TASK_ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def archivable(household_id, before):
+    # Served by core_task_hh_completed_at_idx (household, completed_at) WHERE completed
+    return Task.objects.filter(household_id=household_id, completed=True, completed_at__lt=before, repeat="").exclude(
+        google_sync_status__in=[Task.SYNC_PENDING, Task.SYNC_SYNCING]
+    )
+
+
+def _copy(ids, now):
+    qn = connection.ops.quote_name
+    columns = ", ".join(qn(column) for column in COLUMNS)
+    placeholders = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {qn(ArchivedTask._meta.db_table)} ({columns}, {qn('archived_at')}) "
+            f"SELECT {columns}, %s FROM {qn(Task._meta.db_table)} WHERE {qn('id')} IN ({placeholders})",
+            [ArchivedTask._meta.get_field("archived_at").get_db_prep_save(now, connection), *ids],
+        )
+
+
+def archive_batch(household_id, before, batch_size):
+    """Move up to batch_size of the household's archivable tasks. Returns how many moved."""
+    with transaction.atomic():
+        ids = list(
+            archivable(household_id, before).select_for_update().order_by("completed_at")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+        _copy(ids, timezone.now())
+        PointsLedgerEntry.objects.filter(task_id__in=ids).update(archived_task_id=F("task_id"), task=None)
+        # The rows live on in the archive: no delete signals, so no uncounting.
+        # Nothing else references them: series aren't archived.
+        Task.objects.filter(pk__in=ids)._raw_delete(connection.alias)
+        changes.record(household_id, changes.KINDS[Task], ids, changes.DELETED)
+    bump_household_version(household_id)
+    return len(ids)
+
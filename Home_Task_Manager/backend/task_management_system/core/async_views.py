@@ -0,0 +1,159 @@
+"""
+Async versions of the views that spend their time waiting on I/O, for
+ASGI deployments (settings.ASYNC_VIEWS; see core.urls). Under ASGI a
+request waiting here costs a coroutine, not a worker thread.
+
+  google_auth             POST /api/auth/google/     (GoogleAuthView)
+  household_invite_create POST /api/household/invites/ (HouseholdInviteCreateView)
+  password_reset_request  POST /api/password-reset/  (PasswordResetRequestView)
+
+Request handling and responses match the DRF views they stand in for, and
+the shared steps live in core.views. Reads use the async ORM. Django's
+async ORM has no transactions, so writes that must commit together (a new
+Google user with their household, an invite with its queued email) run as
+one sync_to_async call.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import status
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated, ParseError
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from users.authentication import authenticate_request
+
+from .google_auth import averify_google_id_token
+from .models import Member
+from .serializers import HouseholdInviteCreateSerializer
+from .utils import asend_password_reset_email
+from .views import (
+    PASSWORD_RESET_SENT,
+    create_invite,
+    google_login_needs_update,
+    google_login_profile,
+    google_login_user,
+    login_tokens,
+)
+
+User = get_user_model()
+
+
+def async_api_view(view):
+    """
+    Responds in JSON like an APIView: DRF exceptions raised by `view`
+    become the same error responses DRF would send. Authentication is by
+    JWT only, so there is no CSRF check.
+    """
+    @csrf_exempt
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            return await view(request, *args, **kwargs)
+        except APIException as exc:
+            detail = exc.detail if isinstance(exc.detail, (dict, list)) else {"detail": exc.detail}
+            return JsonResponse(detail, status=exc.status_code, safe=False)
+    return wrapper
+
+
+def request_data(request):
+    """
+    The body parsed by the same parsers as the DRF views (JSON, form or
+    multipart); raises ParseError / UnsupportedMediaType as they would.
+    """
+    parsers = [parser() for parser in api_settings.DEFAULT_PARSER_CLASSES]
+    data = Request(request, parsers=parsers).data
+    if not isinstance(data, dict):
+        raise ParseError("Expected a JSON object.")
+    return data
+
+
+async def authenticate(request, allow_query_token=False):
+    """(user, validated token) for the request's JWT; raises a 401 otherwise."""
+    try:
+        authenticated = await sync_to_async(authenticate_request)(request, allow_query_token)
+    except InvalidToken as exc:
+        raise AuthenticationFailed(exc.detail.get("detail", "Given token not valid for any token type"))
+    if authenticated is None:
+        raise NotAuthenticated()
+    return authenticated
+
+
+@require_POST
+@async_api_view
+async def google_auth(request):
+    token = request_data(request).get("id_token")
+    if not token:
+        return JsonResponse({"detail": "id_token required"}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not getattr(settings, "GOOGLE_OAUTH_CLIENT_ID", ""):
+        return JsonResponse(
+            {"detail": "GOOGLE_OAUTH_CLIENT_ID not configured"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+    try:
+        idinfo = await averify_google_id_token(token, settings.GOOGLE_OAUTH_CLIENT_ID)
+    except Exception:
+        return JsonResponse({"detail": "Invalid Google token"}, status=status.HTTP_400_BAD_REQUEST)
+
+    email, given_name, family_name, full_name = google_login_profile(idinfo)
+
+    # Returning users are usually fully set up: two reads, no writes.
+    user = await User.objects.filter(email__iexact=email).afirst()
+    if (
+        user is None
+        or google_login_needs_update(user, given_name, family_name)
+        or not await Member.objects.filter(household_id=user.household_id, user=user).aexists()
+    ):
+        user = await sync_to_async(google_login_user)(email, given_name, family_name, full_name)
+
+    return JsonResponse(login_tokens(user))
+
+
+@require_POST
+@async_api_view
+async def household_invite_create(request):
+    user, _ = await authenticate(request)
+    # v1: only admin can invite
+    if getattr(user, "role", "adult") != "admin":
+        return JsonResponse({"detail": "Not allowed."}, status=status.HTTP_403_FORBIDDEN)
+
+    serializer = HouseholdInviteCreateSerializer(data=request_data(request))
+    serializer.is_valid(raise_exception=True)
+
+    invite_link = await sync_to_async(create_invite)(
+        user.household_id,
+        serializer.validated_data["email"],
+        serializer.validated_data["role"],
+    )
+    return JsonResponse(
+        {
+            "detail": "Invite created.",
+            "invite_link": invite_link,
+            "email_queued": True,
+            # Old keys, as in HouseholdInviteCreateView.
+            "email_sent": True,
+            "email_error": None,
+        },
+        status=status.HTTP_201_CREATED,
+    )
+
+
+@require_POST
+@async_api_view
+async def password_reset_request(request):
+    email = str(request_data(request).get("email", "")).strip()
+
+    if email:
+        # Do NOT reveal existence of emails
+        user = await User.objects.filter(email__iexact=email).afirst()
+        if user is not None:
+            await asend_password_reset_email(user)
+
+    return JsonResponse({"detail": PASSWORD_RESET_SENT})
@@ -0,0 +1,271 @@
+"""
+Bulk task operations.
+
+A batch is a list of operations:
+  {"op": "create", "data": {...task fields...}}
+  {"op": "update", "id": 12, "data": {...partial task fields...}}
+  {"op": "complete", "id": 12}                    # "completed": false to un-complete
+  {"op": "delete", "id": 12}
+
+The household's categories, members, pets and the targeted tasks are loaded
+once up front; every operation is validated against those. If any operation
+is invalid nothing is written and the per-item errors are returned.
+Otherwise the batch is applied in one transaction with bulk_create,
+grouped updates / bulk_update and a single delete. Points follow the same rules as
+TaskViewSet.perform_update: one ledger entry per completion change actually
+made (claimed under a row lock), applied to the user's balance as one
+UPDATE (see core.points).
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from . import changes, points, recurrence, rollups
+from .cache import bump_household_version
+from .models import Task, Category, Member, Pet
+from .serializers import TaskSerializer
+
+MAX_OPERATIONS = 1000
+MAX_GROUPED_UPDATES = 10
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Resolves ids from a dict preloaded into the serializer context."""
+
+    def __init__(self, preloaded_key, **kwargs):
+        self.preloaded_key = preloaded_key
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        obj = self.context["preloaded"][self.preloaded_key].get(pk)
+        if obj is None:
+            self.fail("does_not_exist", pk_value=data)
+        return obj
+
+
+class BulkTaskSerializer(TaskSerializer):
+    """TaskSerializer whose relations are checked against preloaded objects."""
+
+    category = PreloadedPrimaryKeyRelatedField(
+        "categories", queryset=Category.objects.none(), required=False, allow_null=True
+    )
+    assignee_member = PreloadedPrimaryKeyRelatedField(
+        "members", queryset=Member.objects.none(), required=False, allow_null=True
+    )
+    assignee_pet = PreloadedPrimaryKeyRelatedField(
+        "pets", queryset=Pet.objects.none(), required=False, allow_null=True
+    )
+
+    def __init__(self, *args, **kwargs):
+        # Skip TaskSerializer.__init__: its household querysets aren't used here.
+        serializers.ModelSerializer.__init__(self, *args, **kwargs)
+
+
+class BulkOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=["create", "update", "complete", "delete"])
+    id = serializers.IntegerField(required=False)
+    data = serializers.DictField(required=False, default=dict)
+    completed = serializers.BooleanField(required=False, default=True)
+
+    def validate(self, attrs):
+        if attrs["op"] != "create" and "id" not in attrs:
+            raise serializers.ValidationError({"id": "This field is required."})
+        return attrs
+
+
+class BulkTaskOperations:
+    def __init__(self, request):
+        self.request = request
+        self.user = request.user
+        self.household_id = request.user.household_id
+
+    def preload(self, operations):
+        hh = self.household_id
+        task_ids = {op["id"] for op in operations if "id" in op}
+        return {
+            "categories": {c.pk: c for c in Category.objects.filter(household_id=hh)},
+            "members": {m.pk: m for m in Member.objects.filter(household_id=hh)},
+            "pets": {p.pk: p for p in Pet.objects.filter(household_id=hh)},
+            "tasks": {t.pk: t for t in Task.objects.filter(household_id=hh, pk__in=task_ids)},
+        }
+
+    def write_changes(self, tasks, fields):
+        """
+        Each task is written with only the fields its own operations changed
+        (`fields`: task id -> field names), so a concurrent edit to any other
+        field isn't overwritten with the preloaded value.
+
+        Typical batches (complete 200 chores, reassign a list) set the same
+        values on every task. Those are written as one UPDATE ... WHERE id IN
+        per distinct set of values; anything more varied goes through
+        bulk_update's CASE statements, one call per set of fields.
+        """
+        by_fields = defaultdict(list)
+        for task in tasks:
+            by_fields[frozenset(fields[task.pk])].append(task)
+
+        groups = defaultdict(list)
+        for names, same_fields in by_fields.items():
+            attnames = tuple(sorted(Task._meta.get_field(name).attname for name in names))
+            for task in same_fields:
+                groups[attnames, tuple(getattr(task, attname) for attname in attnames)].append(task.pk)
+
+        if len(groups) > MAX_GROUPED_UPDATES:
+            for names, same_fields in by_fields.items():
+                Task.objects.bulk_update(same_fields, sorted(names))
+            return
+        for (attnames, values), pks in groups.items():
+            Task.objects.filter(pk__in=pks).update(**dict(zip(attnames, values)))
+
+    @staticmethod
+    def claim_completions(changed, sets_completion):
+        """
+        The preload isn't locked, so a task may have been (un)completed by
+        another request since. Lock the changed rows and re-read their
+        completion, as TaskViewSet.perform_update claims its toggle: a task
+        is flipped, and earns or loses points, only if its stored state
+        differs from the one the batch sets. Tasks the batch doesn't
+        (un)complete keep the stored state, and tasks that are gone are
+        dropped. Returns the flipped tasks.
+        """
+        stored = {
+            task.pk: task
+            for task in Task.objects.select_for_update().filter(pk__in=list(changed)).only(*rollups.STATE_FIELDS)
+        }
+        flipped = []
+        for pk, task in list(changed.items()):
+            current = stored.get(pk)
+            if current is None:
+                del changed[pk]
+                continue
+            # Count the rollups from the stored state too (see core.rollups).
+            rollups.remember_stored(task, current)
+            if pk in sets_completion and task.completed != current.completed:
+                flipped.append(task)
+            else:
+                task.completed, task.completed_at = current.completed, current.completed_at
+        return flipped
+
+    @staticmethod
+    def validate_item(serializer, data, instance=None):
+        serializer.instance = instance
+        try:
+            return serializer.run_validation(data), None
+        except serializers.ValidationError as exc:
+            return None, serializers.as_serializer_error(exc)
+
+    def run(self, raw_operations):
+        """
+        Returns (result, errors). When errors is non-empty nothing was written.
+        """
+        operations, errors = [], []
+        envelope = BulkOperationSerializer()
+        for index, raw in enumerate(raw_operations):
+            validated, item_errors = self.validate_item(envelope, raw)
+            if item_errors:
+                errors.append({"index": index, "errors": item_errors})
+            else:
+                operations.append(validated)
+        if errors:
+            return None, errors
+
+        preloaded = self.preload(operations)
+        tasks = preloaded["tasks"]
+        context = {"request": self.request, "preloaded": preloaded}
+
+        # One serializer per mode, reused for every item (as ListSerializer
+        # does with its child): building ModelSerializer fields is the
+        # expensive part of validation.
+        creator = BulkTaskSerializer(context=context)
+        updater = BulkTaskSerializer(partial=True, context=context)
+
+        to_create, changed, deleted = [], {}, set()
+        changed_fields, sets_completion = defaultdict(set), set()
+        for index, op in enumerate(operations):
+            kind = op["op"]
+
+            if kind == "create":
+                validated, item_errors = self.validate_item(creator, op["data"])
+                if item_errors:
+                    errors.append({"index": index, "errors": item_errors})
+                    continue
+                to_create.append(Task(household_id=self.household_id, **validated))
+                continue
+
+            task = tasks.get(op["id"])
+            if task is None or task.pk in deleted:
+                errors.append({"index": index, "errors": {"id": "Task not found."}})
+                continue
+
+            if kind == "delete":
+                deleted.add(task.pk)
+                changed.pop(task.pk, None)
+                continue
+
+            data = op["data"] if kind == "update" else {"completed": op["completed"]}
+            validated, item_errors = self.validate_item(updater, data, instance=task)
+            if item_errors:
+                errors.append({"index": index, "errors": item_errors})
+                continue
+            for field, value in validated.items():
+                setattr(task, field, value)
+                changed_fields[task.pk].add(field)
+            if "completed" in validated:
+                sets_completion.add(task.pk)
+            changed[task.pk] = task
+
+        if errors:
+            return None, errors
+
+        now = timezone.now()
+        points_delta = 0
+        with transaction.atomic(), changes.collect():
+            ledger = []
+            for task in self.claim_completions(changed, sets_completion):
+                ledger.append(points.completion_entry(self.user, task, task.completed))
+                if task.completed and task.completed_at is None:
+                    task.completed_at = now
+                    changed_fields[task.pk].add("completed_at")
+            for task in changed.values():
+                # bulk_update bypasses save(), so auto_now and the calendar
+                # sync flag (core.signals) must be applied by hand
+                task.updated_at = now
+                changed_fields[task.pk].add("updated_at")
+                if task.google_calendar_id:
+                    task.google_sync_status = Task.SYNC_PENDING
+                    changed_fields[task.pk].add("google_sync_status")
+
+            created = Task.objects.bulk_create(to_create)
+            if changed:
+                self.write_changes(list(changed.values()), changed_fields)
+                rollups.record(changed.values())
+            if deleted:
+                # Deleted occurrences must not come back when their series is expanded.
+                for pk in sorted(deleted):
+                    task = tasks[pk]
+                    if task.series_id and task.series_id not in deleted:
+                        recurrence.skip(task.series_id, task.occurrence_at)
+                Task.objects.filter(household_id=self.household_id, pk__in=deleted).delete()
+            if ledger:
+                points_delta = points.apply_entries(self.user, ledger)
+            # Deletes are recorded by core.signals; bulk_create and updates send no signals.
+            changes.record(self.household_id, changes.KINDS[Task], [t.pk for t in created], changes.CREATED)
+            changes.record(self.household_id, changes.KINDS[Task], list(changed))
+
+        # Bulk writes skip post_save, so invalidate household caches here.
+        bump_household_version(self.household_id)
+
+        return {
+            "created": [t.pk for t in created],
+            "updated": sorted(changed),
+            "deleted": sorted(deleted),
+            "points_delta": points_delta,
+        }, []
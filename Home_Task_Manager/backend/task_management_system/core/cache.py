@@ -0,0 +1,84 @@
+"""
+Per-household response cache.
+
+Each household has versions stored in the cache, one per scope:
+  - "data": bumped on any save/delete of household data (see core.signals)
+  - "points": bumped when a balance changes or a user's details change
+    (see core.points / core.signals); used by the leaderboards
+Cached payloads are keyed by household, scope *and* version, so bumping a
+version makes every older entry of that scope unreachable. Stale entries
+are never served and simply age out of the cache backend.
+
+Versions are bumped wherever data changes: web workers, but also the job
+worker (run_jobs) and management commands (calendar sync, archive_tasks,
+generate_households, ...). With more than one process the cache backend
+must therefore be shared (settings.CACHES: the database or Redis); with
+per-process local memory a bump never reaches the other processes, which
+keep serving their payloads until these time out. Local memory is only
+right for single-process development and the tests.
+
+Inside a transaction a version is bumped twice: straight away, for reads
+on the same connection, and again once the transaction commits. Another
+process reading between the two still sees the old rows and may cache
+them under the first new version; the second bump makes that entry
+unreachable, and only comes after every write of the transaction (the
+completion rollups included) is visible.
+"""
+import secrets
+
+from django.core.cache import cache
+from django.db import transaction
+
+DATA = "data"
+POINTS = "points"
+
+
+def _version_key(household_id, scope):
+    return f"household:{household_id}:{scope}:version"
+
+
+def get_household_version(household_id, scope=DATA):
+    key = _version_key(household_id, scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _new_version():
+    # Random rather than counting up from 1, so an evicted version key can
+    # never line up with payloads cached under an earlier version.
+    return secrets.randbits(63)
+
+
+def bump_household_version(household_id, scope=DATA):
+    if household_id is None:
+        return
+    # A new random version rather than incr(): the database cache's incr()
+    # is a read then a write, so two concurrent bumps could both land on the
+    # same number and one change would go unnoticed.
+    key = _version_key(household_id, scope)
+    cache.set(key, _new_version(), timeout=None)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: cache.set(key, _new_version(), timeout=None))
+
+
+def household_cached(household_id, name, build, scope=DATA):
+    """
+    Return the cached payload `name` for a household, building it on a miss.
+
+    `build()` must return `(payload, timeout)`; timeout=None caches until the
+    household's `scope` version changes.
+    """
+    if household_id is None:
+        payload, _ = build()
+        return payload
+
+    version = get_household_version(household_id, scope)
+    key = f"household:{household_id}:{scope}:v{version}:{name}"
+    payload = cache.get(key)
+    if payload is None:
+        payload, timeout = build()
+        cache.set(key, payload, timeout=timeout)
+    return payload
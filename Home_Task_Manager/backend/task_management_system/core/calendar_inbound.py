@@ -0,0 +1,250 @@
+"""
+Inbound Google Calendar sync: apply edits made in Google Calendar to tasks.
+
+Each linked calendar keeps the nextSyncToken of its last pull
+(CalendarSyncState), so a pull fetches only the events changed since then.
+Changed events are matched to tasks through the indexed google_event_id
+and written back a page at a time with bulk_update:
+  - title, description and dates are copied from the event,
+  - an event deleted in Google unlinks its task (the task itself is kept),
+  - tasks with a local edit waiting to be pushed are left alone; the push
+    overwrites the event with the local version.
+The page's rows are locked and re-read first: one whose updated_at or sync
+status differs from what the pull read was edited locally since, and wins
+the same way (it is skipped and the edit goes out with the next push).
+bulk_update skips pre_save, so applied changes are not pushed back out.
+
+When Google no longer accepts a sync token (410 Gone) the calendar is
+paged through from scratch; tasks whose events are missing from that full
+listing are unlinked too. The new token is only stored once every page
+has been applied, so an interrupted pull is simply repeated.
+"""
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, time as dt_time
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from . import changes
+from .cache import bump_household_version
+from .calendar_sync import CalendarError, SyncTokenExpired, event_body
+from .models import CalendarSyncState, Task
+
+PAGE_SIZE = 250
+
+APPLIED_FIELDS = ["title", "description", "start_at", "due_date", "google_last_synced_at", "updated_at"]
+UNLINKED_FIELDS = [
+    "google_calendar_id", "google_event_id", "google_sync_status", "google_sync_error",
+    "google_last_synced_at", "updated_at",
+]
+
+COMPLETED_PREFIX = "✓ "
+
+
+def event_time(value):
+    """An event start/end ({"dateTime": ...} or all-day {"date": ...})."""
+    if not value:
+        return None
+    if value.get("dateTime"):
+        return parse_datetime(value["dateTime"])
+    if value.get("date"):
+        return timezone.make_aware(datetime.combine(parse_date(value["date"]), dt_time.min))
+    return None
+
+
+def apply_event(task, event):
+    """
+    Copy the fields core.calendar_sync.event_body pushes back onto `task`.
+    Times are only taken over where the event differs from what the task
+    would push, so a filled-in default end time doesn't become a due date.
+    Returns True if anything changed.
+    """
+    title = event.get("summary", "")
+    title = title[len(COMPLETED_PREFIX):] if title.startswith(COMPLETED_PREFIX) else title
+    values = {"title": title[:200] or task.title, "description": event.get("description", "")}
+
+    if task.start_at or task.due_date:
+        pushed = event_body(task)
+        start, end = event_time(event.get("start")), event_time(event.get("end"))
+        if task.start_at is None:
+            # A due-only task is pushed as an event starting at its due date.
+            if start and start != event_time(pushed["start"]):
+                values["due_date"] = start
+        else:
+            if start and start != event_time(pushed["start"]):
+                values["start_at"] = start
+            if end and end != event_time(pushed["end"]):
+                values["due_date"] = end
+
+    changed = False
+    for field, value in values.items():
+        if getattr(task, field) != value:
+            setattr(task, field, value)
+            changed = True
+    return changed
+
+
+def unlink(task):
+    task.google_calendar_id = None
+    task.google_event_id = None
+    task.google_sync_status = None
+    task.google_sync_error = None
+
+
+def loaded(task):
+    """Note what a task was read with, before changing it, for save_tasks."""
+    task.loaded_updated_at = task.updated_at
+    task.loaded_sync_status = task.google_sync_status
+
+
+def save_tasks(tasks, fields):
+    """
+    Write `fields` of the tasks whose rows are still as they were loaded();
+    tasks edited since are skipped. Returns how many were written.
+    """
+    # bulk_update skips post_save: record the changes for delta sync and
+    # invalidate household caches here.
+    by_household = defaultdict(list)
+    with transaction.atomic(), changes.collect():
+        # Locked until the write commits, so nothing can change in between.
+        stored = {
+            pk: (updated_at, status)
+            for pk, updated_at, status in Task.objects.select_for_update()
+            .filter(pk__in=[task.pk for task in tasks]).values_list("pk", "updated_at", "google_sync_status")
+        }
+        tasks = [task for task in tasks if stored.get(task.pk) == (task.loaded_updated_at, task.loaded_sync_status)]
+        Task.objects.bulk_update(tasks, fields, batch_size=500)
+        for task in tasks:
+            by_household[task.household_id].append(task.pk)
+        for household_id, pks in by_household.items():
+            changes.record(household_id, changes.KINDS[Task], pks)
+    for household_id in by_household:
+        bump_household_version(household_id)
+    return len(tasks)
+
+
+class CalendarPull:
+    def __init__(self, client, page_size=PAGE_SIZE, max_attempts=5, backoff_base=1.0, backoff_max=60.0):
+        self.client = client
+        self.page_size = page_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def run(self, calendar_ids=None):
+        """
+        Pull every linked calendar (or just `calendar_ids`). Returns counts
+        of pages fetched, events seen, tasks updated and unlinked, and full
+        resyncs.
+        """
+        if calendar_ids is None:
+            calendar_ids = sorted(
+                set(Task.objects.filter(google_calendar_id__isnull=False)
+                    .values_list("google_calendar_id", flat=True).distinct())
+                | set(CalendarSyncState.objects.values_list("calendar_id", flat=True))
+            )
+        stats = {"calendars": 0, "pages": 0, "events": 0, "updated": 0, "unlinked": 0, "full_resyncs": 0}
+        for calendar_id in calendar_ids:
+            self.sync_calendar(calendar_id, stats)
+            stats["calendars"] += 1
+        return stats
+
+    def sync_calendar(self, calendar_id, stats):
+        state, _ = CalendarSyncState.objects.get_or_create(calendar_id=calendar_id)
+        started = timezone.now()
+        full = state.sync_token is None
+        try:
+            token = self.pull(calendar_id, state.sync_token, started, stats)
+        except SyncTokenExpired:
+            full = True
+            stats["full_resyncs"] += 1
+            token = self.pull(calendar_id, None, started, stats)
+
+        state.sync_token = token
+        state.last_synced_at = timezone.now()
+        if full:
+            state.last_full_sync_at = state.last_synced_at
+        state.save()
+
+    def fetch(self, calendar_id, sync_token, page_token):
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return self.client.list_events(calendar_id, sync_token, page_token, self.page_size)
+            except SyncTokenExpired:
+                raise
+            except CalendarError as exc:
+                if not exc.retryable or attempt >= self.max_attempts:
+                    raise
+                delay = min(self.backoff_base * 2 ** (attempt - 1), self.backoff_max)
+                time.sleep(delay * random.uniform(1.0, 1.25))
+
+    def pull(self, calendar_id, sync_token, started, stats):
+        """Apply every page since `sync_token` (all events if None); return the new token."""
+        seen = set()
+        page_token = None
+        while True:
+            page = self.fetch(calendar_id, sync_token, page_token)
+            events = page.get("items", [])
+            stats["pages"] += 1
+            stats["events"] += len(events)
+            self.apply(calendar_id, events, stats)
+            if sync_token is None:
+                seen.update(e["id"] for e in events if e.get("status") != "cancelled")
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                break
+
+        if sync_token is None:
+            self.unlink_missing(calendar_id, seen, started, stats)
+        return page["nextSyncToken"]
+
+    def apply(self, calendar_id, events, stats):
+        by_id = {event["id"]: event for event in events}
+        if not by_id:
+            return
+        now = timezone.now()
+        updated, unlinked = [], []
+        for task in Task.objects.filter(google_calendar_id=calendar_id, google_event_id__in=list(by_id)):
+            if task.google_sync_status in (Task.SYNC_PENDING, Task.SYNC_SYNCING):
+                continue
+            loaded(task)
+            event = by_id[task.google_event_id]
+            if event.get("status") == "cancelled":
+                unlink(task)
+                unlinked.append(task)
+            elif apply_event(task, event):
+                updated.append(task)
+            else:
+                continue
+            task.google_last_synced_at = now
+            task.updated_at = now
+
+        if updated:
+            stats["updated"] += save_tasks(updated, APPLIED_FIELDS)
+        if unlinked:
+            stats["unlinked"] += save_tasks(unlinked, UNLINKED_FIELDS)
+
+    def unlink_missing(self, calendar_id, seen, started, stats):
+        """After a full listing: unlink synced tasks whose events are gone."""
+        linked = Task.objects.filter(
+            google_calendar_id=calendar_id,
+            google_sync_status=Task.SYNC_SYNCED,
+            google_last_synced_at__lt=started,
+        ).exclude(google_event_id=None)
+        missing = [
+            task for task in linked.only("id", "household_id", "google_event_id", "google_sync_status", "updated_at")
+            if task.google_event_id not in seen
+        ]
+        now = timezone.now()
+        for task in missing:
+            loaded(task)
+            unlink(task)
+            task.google_last_synced_at = now
+            task.updated_at = now
+        if missing:
+            stats["unlinked"] += save_tasks(missing, UNLINKED_FIELDS)
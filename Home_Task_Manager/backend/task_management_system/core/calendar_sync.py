@@ -0,0 +1,416 @@
+"""
+Outbound Google Calendar sync.
+
+A task linked to a calendar (google_calendar_id set) is marked "pending"
+whenever it is edited (see core.signals and core.bulk). The engine pushes
+pending tasks to the Calendar API:
+
+  - claim:  a chunk of pending tasks is read with SELECT ... FOR UPDATE
+            SKIP LOCKED and flipped to "syncing" in the same transaction,
+            stamped with the claim time. Concurrent runs skip each other's
+            rows, and an edit can't slip in between the read and the
+            flip. An edit made while the push is in flight flips the task
+            back to "pending"; only tasks still "syncing" under this claim
+            afterwards are marked synced, so the edit goes out in a later
+            push. However many edits a task gets between pushes, it is
+            sent once, as it is at push time.
+  - push:   the chunk is split into batch requests (up to 50 calls each,
+            the Calendar API's limit) sent concurrently over one pooled,
+            rate-limited session. New events are inserted and existing ones
+            patched. Inserts use a deterministic event id (event_id()), so
+            a task whose stored id was lost is patched, not duplicated.
+  - retry:  calls that hit rate limits, 5xx or transport errors are retried
+            with exponential backoff, up to max_attempts; other failures,
+            and retries that run out, mark the task "error" with the
+            reason in google_sync_error.
+
+Several engines can run at once (`manage.py sync_google_calendar`). Each
+run first hands tasks a crashed run left "syncing" for longer than
+claim_timeout back to "pending"; a run's own chunks must be pushed well
+within that time.
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from email import message_from_bytes
+from urllib.parse import quote
+
+import requests
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from . import changes
+from .models import Task
+
+CALENDAR_SCOPE = "https://www.googleapis.com/auth/calendar.events"
+DEFAULT_API_URL = "https://www.googleapis.com"
+
+MAX_BATCH_SIZE = 50
+DEFAULT_EVENT_LENGTH = timedelta(minutes=30)
+EVENT_ID_PREFIX = "hometask"
+
+# A "syncing" task claimed longer ago than this is taken to be left over from a crashed run
+CLAIM_TIMEOUT = timedelta(minutes=15)
+
+RETRYABLE_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "quotaExceeded"}
+
+
+class CalendarError(Exception):
+    def __init__(self, message, retryable=False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class SyncTokenExpired(CalendarError):
+    """The Calendar API answered 410 Gone: a full resync is needed."""
+
+
+class RateLimiter:
+    """Token bucket: `rate` calls per second on average, bursts up to `burst`."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(rate, MAX_BATCH_SIZE)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, calls=1):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= calls:
+                    self.tokens -= calls
+                    return
+                wait = (calls - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class CalendarClient:
+    """
+    Sends Calendar API calls as batch requests over one pooled session.
+    `rate` limits calls (not batches) per second; None means unlimited.
+    """
+
+    def __init__(self, base_url=DEFAULT_API_URL, credentials=None, rate=None, pool_size=10, timeout=30):
+        if credentials is not None:
+            from google.auth.transport.requests import AuthorizedSession
+
+            self.session = AuthorizedSession(credentials)
+        else:
+            self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.base_url = base_url.rstrip("/")
+        self.limiter = RateLimiter(rate) if rate else None
+        self.timeout = timeout
+
+    @classmethod
+    def from_settings(cls, **kwargs):
+        base_url = getattr(settings, "GOOGLE_CALENDAR_API_URL", DEFAULT_API_URL)
+        credentials_file = getattr(settings, "GOOGLE_CALENDAR_CREDENTIALS_FILE", "")
+        credentials = None
+        if credentials_file:
+            from google.oauth2 import service_account
+
+            credentials = service_account.Credentials.from_service_account_file(
+                credentials_file, scopes=[CALENDAR_SCOPE]
+            )
+        elif base_url == DEFAULT_API_URL:
+            raise ImproperlyConfigured("GOOGLE_CALENDAR_CREDENTIALS_FILE is not configured")
+        return cls(base_url, credentials, **kwargs)
+
+    def batch(self, calls):
+        """
+        Send [(method, path, body), ...] as one batch request.
+        Returns [(status, body), ...] in the same order.
+        """
+        if self.limiter:
+            self.limiter.acquire(len(calls))
+
+        boundary = f"batch_{uuid.uuid4().hex}"
+        parts = []
+        for index, (method, path, body) in enumerate(calls):
+            parts.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <item{index}>\r\n\r\n"
+                f"{method} {path} HTTP/1.1\r\n"
+                "Content-Type: application/json\r\n\r\n"
+                f"{json.dumps(body) if body is not None else ''}\r\n"
+            )
+        payload = "".join(parts) + f"--{boundary}--\r\n"
+
+        try:
+            response = self.session.post(
+                f"{self.base_url}/batch/calendar/v3",
+                data=payload.encode(),
+                headers={"Content-Type": f"multipart/mixed; boundary={boundary}"},
+                timeout=self.timeout,
+            )
+        except requests.RequestException as exc:
+            raise CalendarError(f"{type(exc).__name__}: {exc}", retryable=True) from exc
+        if response.status_code != 200:
+            raise CalendarError(
+                f"Batch request failed with HTTP {response.status_code}",
+                retryable=response.status_code == 429 or response.status_code >= 500,
+            )
+
+        results = parse_batch_response(response.headers["Content-Type"], response.content)
+        if len(results) != len(calls):
+            raise CalendarError("Batch response did not match the request", retryable=True)
+        return [results[f"item{index}"] for index in range(len(calls))]
+
+    def list_events(self, calendar_id, sync_token=None, page_token=None, max_results=250):
+        """
+        One page of events.list. With a sync token only events changed since
+        it are returned (deleted ones with status "cancelled"); the last page
+        carries nextSyncToken. Raises SyncTokenExpired when the token is no
+        longer accepted.
+        """
+        if self.limiter:
+            self.limiter.acquire()
+
+        params = {"maxResults": max_results}
+        if sync_token:
+            params["syncToken"] = sync_token
+        if page_token:
+            params["pageToken"] = page_token
+        try:
+            response = self.session.get(
+                f"{self.base_url}/calendar/v3/calendars/{quote(calendar_id, safe='')}/events",
+                params=params,
+                timeout=self.timeout,
+            )
+        except requests.RequestException as exc:
+            raise CalendarError(f"{type(exc).__name__}: {exc}", retryable=True) from exc
+        if response.status_code == 410:
+            raise SyncTokenExpired("Sync token is no longer valid")
+        if response.status_code != 200:
+            try:
+                body = response.json()
+            except ValueError:
+                body = {}
+            retryable, message = classify(response.status_code, body)
+            raise CalendarError(message, retryable=retryable)
+        return response.json()
+
+
+def parse_batch_response(content_type, content):
+    """Map each part's Content-ID (without "response-") to (status, body)."""
+    message = message_from_bytes(f"Content-Type: {content_type}\r\n\r\n".encode() + content)
+    results = {}
+    for part in message.get_payload():
+        content_id = part["Content-ID"].strip("<>").removeprefix("response-")
+        raw = part.get_payload().replace("\r\n", "\n")
+        head, _, body = raw.partition("\n\n")
+        status = int(head.split("\n", 1)[0].split()[1])
+        try:
+            data = json.loads(body) if body.strip() else {}
+        except ValueError:
+            data = {}
+        results[content_id] = (status, data)
+    return results
+
+
+def event_body(task):
+    start = task.start_at or task.due_date
+    end = task.due_date if task.due_date and task.due_date > start else start + DEFAULT_EVENT_LENGTH
+    return {
+        "summary": f"✓ {task.title}" if task.completed else task.title,
+        "description": task.description,
+        "start": {"dateTime": start.isoformat()},
+        "end": {"dateTime": end.isoformat()},
+        "extendedProperties": {"private": {"homeTaskId": str(task.pk)}},
+    }
+
+
+def event_id(task):
+    # Client-chosen ids may use the characters a-v and 0-9.
+    return f"{EVENT_ID_PREFIX}{task.pk}"
+
+
+def task_call(task):
+    calendar = quote(task.google_calendar_id, safe="")
+    if task.google_event_id:
+        path = f"/calendar/v3/calendars/{calendar}/events/{quote(task.google_event_id, safe='')}"
+        return "PATCH", path, event_body(task)
+    return "POST", f"/calendar/v3/calendars/{calendar}/events", {"id": event_id(task), **event_body(task)}
+
+
+def classify(status, body):
+    """Return (retryable, message) for a failed call."""
+    error = body.get("error") or {}
+    reasons = {e.get("reason") for e in error.get("errors", [])}
+    message = f"HTTP {status}: {error.get('message', 'Calendar API error')}"
+    retryable = status == 429 or status >= 500 or (status == 403 and reasons & RETRYABLE_REASONS)
+    return bool(retryable), message
+
+
+class CalendarSyncEngine:
+    def __init__(self, client, batch_size=MAX_BATCH_SIZE, workers=4, max_attempts=5,
+                 backoff_base=1.0, backoff_max=60.0, claim_timeout=CLAIM_TIMEOUT):
+        self.client = client
+        self.claim_timeout = claim_timeout
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def backoff(self, attempt):
+        delay = min(self.backoff_base * 2 ** (attempt - 1), self.backoff_max)
+        return delay * random.uniform(1.0, 1.25)
+
+    def run(self, limit=None, retry_errors=False):
+        """
+        Push pending tasks until none are left (or `limit` have been
+        processed). Returns counts of synced and failed tasks and batches.
+        """
+        # Sync status is part of what clients see, so every status change
+        # moves updated_at too (the calendar ETags are built from it).
+        now = timezone.now()
+        stale = Q(google_sync_claimed_at__lt=now - self.claim_timeout) | Q(google_sync_claimed_at=None)
+        Task.objects.filter(stale, google_sync_status=Task.SYNC_SYNCING).update(
+            google_sync_status=Task.SYNC_PENDING, updated_at=now
+        )
+        if retry_errors:
+            Task.objects.filter(google_sync_status=Task.SYNC_ERROR).update(
+                google_sync_status=Task.SYNC_PENDING, updated_at=now
+            )
+
+        stats = {"synced": 0, "failed": 0, "batches": 0}
+        chunk_size = self.batch_size * self.workers
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while limit is None or stats["synced"] + stats["failed"] < limit:
+                size = chunk_size if limit is None else min(chunk_size, limit - stats["synced"] - stats["failed"])
+                tasks, claimed_at = self.claim(size)
+                if not tasks:
+                    break
+
+                synced, failed = self.push_chunk(executor, tasks, stats)
+                self.record(tasks, synced, failed, claimed_at)
+                stats["synced"] += len(synced)
+                stats["failed"] += len(failed)
+        return stats
+
+    def claim(self, size):
+        """Returns up to `size` pending tasks, now "syncing" for this run, and the claim time."""
+        claimed_at = timezone.now()
+        with transaction.atomic():
+            tasks = list(
+                Task.objects.select_for_update(skip_locked=True)
+                .filter(google_sync_status=Task.SYNC_PENDING).order_by("id")[:size]
+            )
+            if tasks:
+                Task.objects.filter(pk__in=[t.pk for t in tasks]).update(
+                    google_sync_status=Task.SYNC_SYNCING, google_sync_claimed_at=claimed_at, updated_at=claimed_at
+                )
+        return tasks, claimed_at
+
+    def push_chunk(self, executor, tasks, stats):
+        """Returns (ids pushed, {id: error}) after retries."""
+        synced, failed = set(), {}
+        for task in tasks:
+            task.loaded_event_id = task.google_event_id
+        queue = []
+        for task in tasks:
+            if not task.google_calendar_id:
+                failed[task.pk] = "Task is not linked to a calendar"
+            elif not (task.start_at or task.due_date):
+                failed[task.pk] = "Task has no start or due date"
+            else:
+                queue.append(task)
+
+        attempt = 0
+        while queue:
+            attempt += 1
+            if attempt > 1:
+                time.sleep(self.backoff(attempt - 1))
+            batches = [queue[i:i + self.batch_size] for i in range(0, len(queue), self.batch_size)]
+            stats["batches"] += len(batches)
+
+            retry = {}
+            for batch, outcome in zip(batches, executor.map(self.send, batches)):
+                if isinstance(outcome, CalendarError):
+                    for task in batch:
+                        if outcome.retryable:
+                            retry[task.pk] = str(outcome)
+                        else:
+                            failed[task.pk] = str(outcome)
+                    continue
+                for task, (status, body) in zip(batch, outcome):
+                    if status in (200, 201):
+                        task.google_event_id = body.get("id", task.google_event_id)
+                        synced.add(task.pk)
+                    elif status in (404, 410) and task.google_event_id:
+                        # Deleted on Google's side: insert it afresh.
+                        task.google_event_id = None
+                        retry[task.pk] = f"HTTP {status}: event no longer exists"
+                    elif status == 409 and not task.google_event_id:
+                        # Inserted before, but the id wasn't stored: patch it.
+                        task.google_event_id = event_id(task)
+                        retry[task.pk] = f"HTTP {status}: event already exists"
+                    else:
+                        retryable, message = classify(status, body)
+                        if retryable:
+                            retry[task.pk] = message
+                        else:
+                            failed[task.pk] = message
+
+            if attempt >= self.max_attempts:
+                failed.update(retry)
+                break
+            queue = [task for task in queue if task.pk in retry]
+        return synced, failed
+
+    def send(self, batch):
+        try:
+            return self.client.batch([task_call(task) for task in batch])
+        except CalendarError as exc:
+            return exc
+
+    def record(self, tasks, synced, failed, claimed_at):
+        with transaction.atomic(), changes.collect():
+            self.write_results(tasks, synced, failed, claimed_at)
+            # Queryset updates send no signals: record the new sync status
+            # for delta sync here.
+            by_household = defaultdict(list)
+            for task in tasks:
+                by_household[task.household_id].append(task.pk)
+            for household_id, pks in by_household.items():
+                changes.record(household_id, changes.KINDS[Task], pks)
+
+    def write_results(self, tasks, synced, failed, claimed_at):
+        # Event ids are kept even if the task was edited meanwhile, so the
+        # next push patches the event instead of inserting a duplicate.
+        changed = [task for task in tasks if task.google_event_id != task.loaded_event_id]
+        if changed:
+            Task.objects.bulk_update(changed, ["google_event_id"], batch_size=500)
+
+        # Only this run's claim: an edit, or a stale claim taken over by
+        # another run, leaves the task for the next push.
+        ours = Task.objects.filter(google_sync_status=Task.SYNC_SYNCING, google_sync_claimed_at=claimed_at)
+        now = timezone.now()
+        ours.filter(pk__in=synced).update(
+            google_sync_status=Task.SYNC_SYNCED, google_last_synced_at=now, google_sync_error=None, updated_at=now
+        )
+        by_message = defaultdict(list)
+        for pk, message in failed.items():
+            by_message[message].append(pk)
+        for message, pks in by_message.items():
+            ours.filter(pk__in=pks).update(
+                google_sync_status=Task.SYNC_ERROR, google_sync_error=message, updated_at=now
+            )
@@ -0,0 +1,171 @@
+"""
+Change tracking for delta sync (GET /api/sync/?since=<cursor>).
+
+Every create, update or delete of a task, member, pet or category is
+numbered from its household's change_seq and written to SyncChange, one
+row per object holding only its latest change; deletes leave a tombstone.
+A client keeps the cursor of the last page it applied and asks for
+everything numbered after it.
+
+Numbers are handed out with an UPDATE on the household row, and the
+SyncChange rows are written in the same transaction. The row lock makes
+every other writer in the household wait until that transaction commits,
+so changes become visible in sequence order and a client can never read
+past one that is still in flight.
+
+Saves and deletes are recorded by signal handlers (core.signals). Bulk
+writes that skip signals call record() themselves; inside collect() the
+changes are buffered and numbered with one UPDATE and one upsert.
+
+Once committed, every change is also pushed to the household's live
+event stream (core.events) as "<kind>.created|updated|deleted".
+"""
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import events
+from .models import Category, Household, Member, Pet, SyncChange, Task
+from .serializers import CategorySerializer, MemberSerializer, PetSerializer, TaskSerializer
+
+KINDS = {
+    Task: SyncChange.KIND_TASK,
+    Member: SyncChange.KIND_MEMBER,
+    Pet: SyncChange.KIND_PET,
+    Category: SyncChange.KIND_CATEGORY,
+}
+
+# kind -> (response key, model, serializer)
+PAYLOADS = {
+    SyncChange.KIND_CATEGORY: ("categories", Category, CategorySerializer),
+    SyncChange.KIND_MEMBER: ("members", Member, MemberSerializer),
+    SyncChange.KIND_PET: ("pets", Pet, PetSerializer),
+    SyncChange.KIND_TASK: ("tasks", Task, TaskSerializer),
+}
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 1000
+
+_local = threading.local()
+
+
+def record(household_id, kind, ids, action=UPDATED):
+    """Record that the `kind` objects `ids` of a household were created, updated or deleted."""
+    if household_id is None or not ids:
+        return
+    entries = [(household_id, kind, pk, action) for pk in ids]
+    buffer = getattr(_local, "buffer", None)
+    if buffer is not None:
+        buffer.extend(entries)
+    else:
+        write(entries)
+
+
+@contextmanager
+def collect():
+    """Buffer record() calls and write them together on exit."""
+    if getattr(_local, "buffer", None) is not None:
+        yield
+        return
+    _local.buffer = []
+    try:
+        yield
+        entries = _local.buffer
+    finally:
+        _local.buffer = None
+    write(entries)
+
+
+def write(entries):
+    latest = {}
+    for household_id, kind, pk, action in entries:
+        key = (household_id, kind, pk)
+        # Created then edited in the same batch is still news of a creation.
+        if not (action == UPDATED and latest.get(key) == CREATED):
+            latest[key] = action
+    if not latest:
+        return
+
+    by_household = defaultdict(list)
+    for (household_id, kind, pk), action in latest.items():
+        by_household[household_id].append((kind, pk, action))
+
+    now = timezone.now()
+    rows = []
+    # No savepoint: callers inside a transaction roll back with it anyway.
+    with transaction.atomic(savepoint=False):
+        # Lock households in a fixed order so concurrent writers can't deadlock.
+        for household_id in sorted(by_household):
+            changes = by_household[household_id]
+            households = Household.objects.filter(pk=household_id)
+            if not households.update(change_seq=F("change_seq") + len(changes)):
+                continue
+            last = households.values_list("change_seq", flat=True).get()
+            first = last - len(changes) + 1
+            household_rows = [
+                SyncChange(household_id=household_id, kind=kind, object_id=pk, deleted=action == DELETED,
+                           seq=first + offset, changed_at=now)
+                for offset, (kind, pk, action) in enumerate(changes)
+            ]
+            rows.extend(household_rows)
+            events.publish(household_id, [
+                {"type": f"{row.kind}.{action}", "id": row.object_id, "cursor": format_cursor(household_id, row.seq)}
+                for row, (_, _, action) in zip(household_rows, changes)
+            ])
+        SyncChange.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["household", "kind", "object_id"],
+            update_fields=["seq", "deleted", "changed_at"],
+        )
+
+
+def format_cursor(household_id, seq):
+    return f"{household_id}:{seq}"
+
+
+def parse_cursor(cursor):
+    """Return (household_id, seq); raises ValueError for a malformed cursor."""
+    household_id, _, seq = cursor.partition(":")
+    household_id, seq = int(household_id), int(seq)
+    if household_id < 0 or seq < 0:
+        raise ValueError(cursor)
+    return household_id, seq
+
+
+def changes_page(household_id, since, limit, context):
+    """
+    Everything changed after sequence number `since`, up to `limit` changes:
+    current rows for created / updated objects, ids for deleted ones.
+    """
+    changes = list(
+        SyncChange.objects.filter(household_id=household_id, seq__gt=since)
+        .order_by("seq")
+        .values_list("seq", "kind", "object_id", "deleted")[: limit + 1]
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    live, deleted = defaultdict(list), defaultdict(list)
+    for _, kind, pk, is_deleted in changes:
+        (deleted if is_deleted else live)[kind].append(pk)
+
+    page = {
+        "cursor": format_cursor(household_id, changes[-1][0] if changes else since),
+        "has_more": has_more,
+    }
+    for kind, (key, model, serializer) in PAYLOADS.items():
+        # An object deleted or moved since its change was numbered is
+        # skipped; its tombstone comes later in the sequence.
+        objects = model.objects.filter(household_id=household_id, pk__in=live[kind]).order_by("pk")
+        page[key] = serializer(objects, many=True, context=context).data if live[kind] else []
+    page["deleted"] = {key: sorted(deleted[kind]) for kind, (key, _, _) in PAYLOADS.items()}
+    return page
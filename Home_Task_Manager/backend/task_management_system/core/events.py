@@ -0,0 +1,201 @@
+"""
+Live household events, pushed to clients over Server-Sent Events
+(GET /api/events/, see core.stream).
+
+publish(household_id, events) hands a list of events to the configured
+broker once the surrounding transaction commits, and the broker delivers
+them to every open stream of that household. Each event is a dict with a
+"type":
+
+  task.created / task.updated / task.deleted (and member.*, pet.*, category.*)
+      {"id", "cursor"}; the cursor can be passed to GET /api/sync/
+  task.completed    {"id", "completed", "user_id"}
+  points.changed    {"user_id", "delta"}
+  resync            events were dropped; catch up with GET /api/sync/
+
+settings.HOUSEHOLD_EVENTS_BROKER picks the broker:
+  core.events.LocalBroker     in-process fan-out. Streams only see events
+                              published by the same process: one worker,
+                              or tests.
+  core.events.PostgresBroker  LISTEN/NOTIFY, so a stream on any worker
+                              sees events published by every worker.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BROKER = "core.events.LocalBroker"
+
+# Batches of events queued for one stream before it is told to resync.
+MAX_PENDING = 100
+
+RESYNC = {"type": "resync"}
+
+
+class Subscription:
+    """
+    The queue behind one open stream. put() may be called from any thread;
+    the events are handed over to the stream's event loop.
+    """
+
+    def __init__(self, broker, household_id, loop, max_pending=MAX_PENDING):
+        self.broker = broker
+        self.household_id = household_id
+        self.loop = loop
+        self.queue = asyncio.Queue(max_pending)
+
+    def put(self, events):
+        try:
+            self.loop.call_soon_threadsafe(self._put, events)
+        except RuntimeError:
+            pass  # the loop is closed: the stream has gone away
+
+    def _put(self, events):
+        try:
+            self.queue.put_nowait(events)
+        except asyncio.QueueFull:
+            # A client this far behind catches up from /api/sync/ instead.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait([RESYNC])
+
+    async def get(self, timeout=None):
+        """The next batch of events, or None if none arrives within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = defaultdict(set)
+
+    def subscribe(self, household_id, loop=None):
+        """Call from the stream's event loop."""
+        subscription = Subscription(self, household_id, loop or asyncio.get_running_loop())
+        with self.lock:
+            self.subscribers[household_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscribers.get(subscription.household_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self.subscribers[subscription.household_id]
+
+    def publish(self, household_id, events):
+        self.deliver(household_id, events)
+
+    def deliver(self, household_id, events):
+        with self.lock:
+            subscriptions = list(self.subscribers.get(household_id, ()))
+        for subscription in subscriptions:
+            subscription.put(events)
+
+    def deliver_all(self, events):
+        with self.lock:
+            subscriptions = [s for group in self.subscribers.values() for s in group]
+        for subscription in subscriptions:
+            subscription.put(events)
+
+
+class PostgresBroker(LocalBroker):
+    """
+    Publishes with pg_notify; one listener thread per process (started by
+    the first subscriber) holds its own connection, LISTENs and delivers
+    to the local streams. Needs PostgreSQL with psycopg2.
+    """
+    CHANNEL = "household_events"
+    # NOTIFY payloads are limited to 8000 bytes.
+    MAX_PAYLOAD = 7500
+    POLL_INTERVAL = 5.0
+
+    def __init__(self, using="default"):
+        super().__init__()
+        self.using = using
+        self.listener = None
+        self.listener_lock = threading.Lock()
+
+    def payloads(self, household_id, events):
+        batch, size = [], 0
+        for event in events:
+            encoded = json.dumps(event, separators=(",", ":"))
+            if batch and size + len(encoded) > self.MAX_PAYLOAD:
+                yield f'{{"household_id":{household_id},"events":[{",".join(batch)}]}}'
+                batch, size = [], 0
+            batch.append(encoded)
+            size += len(encoded) + 1
+        if batch:
+            yield f'{{"household_id":{household_id},"events":[{",".join(batch)}]}}'
+
+    def publish(self, household_id, events):
+        with connections[self.using].cursor() as cursor:
+            for payload in self.payloads(household_id, events):
+                cursor.execute("SELECT pg_notify(%s, %s)", [self.CHANNEL, payload])
+
+    def subscribe(self, household_id, loop=None):
+        with self.listener_lock:
+            if self.listener is None:
+                self.listener = threading.Thread(target=self.listen, name="household-events", daemon=True)
+                self.listener.start()
+        return super().subscribe(household_id, loop)
+
+    def listen(self):
+        wrapper = connections[self.using]
+        while True:
+            conn = None
+            try:
+                conn = wrapper.get_new_connection(wrapper.get_connection_params())
+                conn.autocommit = True
+                conn.cursor().execute(f"LISTEN {self.CHANNEL}")
+                # Anything published while (re)connecting was missed.
+                self.deliver_all([RESYNC])
+                while True:
+                    if select.select([conn], [], [], self.POLL_INTERVAL)[0]:
+                        conn.poll()
+                        while conn.notifies:
+                            message = json.loads(conn.notifies.pop(0).payload)
+                            self.deliver(message["household_id"], message["events"])
+            except Exception:
+                logger.exception("Household events listener failed; reconnecting")
+                if conn is not None:
+                    conn.close()
+                time.sleep(1)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(getattr(settings, "HOUSEHOLD_EVENTS_BROKER", DEFAULT_BROKER))()
+    return _broker
+
+
+def publish(household_id, events):
+    """Send `events` to the household's streams once the current transaction commits."""
+    if household_id is None or not events:
+        return
+    broker = get_broker()
+    transaction.on_commit(lambda: broker.publish(household_id, events), robust=True)
@@ -0,0 +1,245 @@
+"""
+Google ID token verification without a network round trip per login.
+
+google.oauth2.id_token fetches Google's signing certificates through
+whatever transport it is given. CachedCertsRequest is that transport:
+  - one pooled requests.Session is reused for every fetch,
+  - the certificate response is kept in-process and in Django's cache for
+    as long as its Cache-Control max-age allows (so other workers reuse it),
+  - once REFRESH_AHEAD of that window is left it is refreshed in a
+    background thread, so logins keep using the current certificates
+    instead of waiting on the fetch that renews them.
+Concurrent misses in one process share a single fetch. With the
+certificates cached, verifying a token is a local signature check.
+
+averify_google_id_token() is the same for async views: a fetch goes
+through httpx's async client on the event loop instead of blocking a
+thread, and shares the cache with the sync path.
+"""
+import asyncio
+import json
+import logging
+import re
+import threading
+import time
+import weakref
+
+import httpx
+import requests
+from django.core.cache import cache
+from google.auth import exceptions, transport
+from google.auth.transport import requests as google_requests
+from google.oauth2 import id_token
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+FETCH_TIMEOUT = 5
+REFRESH_AHEAD = 0.2
+
+MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def cache_lifetime(headers):
+    """Seconds a response may be reused, from Cache-Control max-age and Age."""
+    cache_control = headers.get("Cache-Control", "")
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0
+    match = MAX_AGE_RE.search(cache_control)
+    if not match:
+        return 0
+    try:
+        age = int(headers.get("Age", 0))
+    except ValueError:
+        age = 0
+    return max(0, int(match.group(1)) - age)
+
+
+class CachedResponse(transport.Response):
+    def __init__(self, data):
+        self._data = data
+
+    @property
+    def status(self):
+        return 200
+
+    @property
+    def headers(self):
+        return {"Content-Type": "application/json"}
+
+    @property
+    def data(self):
+        return self._data
+
+
+class StaticCertsRequest(transport.Request):
+    """A google.auth transport that answers every request with `data`."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def __call__(self, url, method="GET", body=None, headers=None, timeout=None, **kwargs):
+        return CachedResponse(self.data)
+
+
+class CachedCertsRequest(transport.Request):
+    """
+    A google.auth transport that serves `certs_url` from cache; any other
+    request goes straight through the pooled session.
+    """
+
+    def __init__(self, certs_url=GOOGLE_CERTS_URL, session=None):
+        self.certs_url = certs_url
+        self.session = session or requests.Session()
+        self.passthrough = google_requests.Request(session=self.session)
+        self.cache_key = f"google-certs:{certs_url}"
+        self.entry = None
+        self.lock = threading.Lock()
+        # asyncio locks belong to one event loop
+        self.async_locks = weakref.WeakKeyDictionary()
+        # Only guards `refreshing`; never held across a fetch, so requests
+        # don't wait on a background refresh.
+        self.refresh_lock = threading.Lock()
+        self.refreshing = False
+
+    def __call__(self, url, method="GET", body=None, headers=None, timeout=None, **kwargs):
+        if url != self.certs_url or method != "GET":
+            return self.passthrough(url, method=method, body=body, headers=headers, timeout=timeout, **kwargs)
+        return CachedResponse(self.certs()["data"])
+
+    def certs(self):
+        entry = self.current()
+        if entry is None:
+            with self.lock:
+                # Whoever held the lock may have fetched already.
+                entry = self.current() or self.fetch()
+        elif entry["refresh_at"] <= time.time():
+            self.refresh_in_background()
+        return entry
+
+    def current(self):
+        """The freshest unexpired entry, in-process first, then shared."""
+        now = time.time()
+        entry = self.entry
+        if entry is None or entry["expires_at"] <= now:
+            entry = cache.get(self.cache_key)
+            if entry is None or entry["expires_at"] <= now:
+                return None
+            self.entry = entry
+        return entry
+
+    async def acerts(self):
+        """certs() for async callers: waits on the event loop, not a thread."""
+        now = time.time()
+        entry = self.entry
+        if entry is not None and entry["expires_at"] > now:
+            if entry["refresh_at"] <= now:
+                self.refresh_in_background()
+            return entry
+        entry = await cache.aget(self.cache_key)
+        if entry is not None and entry["expires_at"] > now:
+            self.entry = entry
+            return entry
+
+        loop = asyncio.get_running_loop()
+        lock = self.async_locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            entry = self.entry
+            if entry is not None and entry["expires_at"] > time.time():
+                return entry
+            async with httpx.AsyncClient() as client:
+                response = await client.get(self.certs_url, timeout=FETCH_TIMEOUT)
+            entry = self.store(response.status_code, response.headers, response.content)
+        if entry["expires_at"] > entry["refresh_at"]:
+            await cache.aset(self.cache_key, entry, timeout=entry["expires_at"] - time.time())
+        return entry
+
+    def fetch(self):
+        response = self.session.get(self.certs_url, timeout=FETCH_TIMEOUT)
+        entry = self.store(response.status_code, response.headers, response.content)
+        if entry["expires_at"] > entry["refresh_at"]:
+            cache.set(self.cache_key, entry, timeout=entry["expires_at"] - time.time())
+        return entry
+
+    def store(self, status, headers, content):
+        """Keep a fetched response in-process for as long as it may be reused."""
+        if status != 200:
+            raise exceptions.TransportError(f"Could not fetch certificates at {self.certs_url}")
+        json.loads(content)  # never cache a body that won't parse
+
+        now = time.time()
+        lifetime = cache_lifetime(headers)
+        entry = {
+            "data": content,
+            "expires_at": now + lifetime,
+            "refresh_at": now + lifetime * (1 - REFRESH_AHEAD),
+        }
+        if lifetime:
+            self.entry = entry
+        return entry
+
+    def refresh_in_background(self):
+        with self.refresh_lock:
+            if self.refreshing:
+                return None
+            self.refreshing = True
+        thread = threading.Thread(target=self.refresh, name="google-certs-refresh", daemon=True)
+        thread.start()
+        return thread
+
+    def refresh(self):
+        try:
+            # Not under self.lock: logins keep using the current entry until
+            # this one replaces it.
+            self.fetch()
+        except Exception:
+            # The current certificates stay in use until they expire.
+            logger.warning("Refreshing Google certificates failed", exc_info=True)
+        finally:
+            self.refreshing = False
+
+
+class GoogleTokenVerifier:
+    def __init__(self, certs_url=GOOGLE_CERTS_URL, session=None):
+        self.request = CachedCertsRequest(certs_url, session)
+
+    def verify(self, token, audience, request=None):
+        """
+        Same checks as id_token.verify_oauth2_token. Raises ValueError or
+        google.auth.exceptions.GoogleAuthError if the token isn't valid.
+        """
+        idinfo = id_token.verify_token(
+            token, request or self.request, audience=audience, certs_url=self.request.certs_url
+        )
+        if idinfo["iss"] not in GOOGLE_ISSUERS:
+            raise exceptions.GoogleAuthError(f"Wrong issuer {idinfo['iss']!r}")
+        return idinfo
+
+    async def averify(self, token, audience):
+        entry = await self.request.acerts()
+        # The certificates are in hand: what's left is a local signature check.
+        return self.verify(token, audience, request=StaticCertsRequest(entry["data"]))
+
+
+_verifier = None
+_verifier_lock = threading.Lock()
+
+
+def get_verifier():
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                _verifier = GoogleTokenVerifier()
+    return _verifier
+
+
+def verify_google_id_token(token, audience):
+    """Verify with the process-wide verifier (and its cached certificates)."""
+    return get_verifier().verify(token, audience)
+
+
+async def averify_google_id_token(token, audience):
+    return await get_verifier().averify(token, audience)
@@ -0,0 +1,196 @@
+"""
+Background jobs (a transactional outbox).
+
+Callers enqueue() a Job row inside their own transaction, so a job exists
+only if the change that needed it committed, and the request returns as
+soon as that row is written. `manage.py run_jobs` drains the table:
+
+  - claim:  one conditional UPDATE stamps up to `batch_size` due jobs with
+            a fresh claim token, so concurrent workers never share a job
+            (no SELECT ... FOR UPDATE, which SQLite doesn't have).
+  - run:    claimed jobs are grouped by kind and each group is handed to
+            that kind's handler; email jobs share one backend connection.
+  - finish: successes are marked done in one UPDATE; failures go back to
+            pending with exponential backoff until max_attempts, then fail.
+
+Jobs left "running" by a worker that died are claimed again after
+LOCK_TIMEOUT.
+"""
+import random
+import time
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+EMAIL = "send_email"
+
+BATCH_SIZE = 100
+LOCK_TIMEOUT = timedelta(minutes=10)
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+
+
+def new_job(kind, payload, run_after=None, max_attempts=None):
+    job = Job(kind=kind, payload=payload)
+    if run_after is not None:
+        job.run_after = run_after
+    if max_attempts is not None:
+        job.max_attempts = max_attempts
+    return job
+
+
+def enqueue(kind, payload, run_after=None, max_attempts=None):
+    job = new_job(kind, payload, run_after, max_attempts)
+    job.save()
+    return job
+
+
+async def aenqueue(kind, payload, run_after=None, max_attempts=None):
+    job = new_job(kind, payload, run_after, max_attempts)
+    await job.asave()
+    return job
+
+
+def email_payload(subject, body, to, from_email=None):
+    return {
+        "subject": subject,
+        "body": body,
+        "from_email": from_email or settings.DEFAULT_FROM_EMAIL,
+        "to": list(to),
+    }
+
+
+def enqueue_email(subject, body, to, from_email=None):
+    return enqueue(EMAIL, email_payload(subject, body, to, from_email))
+
+
+async def aenqueue_email(subject, body, to, from_email=None):
+    return await aenqueue(EMAIL, email_payload(subject, body, to, from_email))
+
+
+def send_email_batch(jobs):
+    """
+    Send every job's message over one backend connection (for anymail, one
+    HTTP session). Returns {job id: error} for the messages that failed.
+    """
+    errors = {}
+    with get_connection() as mail_connection:
+        for job in jobs:
+            try:
+                EmailMessage(connection=mail_connection, **job.payload).send()
+            except Exception as exc:
+                errors[job.pk] = f"{type(exc).__name__}: {exc}"
+    return errors
+
+
+HANDLERS = {
+    EMAIL: send_email_batch,
+}
+
+
+def backoff(attempts):
+    """Delay before retry number `attempts`: doubling, capped, with jitter."""
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    return delay * random.uniform(1.0, 1.25)
+
+
+def claim(batch_size=BATCH_SIZE):
+    now = timezone.now()
+    due = Q(status=Job.STATUS_PENDING, run_after__lte=now) | Q(
+        status=Job.STATUS_RUNNING, locked_at__lt=now - LOCK_TIMEOUT
+    )
+    token = uuid.uuid4()
+    oldest = Job.objects.filter(due).order_by("run_after", "id").values("id")[:batch_size]
+    # `due` is repeated so a job another worker claimed meanwhile is skipped.
+    Job.objects.filter(due, pk__in=oldest).update(
+        status=Job.STATUS_RUNNING,
+        claim_token=token,
+        locked_at=now,
+        attempts=F("attempts") + 1,
+    )
+    return list(Job.objects.filter(claim_token=token).order_by("id"))
+
+
+def run_batch(jobs):
+    """Run claimed jobs and record the outcome. Returns the number that failed."""
+    by_kind = defaultdict(list)
+    for job in jobs:
+        by_kind[job.kind].append(job)
+
+    errors = {}
+    for kind, group in by_kind.items():
+        handler = HANDLERS.get(kind)
+        if handler is None:
+            errors.update({job.pk: f"No handler for job kind {kind!r}" for job in group})
+            continue
+        try:
+            errors.update(handler(group))
+        except Exception as exc:
+            errors.update({job.pk: f"{type(exc).__name__}: {exc}" for job in group})
+
+    now = timezone.now()
+    done = [job.pk for job in jobs if job.pk not in errors]
+    if done:
+        Job.objects.filter(pk__in=done).update(
+            status=Job.STATUS_DONE, finished_at=now, claim_token=None, last_error=""
+        )
+
+    failed = [job for job in jobs if job.pk in errors]
+    for job in failed:
+        job.last_error = errors[job.pk]
+        job.claim_token = None
+        if job.attempts >= job.max_attempts:
+            job.status = Job.STATUS_FAILED
+            job.finished_at = now
+        else:
+            job.status = Job.STATUS_PENDING
+            job.run_after = now + backoff(job.attempts)
+    if failed:
+        Job.objects.bulk_update(
+            failed, ["status", "last_error", "claim_token", "finished_at", "run_after"]
+        )
+    return len(failed)
+
+
+def work(batch_size=BATCH_SIZE, poll_interval=1.0, once=False, stop=None):
+    """
+    Claim and run batches until the queue is empty (once=True) or `stop`
+    (a threading.Event) is set. Returns the number of jobs processed.
+    """
+    processed = 0
+    while not (stop and stop.is_set()):
+        jobs = claim(batch_size)
+        if not jobs:
+            if once:
+                break
+            if stop:
+                stop.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+            continue
+        run_batch(jobs)
+        processed += len(jobs)
+    return processed
+
+
+def run_worker(batch_size=BATCH_SIZE, poll_interval=1.0, once=False, stop=None):
+    """Entry point for pool workers: work() on this thread's own connection."""
+    try:
+        return work(batch_size, poll_interval, once, stop)
+    finally:
+        connection.close()
+
+
+def init_worker_process():
+    # Spawned (not forked) processes start without Django configured.
+    import django
+
+    django.setup()
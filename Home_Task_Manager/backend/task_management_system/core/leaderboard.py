@@ -0,0 +1,104 @@
+"""
+Household points leaderboards.
+
+  - "all":   current balances (User.points_balance)
+  - "week":  points earned from tasks since local Monday midnight
+  - "month": points earned from tasks since the 1st of the local month
+
+Each board is one query: names are built and rows ranked in the database,
+and the windowed boards sum the ledger with a correlated subquery per user
+(core_points_user_created_idx). Boards are cached under the household's
+"points" version, so any balance change or user edit rebuilds them, and
+windowed boards also expire when their window rolls over.
+"""
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import F, IntegerField, OuterRef, Subquery, Sum, Value, Window
+from django.db.models.functions import Coalesce, Concat, NullIf, Trim
+from django.utils import timezone
+from django.utils.timezone import make_aware
+
+from .cache import household_cached, POINTS
+from .models import PointsLedgerEntry
+
+User = get_user_model()
+
+PERIODS = ("all", "week", "month")
+
+EARNING_REASONS = (PointsLedgerEntry.REASON_COMPLETION, PointsLedgerEntry.REASON_UNCOMPLETION)
+
+# Same result as get_full_name().strip() or username, computed in SQL.
+DISPLAY_NAME = Coalesce(
+    NullIf(Trim(Concat("first_name", Value(" "), "last_name")), Value("")),
+    "username",
+)
+
+
+def period_window(period, now=None):
+    """Return (start, end) of the current local week or month."""
+    today = timezone.localdate(now)
+    if period == "week":
+        first = today - timedelta(days=today.weekday())
+        following = first + timedelta(days=7)
+    else:
+        first = today.replace(day=1)
+        following = (first + timedelta(days=32)).replace(day=1)
+    return (
+        make_aware(datetime.combine(first, time.min)),
+        make_aware(datetime.combine(following, time.min)),
+    )
+
+
+def build_leaderboard(household_id, period, start=None):
+    users = User.objects.filter(household_id=household_id)
+
+    if period == "all":
+        rows = list(
+            users.annotate(
+                name=DISPLAY_NAME,
+                points=F("points_balance"),
+                household_total=Window(Sum("points_balance")),
+            )
+            .order_by("-points", "id")
+            .values("id", "name", "points", "role", "household_total")
+        )
+        total = rows[0]["household_total"] if rows else 0
+        for row in rows:
+            del row["household_total"]
+        return rows, total
+
+    earned = (
+        PointsLedgerEntry.objects.filter(
+            user_id=OuterRef("pk"), created_at__gte=start, reason__in=EARNING_REASONS
+        )
+        .order_by()
+        .values("user_id")
+        .annotate(total=Sum("delta"))
+        .values("total")
+    )
+    rows = list(
+        users.annotate(
+            name=DISPLAY_NAME,
+            points=Coalesce(Subquery(earned, output_field=IntegerField()), Value(0)),
+        )
+        .order_by("-points", "id")
+        .values("id", "name", "points", "role")
+    )
+    # Django can't put a window over this subquery aggregate; rows are few.
+    return rows, sum(row["points"] for row in rows)
+
+
+def household_leaderboard(household_id, period="all"):
+    """Return (leaderboard rows, household total) for `period`, cached."""
+    if period == "all":
+        name, start, timeout = "leaderboard:all", None, None
+    else:
+        start, end = period_window(period)
+        name = f"leaderboard:{period}:{start.date().isoformat()}"
+        timeout = max(1, int((end - timezone.now()).total_seconds()))
+
+    def build():
+        return build_leaderboard(household_id, period, start), timeout
+
+    return household_cached(household_id, name, build, scope=POINTS)
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import archive
+from core.models import Household
+
+
+class Command(BaseCommand):
+    help = (
+        "Move tasks completed more than --older-than-days ago to the archive table, "
+        "household by household in batches. Safe to interrupt and run again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=settings.TASK_ARCHIVE_AFTER_DAYS)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            help="Stop after this many batches in all; the next run carries on.",
+        )
+        parser.add_argument("--household", type=int, nargs="+", help="Only these household ids.")
+
+    def handle(self, *args, older_than_days, batch_size, max_batches, household, **options):
+        before = archive.cutoff(older_than_days)
+        households = Household.objects.order_by("pk").values_list("pk", flat=True)
+        if household:
+            households = households.filter(pk__in=household)
+
+        moved = batches = 0
+        for household_id in households.iterator():
+            while max_batches is None or batches < max_batches:
+                count = archive.archive_batch(household_id, before, batch_size)
+                if not count:
+                    break
+                moved += count
+                batches += 1
+            if max_batches is not None and batches >= max_batches:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} tasks completed before {before:%Y-%m-%d}."))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import rollups
+from core.cache import bump_household_version
+from core.models import Household
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the per-day completion rollups from the completed tasks, archived ones included, "
+        "a batch of households at a time. Safe to run again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Households per transaction.")
+        parser.add_argument("--household", type=int, nargs="+", help="Only these household ids.")
+
+    def handle(self, *args, batch_size, household, **options):
+        households = Household.objects.order_by("pk")
+        if household:
+            households = households.filter(pk__in=household)
+
+        done = 0
+        last_id = 0
+        while True:
+            ids = list(households.filter(pk__gt=last_id).values_list("pk", flat=True)[:batch_size])
+            if not ids:
+                break
+            last_id = ids[-1]
+            with transaction.atomic():
+                rollups.rebuild(ids)
+            for household_id in ids:
+                bump_household_version(household_id)
+            done += len(ids)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt completion rollups for {done} households."))
@@ -0,0 +1,347 @@
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from core import rollups
+from core.models import (
+    Category,
+    Household,
+    HouseholdInvite,
+    Member,
+    Pet,
+    PointsLedgerEntry,
+    RewardRedemption,
+    Task,
+)
+from core.points import COMPLETION_POINTS
+from core.search import FTS_TABLE, ensure_sqlite_triggers
+
+User = get_user_model()
+
+CHORES = [
+    "Laundry", "Dishes", "Vacuum living room", "Take out bins", "Water plants", "Walk the dog",
+    "Feed the cat", "Clean bathroom", "Grocery shopping", "Mow the lawn", "Change bed sheets",
+    "Homework check", "Pay bills", "Cook dinner", "Tidy bedroom", "Clean windows", "Empty dishwasher",
+    "Sweep the porch", "Clean the fridge", "Iron shirts", "Fold towels", "Vet appointment",
+]
+DESCRIPTIONS = ["", "", "", "Remember to check the list on the fridge.", "Use the eco setting.",
+                "Before the weekend please!", "Ask if you need help."]
+CATEGORIES = ["Kitchen", "Cleaning", "Garden", "Pets", "Errands", "School", "Laundry", "Bills"]
+PETS = [("Rex", "Dog", "🐶"), ("Tom", "Cat", "🐱"), ("Nemo", "Fish", "🐟"), ("Coco", "Rabbit", "🐰")]
+REWARDS = ["Movie night", "Extra screen time", "Ice cream", "Pocket money", "Stay up late"]
+PRIORITIES = ["low"] * 6 + ["med"] * 3 + ["high"]
+
+TASK_COLUMNS = [
+    "id", "household_id", "title", "description", "category_id", "assignee_member_id", "assignee_pet_id",
+    "due_date", "start_at", "priority", "completed", "completed_at", "created_at", "updated_at",
+    "repeat", "repeat_interval", "repeat_weekdays", "repeat_skipped",
+]
+LEDGER_COLUMNS = ["household_id", "user_id", "task_id", "delta", "reason", "note", "created_at"]
+
+# PostgreSQL allows 65535 parameters per statement.
+MAX_PARAMS = 65535
+
+
+def insert_rows(model, columns, rows, batch_size):
+    """
+    INSERT plain tuples. For the big tables: bulk_create spends most of its
+    time preparing each value of each model instance.
+    """
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    names = ", ".join(qn(column) for column in columns)
+    placeholders = f"({', '.join(['%s'] * len(columns))})"
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.executemany(f"INSERT INTO {table} ({names}) VALUES {placeholders}", rows)
+            return
+        size = max(1, min(batch_size, MAX_PARAMS // len(columns)))
+        for start in range(0, len(rows), size):
+            batch = rows[start:start + size]
+            cursor.execute(
+                f"INSERT INTO {table} ({names}) VALUES {', '.join([placeholders] * len(batch))}",
+                [value for row in batch for value in row],
+            )
+
+
+@contextmanager
+def historical_timestamps(*models):
+    """Let bulk_create keep the created_at values we set."""
+    fields = [field for model in models for field in model._meta.concrete_fields
+              if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+@contextmanager
+def fts_insert_trigger_paused():
+    """
+    On SQLite, index the new tasks in one FTS rebuild at the end instead of
+    row by row: the insert trigger is dropped and ensure_sqlite_triggers()
+    puts it back and rebuilds.
+    """
+    if connection.vendor != "sqlite" or FTS_TABLE not in connection.introspection.table_names():
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("DROP TRIGGER IF EXISTS core_task_fts_insert")
+    try:
+        yield
+    finally:
+        ensure_sqlite_triggers(connection)
+
+
+class Generator:
+    """
+    Builds households in chunks. Everything random comes from one seeded
+    Random, so the same seed and arguments give the same data.
+    """
+
+    def __init__(self, rng, tasks_per_household, days, password_hash, batch_size):
+        self.rng = rng
+        self.tasks_per_household = tasks_per_household
+        self.days = days
+        self.password_hash = password_hash
+        self.batch_size = batch_size
+        self.now = timezone.now()
+        # Task rows are built from naive UTC datetimes; SQLite stores those as str().
+        self.naive_now = timezone.make_naive(self.now, dt_timezone.utc)
+        if connection.vendor == "sqlite":
+            self.adapt = str
+        else:
+            adapt = connection.ops.adapt_datetimefield_value
+            self.adapt = lambda value: adapt(timezone.make_aware(value, dt_timezone.utc))
+        # Generated tasks don't repeat.
+        self.empty_list = Task._meta.get_field("repeat_skipped").get_db_prep_save([], connection)
+        self.counts = dict.fromkeys(
+            ["households", "users", "members", "pets", "categories", "tasks", "completions", "redemptions",
+             "invites"], 0
+        )
+
+    def some_time_ago(self, max_days):
+        return self.now - timedelta(seconds=self.rng.uniform(0, max_days * 86400))
+
+    def generate(self, n):
+        """Create `n` households and everything in them. Run inside a transaction."""
+        rng = self.rng
+        households = Household.objects.bulk_create(
+            [Household(name=f"{rng.choice(['The', 'Team', 'Casa'])} Household {i}") for i in range(n)]
+        )
+
+        # People: an admin, up to two more adults, up to three children.
+        users = []
+        for household in households:
+            roles = ["admin"] + ["adult"] * rng.randint(0, 2) + ["child"] * rng.choices([0, 1, 2, 3], [3, 3, 3, 1])[0]
+            for i, role in enumerate(roles):
+                name = f"hh{household.pk}-{role}{i}"
+                users.append(User(
+                    username=name,
+                    email=f"{name}@example.com",
+                    password=self.password_hash,
+                    household=household,
+                    role=role,
+                    first_name=role.capitalize(),
+                    date_joined=self.some_time_ago(self.days),
+                ))
+        User.objects.bulk_create(users, batch_size=self.batch_size)
+
+        members = [Member(household_id=user.household_id, user=user, name=user.username) for user in users]
+        members += [Member(household=household, name="Grandma") for household in households if rng.random() < 0.3]
+        Member.objects.bulk_create(members, batch_size=self.batch_size)
+        pets = Pet.objects.bulk_create(
+            [Pet(household=household, name=name, species=species, icon=icon)
+             for household in households
+             for name, species, icon in rng.sample(PETS, rng.choices([0, 1, 2, 3], [3, 4, 2, 1])[0])],
+            batch_size=self.batch_size,
+        )
+        categories = Category.objects.bulk_create(
+            [Category(household=household, name=name)
+             for household in households for name in rng.sample(CATEGORIES, rng.randint(3, len(CATEGORIES)))],
+            batch_size=self.batch_size,
+        )
+
+        group = {household.pk: ([], [], [], []) for household in households}
+        for user in users:
+            group[user.household_id][0].append(user)
+        for member in members:
+            group[member.household_id][1].append(member)
+        for pet in pets:
+            group[pet.household_id][2].append(pet.pk)
+        for category in categories:
+            group[category.household_id][3].append(category.pk)
+
+        next_id = (Task.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+        tasks, entries, balances = [], [], {}
+        for household in households:
+            people, household_members, pet_ids, category_ids = group[household.pk]
+            # Who ticks off tasks nobody was assigned: an adult.
+            grown_ups = [user for user in people if user.role != "child"]
+            count = rng.randint(self.tasks_per_household // 2, self.tasks_per_household * 3 // 2)
+            for _ in range(count):
+                row, credited = self.task(next_id, household.pk, household_members, pet_ids, category_ids, grown_ups)
+                tasks.append(row)
+                if credited is not None:
+                    entries.append((household.pk, credited.pk, next_id, COMPLETION_POINTS,
+                                    PointsLedgerEntry.REASON_COMPLETION, "", row[11]))
+                    balances[credited] = balances.get(credited, 0) + COMPLETION_POINTS
+                next_id += 1
+        insert_rows(Task, TASK_COLUMNS, tasks, self.batch_size)
+        insert_rows(PointsLedgerEntry, LEDGER_COLUMNS, entries, self.batch_size)
+
+        # Redemptions spend part of what was earned.
+        redemptions = []
+        for user in balances:
+            for _ in range(rng.randint(0, 4)):
+                amount = rng.choice([10, 20, 50, 100])
+                if amount > balances[user]:
+                    break
+                balances[user] -= amount
+                redemptions.append(RewardRedemption(
+                    household_id=user.household_id, user=user, points_redeemed=amount,
+                    note=rng.choice(REWARDS), created_at=self.some_time_ago(self.days / 2),
+                ))
+        RewardRedemption.objects.bulk_create(redemptions, batch_size=self.batch_size)
+        PointsLedgerEntry.objects.bulk_create(
+            [PointsLedgerEntry(user=r.user, household_id=r.household_id, redemption=r, delta=-r.points_redeemed,
+                               reason=PointsLedgerEntry.REASON_REDEMPTION, note=r.note, created_at=r.created_at)
+             for r in redemptions],
+            batch_size=self.batch_size,
+        )
+        for user, balance in balances.items():
+            user.points_balance = balance
+        User.objects.bulk_update(list(balances), ["points_balance"], batch_size=self.batch_size)
+        rollups.rebuild([household.pk for household in households])
+
+        invites = []
+        for household in households:
+            for _ in range(rng.choices([0, 1, 2], [5, 3, 1])[0]):
+                created = self.some_time_ago(60)
+                invites.append(HouseholdInvite(
+                    household=household,
+                    email=f"guest{rng.randrange(10 ** 9)}@example.com",
+                    role=rng.choice(["adult", "child"]),
+                    token=uuid.UUID(int=rng.getrandbits(128), version=4),
+                    created_at=created,
+                    expires_at=created + timedelta(days=7),
+                    accepted_at=created + timedelta(hours=rng.randint(1, 72)) if rng.random() < 0.5 else None,
+                ))
+        HouseholdInvite.objects.bulk_create(invites, batch_size=self.batch_size)
+
+        for name, number in (("households", len(households)), ("users", len(users)), ("members", len(members)),
+                             ("pets", len(pets)), ("categories", len(categories)), ("tasks", len(tasks)),
+                             ("completions", len(entries)), ("redemptions", len(redemptions)),
+                             ("invites", len(invites))):
+            self.counts[name] += number
+
+    def task(self, pk, household_id, members, pet_ids, category_ids, grown_ups):
+        """A task row (TASK_COLUMNS), and the user credited with completing it, if anyone."""
+        rng = self.rng
+        now = self.naive_now
+        created = now - timedelta(seconds=rng.random() * self.days * 86400)
+        due = created + timedelta(seconds=rng.random() * 14 * 86400) if rng.random() < 0.95 else None
+        start = due - timedelta(hours=rng.choice((1, 2, 4))) if due is not None and rng.random() < 0.2 else None
+
+        member = pet_id = None
+        roll = rng.random()
+        if roll < 0.65 and members:
+            member = rng.choice(members)
+        elif roll < 0.8 and pet_ids:
+            pet_id = rng.choice(pet_ids)
+
+        completed = rng.random() < (0.85 if due is not None and due < now else 0.1)
+        completed_at = credited = None
+        if completed:
+            latest = min(now, (due or created) + timedelta(days=2))
+            completed_at = created + (latest - created) * rng.random()
+            if member is not None and member.user is not None:
+                credited = member.user
+            elif grown_ups:
+                credited = rng.choice(grown_ups)
+
+        adapt = self.adapt
+        created = adapt(created)
+        completed_at = adapt(completed_at) if completed_at is not None else None
+        return (
+            pk,
+            household_id,
+            rng.choice(CHORES),
+            rng.choice(DESCRIPTIONS),
+            rng.choice(category_ids) if category_ids and rng.random() < 0.8 else None,
+            member.pk if member is not None else None,
+            pet_id,
+            adapt(due) if due is not None else None,
+            adapt(start) if start is not None else None,
+            rng.choice(PRIORITIES),
+            completed,
+            completed_at,
+            created,
+            completed_at or created,
+            "",
+            1,
+            self.empty_list,
+            self.empty_list,
+        ), credited
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic households (users, members, pets, categories, tasks with completion history, "
+        "redemptions and invites) for load and scale testing. The same --seed gives the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--households", type=int, default=100)
+        parser.add_argument("--tasks-per-household", type=int, default=1000,
+                            help="Average; each household gets between half and one and a half times this.")
+        parser.add_argument("--days", type=int, default=365, help="How far back the history goes.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--password", default="pass12345", help="Password of every generated user.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT.")
+        parser.add_argument("--chunk-tasks", type=int, default=100000,
+                            help="Roughly how many tasks to generate per transaction.")
+
+    def handle(self, *args, households, tasks_per_household, days, seed, password, batch_size, chunk_tasks,
+               **options):
+        generator = Generator(random.Random(seed), tasks_per_household, days, make_password(password), batch_size)
+        per_chunk = max(1, chunk_tasks // max(1, tasks_per_household))
+        started = time.perf_counter()
+
+        with historical_timestamps(RewardRedemption, PointsLedgerEntry, HouseholdInvite), \
+                fts_insert_trigger_paused():
+            done = 0
+            while done < households:
+                n = min(per_chunk, households - done)
+                with transaction.atomic():
+                    generator.generate(n)
+                done += n
+                self.stdout.write(
+                    f"{done}/{households} households, {generator.counts['tasks']} tasks "
+                    f"({time.perf_counter() - started:.1f}s)"
+                )
+            self.stdout.write("Indexing...")
+
+        with connection.cursor() as cursor:
+            # Tasks were inserted with explicit ids.
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Task]):
+                cursor.execute(sql)
+            cursor.execute("ANALYZE")
+
+        summary = ", ".join(f"{number} {name}" for name, number in generator.counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Created {summary} in {time.perf_counter() - started:.1f}s."))
+        self.stdout.write(f"Every user's password is {password!r}; usernames look like hh<household id>-admin0.")
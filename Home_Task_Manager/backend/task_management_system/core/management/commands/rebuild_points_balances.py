@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+
+from core.models import PointsLedgerEntry
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Rebuild users' points_balance from the points ledger, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report balances that disagree with the ledger.",
+        )
+
+    def handle(self, *args, batch_size, dry_run, **options):
+        checked = fixed = 0
+        last_id = 0
+
+        while True:
+            with transaction.atomic():
+                # Lock the batch's user rows (on databases that support it) so
+                # points can't move between summing the ledger and writing.
+                users = list(
+                    User.objects.select_for_update()
+                    .filter(pk__gt=last_id)
+                    .order_by("pk")
+                    .only("pk", "points_balance")[:batch_size]
+                )
+                if not users:
+                    break
+                last_id = users[-1].pk
+
+                totals = dict(
+                    PointsLedgerEntry.objects.filter(user_id__in=[u.pk for u in users])
+                    .values_list("user_id")
+                    .annotate(total=Sum("delta"))
+                    .order_by()
+                )
+
+                wrong = []
+                for user in users:
+                    expected = totals.get(user.pk, 0)
+                    if user.points_balance != expected:
+                        self.stdout.write(f"user {user.pk}: balance {user.points_balance}, ledger {expected}")
+                        user.points_balance = expected
+                        wrong.append(user)
+
+                if wrong and not dry_run:
+                    User.objects.bulk_update(wrong, ["points_balance"])
+
+            checked += len(users)
+            fixed += len(wrong)
+
+        verb = "would fix" if dry_run else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} users, {verb} {fixed}."))
@@ -0,0 +1,66 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (outgoing email) with a pool of workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--pool",
+            choices=["thread", "process"],
+            default="thread",
+            help="Threads suit I/O-bound jobs such as email; processes sidestep the GIL.",
+        )
+        parser.add_argument("--batch-size", type=int, default=jobs.BATCH_SIZE)
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait before checking an empty queue again.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty instead of polling for new jobs.",
+        )
+
+    def handle(self, *args, workers, pool, batch_size, poll_interval, once, **options):
+        if workers <= 1:
+            processed = jobs.work(batch_size, poll_interval, once)
+        elif pool == "thread":
+            processed = self.run_threads(workers, batch_size, poll_interval, once)
+        else:
+            processed = self.run_processes(workers, batch_size, poll_interval, once)
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} jobs."))
+
+    def run_threads(self, workers, batch_size, poll_interval, once):
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jobs") as executor:
+            futures = [
+                executor.submit(jobs.run_worker, batch_size, poll_interval, once, stop)
+                for _ in range(workers)
+            ]
+            try:
+                return sum(future.result() for future in futures)
+            except KeyboardInterrupt:
+                # Let in-flight batches finish and record their outcome.
+                stop.set()
+                return sum(future.result() for future in futures)
+
+    def run_processes(self, workers, batch_size, poll_interval, once):
+        # Children must not share the parent's database connections.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=jobs.init_worker_process) as executor:
+            futures = [
+                executor.submit(jobs.run_worker, batch_size, poll_interval, once)
+                for _ in range(workers)
+            ]
+            return sum(future.result() for future in futures)
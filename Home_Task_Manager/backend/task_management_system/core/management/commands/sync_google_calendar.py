@@ -0,0 +1,59 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.calendar_inbound import PAGE_SIZE, CalendarPull
+from core.calendar_sync import CalendarClient, CalendarSyncEngine, MAX_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        "Pull changes made in Google Calendar since the last sync, then push tasks "
+        "waiting for sync (google_sync_status=pending)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--direction", choices=["both", "pull", "push"], default="both")
+        parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="Events per events.list page.")
+        parser.add_argument("--batch-size", type=int, default=MAX_BATCH_SIZE)
+        parser.add_argument("--workers", type=int, default=4, help="Batch requests in flight at once.")
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=getattr(settings, "GOOGLE_CALENDAR_RATE_LIMIT", 10.0),
+            help="Calendar API calls per second; 0 for no limit.",
+        )
+        parser.add_argument("--max-attempts", type=int, default=5)
+        parser.add_argument("--limit", type=int, default=None, help="Stop after this many tasks.")
+        parser.add_argument(
+            "--retry-errors",
+            action="store_true",
+            help="Also retry tasks whose last sync failed.",
+        )
+
+    def handle(self, *args, direction, page_size, batch_size, workers, rate, max_attempts, limit, retry_errors,
+               **options):
+        client = CalendarClient.from_settings(rate=rate or None, pool_size=workers)
+
+        if direction in ("both", "pull"):
+            started = time.perf_counter()
+            stats = CalendarPull(client, page_size=page_size, max_attempts=max_attempts).run()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(self.style.SUCCESS(
+                f"Pulled {stats['events']} changed events from {stats['calendars']} calendars: "
+                f"{stats['updated']} tasks updated, {stats['unlinked']} unlinked, "
+                f"{stats['full_resyncs']} full resyncs ({elapsed:.1f}s)."
+            ))
+        if direction == "pull":
+            return
+
+        engine = CalendarSyncEngine(client, batch_size=batch_size, workers=workers, max_attempts=max_attempts)
+        started = time.perf_counter()
+        stats = engine.run(limit=limit, retry_errors=retry_errors)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Synced {stats['synced']} tasks, {stats['failed']} failed, "
+            f"in {stats['batches']} batch requests ({elapsed:.1f}s)."
+        ))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_task_household_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='core_task_hh_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['household', '-created_at', '-id'], name='core_task_hh_created_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, OperationalError
+
+from core.search import BACKENDS
+
+
+def create_search_index(apps, schema_editor):
+    backend = BACKENDS.get(schema_editor.connection.vendor)
+    if backend is None:
+        return
+    try:
+        backend().setup(schema_editor)
+    except OperationalError:
+        # e.g. SQLite built without FTS5: search falls back to icontains.
+        if schema_editor.connection.vendor != "sqlite":
+            raise
+
+
+def drop_search_index(apps, schema_editor):
+    backend = BACKENDS.get(schema_editor.connection.vendor)
+    if backend is not None:
+        backend().teardown(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_task_created_keyset_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def seed_opening_balances(apps, schema_editor):
+    """
+    Balances earned before the ledger existed become one opening entry per
+    user, so that balance == sum(ledger) holds from the start.
+    """
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    PointsLedgerEntry = apps.get_model("core", "PointsLedgerEntry")
+
+    users = User.objects.exclude(points_balance=0).values_list("id", "household_id", "points_balance")
+    PointsLedgerEntry.objects.bulk_create(
+        [
+            PointsLedgerEntry(
+                user_id=user_id,
+                household_id=household_id,
+                delta=balance,
+                reason="adjustment",
+                note="Opening balance",
+            )
+            for user_id, household_id, balance in users.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+def drop_opening_balances(apps, schema_editor):
+    PointsLedgerEntry = apps.get_model("core", "PointsLedgerEntry")
+    PointsLedgerEntry.objects.filter(reason="adjustment", note="Opening balance").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_points_ledger'),
+        ('users', '0004_user_points_balance'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_opening_balances, drop_opening_balances),
+    ]
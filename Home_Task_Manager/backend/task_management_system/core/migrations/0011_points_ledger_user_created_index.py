@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_seed_points_ledger'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pointsledgerentry',
+            index=models.Index(fields=['user', 'created_at'], name='core_points_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_job_queue'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='google_sync_status',
+            field=models.CharField(blank=True, help_text='linked | pending | syncing | synced | error', max_length=32, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('google_sync_status', 'pending')), fields=['id'], name='core_task_sync_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:48
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_calendar_sync_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='household',
+            name='change_seq',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='SyncChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=16)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('seq', models.PositiveBigIntegerField()),
+                ('deleted', models.BooleanField(default=False)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('household', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.household')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['household', 'seq'], name='core_syncchange_hh_seq_idx')],
+                'constraints': [models.UniqueConstraint(fields=('household', 'kind', 'object_id'), name='core_syncchange_object_uniq')],
+            },
+        ),
+    ]
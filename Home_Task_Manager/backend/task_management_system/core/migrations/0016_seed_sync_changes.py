@@ -0,0 +1,47 @@
+from collections import defaultdict
+
+from django.db import migrations
+
+# Referenced objects first, so a client applying the first pages in order
+# has a task's category and assignees before the task.
+SEEDED = [("category", "Category"), ("member", "Member"), ("pet", "Pet"), ("task", "Task")]
+
+
+def seed_changes(apps, schema_editor):
+    """
+    Objects created before change tracking get one change each, so syncing
+    from cursor 0 downloads the whole household.
+    """
+    Household = apps.get_model("core", "Household")
+    SyncChange = apps.get_model("core", "SyncChange")
+
+    seqs = defaultdict(int)
+    batch = []
+    for kind, model_name in SEEDED:
+        model = apps.get_model("core", model_name)
+        for pk, household_id in model.objects.order_by("pk").values_list("pk", "household_id").iterator():
+            seqs[household_id] += 1
+            batch.append(SyncChange(household_id=household_id, kind=kind, object_id=pk, seq=seqs[household_id]))
+            if len(batch) >= 1000:
+                SyncChange.objects.bulk_create(batch)
+                batch = []
+    SyncChange.objects.bulk_create(batch)
+
+    for household_id, seq in seqs.items():
+        Household.objects.filter(pk=household_id).update(change_seq=seq)
+
+
+def drop_changes(apps, schema_editor):
+    apps.get_model("core", "SyncChange").objects.all().delete()
+    apps.get_model("core", "Household").objects.update(change_seq=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_sync_changes'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_changes, drop_changes),
+    ]
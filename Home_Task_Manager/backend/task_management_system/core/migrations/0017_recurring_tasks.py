@@ -0,0 +1,63 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:44
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_seed_sync_changes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='occurrence_at',
+            field=models.DateTimeField(blank=True, help_text='the series due date this row replaces', null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='repeat',
+            field=models.CharField(blank=True, choices=[('', 'none'), ('daily', 'daily'), ('weekly', 'weekly'), ('monthly', 'monthly')], default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='repeat_count',
+            field=models.PositiveIntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(1000)]),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='repeat_interval',
+            field=models.PositiveSmallIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='repeat_skipped',
+            field=models.JSONField(blank=True, default=list, help_text='deleted occurrences'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='repeat_until',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='repeat_weekdays',
+            field=models.JSONField(blank=True, default=list, help_text='0 = Monday; weekly series only'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='series',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='core.task'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('repeat', ''), _negated=True), fields=['household', 'due_date'], name='core_task_hh_series_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(fields=('series', 'occurrence_at'), name='core_task_series_occurrence_uniq'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:59
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_recurring_tasks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='household',
+            name='archived_completed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('due_date', models.DateTimeField(blank=True, null=True)),
+                ('priority', models.CharField(choices=[('low', 'low'), ('med', 'med'), ('high', 'high')], default='low', max_length=10)),
+                ('completed', models.BooleanField(default=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('start_at', models.DateTimeField(blank=True, null=True)),
+                ('google_calendar_id', models.CharField(blank=True, max_length=255, null=True)),
+                ('google_event_id', models.CharField(blank=True, max_length=255, null=True)),
+                ('google_last_synced_at', models.DateTimeField(blank=True, null=True)),
+                ('google_sync_status', models.CharField(blank=True, max_length=32, null=True)),
+                ('google_sync_error', models.TextField(blank=True, null=True)),
+                ('repeat', models.CharField(blank=True, default='', max_length=10)),
+                ('repeat_interval', models.PositiveSmallIntegerField(default=1)),
+                ('repeat_weekdays', models.JSONField(blank=True, default=list)),
+                ('repeat_until', models.DateField(blank=True, null=True)),
+                ('repeat_count', models.PositiveIntegerField(blank=True, null=True)),
+                ('repeat_skipped', models.JSONField(blank=True, default=list)),
+                ('occurrence_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('assignee_member', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.member')),
+                ('assignee_pet', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.pet')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.category')),
+                ('household', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.household')),
+                ('series', models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='archived_occurrences', to='core.task')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='pointsledgerentry',
+            name='archived_task',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.archivedtask'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['household', '-created_at', '-id'], name='core_archtask_hh_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['series', 'occurrence_at'], name='core_archtask_series_idx'),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:41
+
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Coalesce, TruncDate
+
+COMPLETION_POINTS = 10
+
+
+def clear_rollups(apps, schema_editor):
+    apps.get_model("core", "CompletionRollup").objects.all().delete()
+
+
+def seed_rollups(apps, schema_editor):
+    """
+    Count every completed task, hot or archived, on the local day it was
+    completed, whether or not the ledger saw it complete: tasks completed
+    before the ledger existed, tasks stored completed, and the archived
+    ones 0019 dropped Household.archived_completed for (that counter was
+    bumped by exactly the rows each archive batch copied).
+    """
+    CompletionRollup = apps.get_model("core", "CompletionRollup")
+    totals = Counter()
+    for name in ("Task", "ArchivedTask"):
+        rows = (
+            apps.get_model("core", name).objects.filter(completed=True)
+            .annotate(day=TruncDate(Coalesce("completed_at", "created_at")))
+            .values_list("household_id", "assignee_member_id", "day")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        for household_id, member_id, day, count in rows.iterator():
+            totals[(household_id, member_id, day)] += count
+    CompletionRollup.objects.bulk_create(
+        [
+            CompletionRollup(household_id=household_id, member_id=member_id, day=day, completed=completed,
+                             points=completed * COMPLETION_POINTS)
+            for (household_id, member_id, day), completed in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_completion_rollups'),
+    ]
+
+    operations = [
+        # The old rows were per-user ledger sums; they are recounted from the tasks below.
+        migrations.RunPython(clear_rollups, clear_rollups),
+        migrations.RemoveConstraint(
+            model_name='completionrollup',
+            name='core_rollup_hh_day_user_uniq',
+        ),
+        migrations.RemoveField(
+            model_name='completionrollup',
+            name='user',
+        ),
+        migrations.AddField(
+            model_name='completionrollup',
+            name='member',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='completion_rollups', to='core.member'),
+        ),
+        migrations.AddConstraint(
+            model_name='completionrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('member__isnull', False)), fields=('household', 'day', 'member'), name='core_rollup_hh_day_member_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='completionrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('member__isnull', True)), fields=('household', 'day'), name='core_rollup_hh_day_unassigned_uniq'),
+        ),
+        migrations.RunPython(seed_rollups, clear_rollups),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_completion_rollups_by_member'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedtask',
+            name='google_sync_claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='google_sync_claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
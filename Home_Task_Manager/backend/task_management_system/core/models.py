@@ -1,4 +1,6 @@
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Q
 import uuid
 from django.utils import timezone
 from datetime import timedelta
@@ -6,6 +8,8 @@ from django.conf import settings
 
 class Household(models.Model):
     name = models.CharField(max_length=120)
+    # Last sequence number handed out to a SyncChange (see core.changes)
+    change_seq = models.PositiveBigIntegerField(default=0)
 
     def __str__(self):
         return self.name
@@ -22,6 +26,11 @@ class Member(models.Model):
     name = models.CharField(max_length=120)
     avatar_url = models.URLField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["household", "name"], name="core_member_hh_name_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -31,6 +40,11 @@ class Pet(models.Model):
     species = models.CharField(max_length=40, default='Dog')
     icon = models.CharField(max_length=10, blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["household", "name"], name="core_pet_hh_name_idx"),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.species})"
 
@@ -38,10 +52,36 @@ class Category(models.Model):
     household = models.ForeignKey(Household, on_delete=models.CASCADE)
     name = models.CharField(max_length=60)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["household", "name"], name="core_category_hh_name_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
+class TaskQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        # No post_save for these: count the completed ones here (core.rollups imports this module).
+        from . import rollups
+        rollups.record(objs)
+        return objs
+
+
 class Task(models.Model):
+    # google_sync_status values (see core.calendar_sync)
+    SYNC_LINKED = "linked"
+    SYNC_PENDING = "pending"
+    SYNC_SYNCING = "syncing"
+    SYNC_SYNCED = "synced"
+    SYNC_ERROR = "error"
+
+    # repeat values (see core.recurrence)
+    REPEAT_DAILY = "daily"
+    REPEAT_WEEKLY = "weekly"
+    REPEAT_MONTHLY = "monthly"
+
     household = models.ForeignKey(Household, on_delete=models.CASCADE)
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
@@ -66,9 +106,125 @@ class Task(models.Model):
         max_length=32,
         null=True,
         blank=True,
-        help_text="linked | pending | synced | error",
+        help_text="linked | pending | syncing | synced | error",
     )
     google_sync_error = models.TextField(null=True, blank=True)
+    # When a sync run claimed the task ("syncing"); see core.calendar_sync
+    google_sync_claimed_at = models.DateTimeField(null=True, blank=True)
+
+    # Recurrence (see core.recurrence). A task with a repeat rule is a series
+    # standing for all of its occurrences; only occurrences that have been
+    # completed or edited are stored, as rows pointing back at the series.
+    repeat = models.CharField(
+        max_length=10,
+        choices=[('', 'none'), ('daily', 'daily'), ('weekly', 'weekly'), ('monthly', 'monthly')],
+        blank=True,
+        default='',
+    )
+    repeat_interval = models.PositiveSmallIntegerField(default=1, validators=[MinValueValidator(1)])
+    repeat_weekdays = models.JSONField(default=list, blank=True, help_text="0 = Monday; weekly series only")
+    repeat_until = models.DateField(null=True, blank=True)
+    repeat_count = models.PositiveIntegerField(
+        null=True, blank=True, validators=[MinValueValidator(1), MaxValueValidator(1000)]
+    )
+    repeat_skipped = models.JSONField(default=list, blank=True, help_text="deleted occurrences")
+    # Indexed by core_task_series_occurrence_uniq
+    series = models.ForeignKey(
+        "self", on_delete=models.CASCADE, null=True, blank=True, related_name="occurrences", db_index=False
+    )
+    occurrence_at = models.DateTimeField(null=True, blank=True, help_text="the series due date this row replaces")
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["series", "occurrence_at"], name="core_task_series_occurrence_uniq"),
+        ]
+        # Every hot query is household-scoped first, so household leads each index.
+        indexes = [
+            # TaskViewSet list ordering and keyset pagination on (created_at, id)
+            models.Index(fields=["household", "-created_at", "-id"], name="core_task_hh_created_idx"),
+            # Dashboard overdue / upcoming lists; only open tasks are indexed
+            models.Index(
+                fields=["household", "due_date"],
+                name="core_task_hh_open_due_idx",
+                condition=Q(completed=False),
+            ),
+            # Calendar range queries (start_at / due_date overlap)
+            models.Index(fields=["household", "due_date"], name="core_task_hh_due_idx"),
+            models.Index(fields=["household", "start_at"], name="core_task_hh_start_idx"),
+            # Dashboard "completed this week"; only completed rows are indexed
+            models.Index(
+                fields=["household", "completed_at"],
+                name="core_task_hh_completed_at_idx",
+                condition=Q(completed=True),
+            ),
+            # Outbound calendar sync queue; only tasks waiting to be pushed
+            models.Index(
+                fields=["id"],
+                name="core_task_sync_pending_idx",
+                condition=Q(google_sync_status="pending"),
+            ),
+            # Series to expand in calendar and dashboard windows
+            models.Index(
+                fields=["household", "due_date"],
+                name="core_task_hh_series_idx",
+                condition=~Q(repeat=""),
+            ),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class ArchivedTask(models.Model):
+    """
+    A completed task moved out of core_task by core.archive, keeping its id
+    and every column. Read-only history: listed by TaskViewSet with
+    ?include_archived=true, and still linked from its points ledger entries
+    (PointsLedgerEntry.archived_task).
+    """
+    id = models.BigIntegerField(primary_key=True)
+    household = models.ForeignKey(Household, on_delete=models.CASCADE)
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
+    assignee_member = models.ForeignKey(Member, on_delete=models.SET_NULL, null=True, blank=True)
+    assignee_pet = models.ForeignKey(Pet, on_delete=models.SET_NULL, null=True, blank=True)
+    due_date = models.DateTimeField(null=True, blank=True)
+    priority = models.CharField(max_length=10, choices=[('low','low'),('med','med'),('high','high')], default='low')
+    completed = models.BooleanField(default=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    start_at = models.DateTimeField(null=True, blank=True)
+    google_calendar_id = models.CharField(max_length=255, null=True, blank=True)
+    google_event_id = models.CharField(max_length=255, null=True, blank=True)
+    google_last_synced_at = models.DateTimeField(null=True, blank=True)
+    google_sync_status = models.CharField(max_length=32, null=True, blank=True)
+    google_sync_error = models.TextField(null=True, blank=True)
+    google_sync_claimed_at = models.DateTimeField(null=True, blank=True)
+    repeat = models.CharField(max_length=10, blank=True, default='')
+    repeat_interval = models.PositiveSmallIntegerField(default=1)
+    repeat_weekdays = models.JSONField(default=list, blank=True)
+    repeat_until = models.DateField(null=True, blank=True)
+    repeat_count = models.PositiveIntegerField(null=True, blank=True)
+    repeat_skipped = models.JSONField(default=list, blank=True)
+    # The series may be deleted later; its archived occurrences stay history.
+    series = models.ForeignKey(
+        Task, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True,
+        related_name="archived_occurrences", db_index=False,
+    )
+    occurrence_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Same list ordering and keyset pagination as core_task_hh_created_idx
+            models.Index(fields=["household", "-created_at", "-id"], name="core_archtask_hh_created_idx"),
+            # Archived occurrences still count as stored (recurrence.stored_occurrences)
+            models.Index(fields=["series", "occurrence_at"], name="core_archtask_series_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -85,6 +241,158 @@ class RewardRedemption(models.Model):
         return f"{self.user_id} redeemed {self.points_redeemed}"
     
 
+class PointsLedgerEntry(models.Model):
+    """
+    Append-only record of every change to a user's points_balance.
+    A user's balance always equals the sum of their entries
+    (see core.points and the rebuild_points_balances command).
+    """
+    REASON_COMPLETION = "completion"
+    REASON_UNCOMPLETION = "uncompletion"
+    REASON_REDEMPTION = "redemption"
+    REASON_ADJUSTMENT = "adjustment"
+    REASON_CHOICES = [
+        (REASON_COMPLETION, "Task completed"),
+        (REASON_UNCOMPLETION, "Task un-completed"),
+        (REASON_REDEMPTION, "Reward redeemed"),
+        (REASON_ADJUSTMENT, "Adjustment"),
+    ]
+
+    household = models.ForeignKey(Household, on_delete=models.CASCADE, null=True, blank=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="points_entries")
+    delta = models.IntegerField()
+    reason = models.CharField(max_length=16, choices=REASON_CHOICES)
+    task = models.ForeignKey(Task, on_delete=models.SET_NULL, null=True, blank=True)
+    # Set instead of task once the task is archived (see core.archive)
+    archived_task = models.ForeignKey(ArchivedTask, on_delete=models.SET_NULL, null=True, blank=True)
+    redemption = models.OneToOneField(RewardRedemption, on_delete=models.SET_NULL, null=True, blank=True)
+    note = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Weekly / monthly leaderboards sum each user's recent entries
+            models.Index(fields=["user", "created_at"], name="core_points_user_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.delta:+d} ({self.reason})"
+
+
+class CompletionRollup(models.Model):
+    """
+    How many of a household's tasks are completed, and the points they are
+    worth, per assigned member (null: unassigned) and local day of
+    completion, kept up to date as tasks change (see core.rollups). Read by
+    the dashboard stats and trend charts.
+    """
+    household = models.ForeignKey(Household, on_delete=models.CASCADE)
+    # Deleting a member first moves its counts to the unassigned row (core.signals).
+    member = models.ForeignKey(Member, on_delete=models.CASCADE, null=True, blank=True,
+                               related_name="completion_rollups")
+    day = models.DateField()
+    completed = models.IntegerField(default=0)
+    points = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # One row per key; NULLs never clash in a unique index, so unassigned rows get their own.
+            # Also serve the household's date-range reads.
+            models.UniqueConstraint(fields=["household", "day", "member"], name="core_rollup_hh_day_member_uniq",
+                                    condition=Q(member__isnull=False)),
+            models.UniqueConstraint(fields=["household", "day"], name="core_rollup_hh_day_unassigned_uniq",
+                                    condition=Q(member__isnull=True)),
+        ]
+
+    def __str__(self):
+        return f"{self.household_id} {self.day} {self.member_id}: {self.completed}"
+
+
+class CalendarSyncState(models.Model):
+    """
+    Inbound sync position for one Google calendar: the nextSyncToken from
+    the last completed pull (see core.calendar_inbound).
+    """
+    calendar_id = models.CharField(max_length=255, unique=True)
+    sync_token = models.TextField(null=True, blank=True)
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+    last_full_sync_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.calendar_id
+
+
+class SyncChange(models.Model):
+    """
+    The latest change to one task, member, pet or category, numbered from
+    its household's change_seq. Deleted objects leave a tombstone row
+    (deleted=True). Read by the delta-sync endpoint (see core.changes).
+    """
+    KIND_TASK = "task"
+    KIND_MEMBER = "member"
+    KIND_PET = "pet"
+    KIND_CATEGORY = "category"
+
+    household = models.ForeignKey(Household, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=16)
+    object_id = models.PositiveBigIntegerField()
+    seq = models.PositiveBigIntegerField()
+    deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["household", "kind", "object_id"], name="core_syncchange_object_uniq"),
+        ]
+        indexes = [
+            # GET /api/sync/?since=: a household's changes after a cursor
+            models.Index(fields=["household", "seq"], name="core_syncchange_hh_seq_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} @{self.seq}"
+
+
+class Job(models.Model):
+    """
+    A unit of background work (the outbox): written in the same transaction
+    as the change that needs it, and run later by `manage.py run_jobs`
+    (see core.jobs).
+    """
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    claim_token = models.UUIDField(null=True, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Workers claim the oldest due jobs
+            models.Index(fields=["status", "run_after"], name="core_job_status_run_after_idx"),
+            models.Index(fields=["claim_token"], name="core_job_claim_token_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
 def invite_expiry_default():
        return timezone.now() + timedelta(days=7)
 
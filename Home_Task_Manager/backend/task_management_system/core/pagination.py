@@ -0,0 +1,108 @@
+import base64
+from collections import OrderedDict
+
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class TaskKeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination over (created_at, id), newest first.
+
+    The cursor is an opaque token encoding the (created_at, id) of the last
+    row on the previous page. The next page is fetched with a range condition
+    on the (household, -created_at) index instead of an OFFSET, so page N
+    costs the same as page 1 and rows inserted meanwhile never shift pages.
+
+    Query parameters:
+      - cursor: token from the previous page's "next" link
+      - page_size: rows per page (default 50, max 200)
+      - paginate=false: opt out and return the plain, unpaginated list
+
+    Given a list of querysets (e.g. hot and archived tasks with unique ids
+    between them), each is seeked the same way and the pages are merged.
+    """
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 50
+    max_page_size = 200
+    invalid_cursor_message = "Invalid cursor"
+    ordering = ("-created_at", "-id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get("paginate", "").lower() in ("0", "false", "no"):
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        sources = queryset if isinstance(queryset, (list, tuple)) else [queryset]
+        encoded = request.query_params.get(self.cursor_query_param)
+        cursor = self.decode_cursor(encoded) if encoded else None
+
+        rows = []
+        for source in sources:
+            rows += self.seek(source.order_by(*self.ordering), cursor)[: self.page_size + 1]
+        if len(sources) > 1:
+            rows.sort(key=lambda obj: (obj.created_at, obj.pk), reverse=True)
+            rows = rows[: self.page_size + 1]
+
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        return self.page
+
+    def seek(self, queryset, cursor):
+        if cursor is None:
+            return queryset
+        created_at, pk = cursor
+        # (created_at, id) < (cursor) written so the created_at range can
+        # still be served from the index on every backend.
+        return queryset.filter(created_at__lte=created_at).exclude(created_at=created_at, id__gte=pk)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, obj):
+        raw = f"{obj.created_at.isoformat()}|{obj.pk}"
+        return base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii")
+
+    def decode_cursor(self, encoded):
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode("ascii")).decode("ascii")
+            created_at, pk = raw.rsplit("|", 1)
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
@@ -0,0 +1,145 @@
+"""
+Points accounting.
+
+Every change to User.points_balance goes through here. The balance is only
+ever changed with a single conditional UPDATE (never read-modify-write in
+Python), and each change appends PointsLedgerEntry rows in the same
+transaction, so the balance always equals the sum of the user's ledger.
+
+Balances never go below zero. Un-completing a task when the user has
+already spent the points takes what is left; the shortfall is recorded as
+an "adjustment" entry so the ledger still adds up. Redemptions are
+all-or-nothing and raise InsufficientPoints instead.
+
+Balance changes bump the household's "points" cache version, which the
+leaderboards (core.leaderboard) are cached under, within the transaction
+that makes them (so the version is bumped again when it commits; see
+core.cache), and are pushed to the household's live streams (core.events)
+along with task completions.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+
+from . import events
+from .cache import bump_household_version, POINTS
+from .models import PointsLedgerEntry, RewardRedemption
+
+User = get_user_model()
+
+COMPLETION_POINTS = 10
+COMPLETION_REASONS = (PointsLedgerEntry.REASON_COMPLETION, PointsLedgerEntry.REASON_UNCOMPLETION)
+
+
+class InsufficientPoints(Exception):
+    pass
+
+
+def _debit_to_floor(user_id, amount):
+    """
+    Subtract up to `amount`, stopping at zero. Returns the amount taken.
+    """
+    while True:
+        if User.objects.filter(pk=user_id, points_balance__gte=amount).update(
+            points_balance=F("points_balance") - amount
+        ):
+            return amount
+        current = User.objects.values_list("points_balance", flat=True).get(pk=user_id)
+        if current >= amount:
+            continue  # credited meanwhile; the full debit fits now
+        if current <= 0:
+            return 0
+        # Compare-and-set: if the balance moved since we read it, go round again.
+        if User.objects.filter(pk=user_id, points_balance=current).update(points_balance=0):
+            return current
+
+
+def apply_entries(user, entries):
+    """
+    Apply unsaved PointsLedgerEntry objects for one user as one balance
+    update. Returns the delta actually applied.
+    """
+    nominal = sum(entry.delta for entry in entries)
+    with transaction.atomic():
+        if nominal >= 0:
+            User.objects.filter(pk=user.pk).update(points_balance=F("points_balance") + nominal)
+            applied = nominal
+        else:
+            applied = -_debit_to_floor(user.pk, -nominal)
+
+        if applied != nominal:
+            entries = [
+                *entries,
+                PointsLedgerEntry(
+                    user_id=user.pk,
+                    household_id=user.household_id,
+                    delta=applied - nominal,
+                    reason=PointsLedgerEntry.REASON_ADJUSTMENT,
+                    note="Balance cannot go below zero",
+                ),
+            ]
+        PointsLedgerEntry.objects.bulk_create(entries)
+        events.publish(user.household_id, [
+            *(
+                {"type": "task.completed", "id": entry.task_id,
+                 "completed": entry.reason == PointsLedgerEntry.REASON_COMPLETION, "user_id": user.pk}
+                for entry in entries if entry.reason in COMPLETION_REASONS
+            ),
+            {"type": "points.changed", "user_id": user.pk, "delta": applied},
+        ])
+        bump_household_version(user.household_id, POINTS)
+    return applied
+
+
+def completion_entry(user, task, completed):
+    if completed:
+        delta, reason = COMPLETION_POINTS, PointsLedgerEntry.REASON_COMPLETION
+    else:
+        delta, reason = -COMPLETION_POINTS, PointsLedgerEntry.REASON_UNCOMPLETION
+    return PointsLedgerEntry(
+        user_id=user.pk,
+        household_id=user.household_id,
+        task_id=task.pk,
+        delta=delta,
+        reason=reason,
+    )
+
+
+def record_completion(user, task, completed):
+    """Credit (or take back) the points for completing `task`."""
+    return apply_entries(user, [completion_entry(user, task, completed)])
+
+
+def redeem(user, points, note=""):
+    """
+    Spend `points` if the user has them. Returns the RewardRedemption.
+    Raises InsufficientPoints otherwise; nothing is written in that case.
+    """
+    with transaction.atomic():
+        debited = User.objects.filter(pk=user.pk, points_balance__gte=points).update(
+            points_balance=F("points_balance") - points
+        )
+        if not debited:
+            raise InsufficientPoints()
+
+        redemption = RewardRedemption.objects.create(
+            household_id=user.household_id,
+            user_id=user.pk,
+            points_redeemed=points,
+            note=note,
+        )
+        PointsLedgerEntry.objects.create(
+            user_id=user.pk,
+            household_id=user.household_id,
+            redemption=redemption,
+            delta=-points,
+            reason=PointsLedgerEntry.REASON_REDEMPTION,
+            note=note[:200],
+        )
+        events.publish(user.household_id, [{"type": "points.changed", "user_id": user.pk, "delta": -points}])
+        bump_household_version(user.household_id, POINTS)
+    return redemption
+
+
+def current_balance(user):
+    return User.objects.values_list("points_balance", flat=True).get(pk=user.pk)
@@ -0,0 +1,226 @@
+"""
+Recurring tasks.
+
+A series is one Task with a repeat rule: Task.repeat (daily, weekly on
+repeat_weekdays, monthly), every repeat_interval days / weeks / months,
+ending after repeat_until or repeat_count occurrences, or never. Its
+due_date is the first occurrence; a start_at gives every occurrence the
+same lead time. The series row stands for all of its occurrences, which
+aren't stored: views showing a time window (calendar, dashboard) expand
+each series over just that window.
+
+An occurrence is stored only once it is completed or edited
+(materialize()): a copy of the series pointing back at it (Task.series),
+remembering which occurrence it replaces (Task.occurrence_at) so that
+expansion leaves it out, even once archived (core.archive). Deleting an occurrence, stored or not, adds it
+to the series' repeat_skipped list (skip()).
+
+Occurrences keep the local wall-clock time (current time zone) of the
+first one, so a 9:00 weekly chore stays at 9:00 across DST changes.
+"""
+import copy
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ArchivedTask, Task
+
+NOT_STORED = {
+    # Server-owned per row; an occurrence isn't linked to the series' event.
+    "google_calendar_id": None,
+    "google_event_id": None,
+    "google_last_synced_at": None,
+    "google_sync_status": None,
+    "google_sync_error": None,
+    # Occurrences don't repeat themselves.
+    "repeat": "",
+    "repeat_interval": 1,
+    "repeat_until": None,
+    "repeat_count": None,
+    "completed": False,
+    "completed_at": None,
+}
+
+
+def occurrence_key(value):
+    """How an occurrence is identified in repeat_skipped."""
+    return value.astimezone(dt_timezone.utc).isoformat()
+
+
+def lead_time(series):
+    return series.due_date - series.start_at if series.start_at else timedelta(0)
+
+
+def _candidates(series, first, period):
+    """
+    Possible occurrences as naive local datetimes, in order, starting with
+    the `period`-th day / week / month of the series. Endless.
+    """
+    interval = series.repeat_interval or 1
+    if series.repeat == Task.REPEAT_DAILY:
+        step = timedelta(days=interval)
+        current = first + step * period
+        while True:
+            yield current
+            current += step
+    elif series.repeat == Task.REPEAT_WEEKLY:
+        weekdays = sorted(set(series.repeat_weekdays or [first.weekday()]))
+        monday = first - timedelta(days=first.weekday())
+        while True:
+            week = monday + timedelta(weeks=interval * period)
+            for weekday in weekdays:
+                candidate = week + timedelta(days=weekday)
+                if candidate >= first:
+                    yield candidate
+            period += 1
+    elif series.repeat == Task.REPEAT_MONTHLY:
+        while True:
+            month = first.month - 1 + interval * period
+            try:
+                yield first.replace(year=first.year + month // 12, month=month % 12 + 1)
+            except ValueError:
+                pass  # the month is too short (e.g. the 31st), as in RFC 5545
+            period += 1
+
+
+def _first_period(series, first, start):
+    """The last day / week / month of the series that can't hold an occurrence at or after `start`."""
+    interval = series.repeat_interval or 1
+    if start <= first:
+        return 0
+    if series.repeat == Task.REPEAT_MONTHLY:
+        months = (start.year - first.year) * 12 + start.month - first.month
+        return months // interval
+    days = (start - first).days
+    if series.repeat == Task.REPEAT_WEEKLY:
+        return days // 7 // interval
+    return days // interval
+
+
+def occurrences(series, start=None, end=None):
+    """
+    Due dates of the series' occurrences in [start, end), in order,
+    skipped ones included. Without `end` an open-ended series never stops.
+    """
+    tz = timezone.get_current_timezone()
+    first = timezone.make_naive(series.due_date, tz)
+    # With a count, occurrences have to be numbered from the first one.
+    period = 0
+    if start is not None and not series.repeat_count:
+        period = _first_period(series, first, timezone.make_naive(start, tz))
+
+    for number, candidate in enumerate(_candidates(series, first, period), 1):
+        if series.repeat_count and number > series.repeat_count:
+            return
+        if series.repeat_until and candidate.date() > series.repeat_until:
+            return
+        due = timezone.make_aware(candidate, tz)
+        if end is not None and due >= end:
+            return
+        if start is None or due >= start:
+            yield due
+
+
+def is_occurrence(series, when):
+    return any(occurrences(series, when, when + timedelta(microseconds=1)))
+
+
+def occurrence(series, due):
+    """An unsaved Task standing for the series' occurrence due at `due`."""
+    task = copy.copy(series)
+    task.pk = None
+    for field, value in NOT_STORED.items():
+        setattr(task, field, value)
+    task.repeat_weekdays = []
+    task.repeat_skipped = []
+    task.series_id = series.pk
+    task.occurrence_at = due
+    task.due_date = due
+    task.start_at = due - lead_time(series) if series.start_at else None
+    return task
+
+
+def series_overlapping(qs, start_dt, end_dt=None):
+    """
+    Series that may have an occurrence overlapping [start_dt, end_dt), or
+    any time from start_dt on without end_dt (see views.tasks_overlapping).
+    """
+    qs = qs.exclude(repeat="").filter(
+        Q(repeat_until__isnull=True) | Q(repeat_until__gte=timezone.localdate(start_dt) - timedelta(days=1))
+    )
+    if end_dt is None:
+        return qs
+    return qs.filter(Q(start_at__isnull=False, start_at__lt=end_dt) | Q(start_at__isnull=True, due_date__lt=end_dt))
+
+
+def stored_occurrences(series, start, end=None):
+    """
+    Keys of the occurrences of `series` due in [start, end) that are stored
+    as rows (archived ones included) or skipped. One query, none without series.
+    """
+    if not series:
+        return set()
+    ids = [s.pk for s in series]
+    hot, archived = (
+        model.objects.filter(series__in=ids, occurrence_at__gte=start)
+        for model in (Task, ArchivedTask)
+    )
+    if end is not None:
+        hot, archived = hot.filter(occurrence_at__lt=end), archived.filter(occurrence_at__lt=end)
+    stored = hot.values_list("series_id", "occurrence_at").union(
+        archived.values_list("series_id", "occurrence_at"), all=True
+    )
+    keys = {(series_id, occurrence_key(when)) for series_id, when in stored}
+    for s in series:
+        keys.update((s.pk, key) for key in s.repeat_skipped)
+    return keys
+
+
+def expand(series, start, end=None, limit=None, exclude=(), overlapping=False):
+    """
+    Unsaved occurrence Tasks of every series in `series` due in [start, end),
+    or the next `limit` of each when there is no end, leaving out the keys in
+    `exclude` (see stored_occurrences()). Sorted by due date.
+
+    overlapping=True also takes occurrences due after `end` whose start_at
+    is before it, i.e. the same overlap rule as the calendar.
+    """
+    expanded = []
+    for s in series:
+        until = end + lead_time(s) if overlapping and end is not None else end
+        found = 0
+        for due in occurrences(s, start, until):
+            if (s.pk, occurrence_key(due)) in exclude:
+                continue
+            expanded.append(occurrence(s, due))
+            found += 1
+            if limit is not None and found >= limit:
+                break
+    expanded.sort(key=lambda task: task.due_date)
+    return expanded
+
+
+def materialize(series, when):
+    """
+    The stored row for the series' occurrence due at `when`, created from
+    the series if it isn't stored yet. Returns (task, created).
+    """
+    template = occurrence(series, when)
+    defaults = {
+        field.attname: getattr(template, field.attname)
+        for field in Task._meta.concrete_fields
+        if field.attname not in ("id", "series_id", "occurrence_at", "created_at", "updated_at")
+    }
+    return Task.objects.get_or_create(series=series, occurrence_at=when, defaults=defaults)
+
+
+def skip(series_id, when):
+    """Leave the occurrence due at `when` out of the series from now on."""
+    series = Task.objects.select_for_update().filter(pk=series_id).first()
+    if series is None:
+        return
+    key = occurrence_key(when)
+    if key not in series.repeat_skipped:
+        series.repeat_skipped = [*series.repeat_skipped, key]
+        series.save(update_fields=["repeat_skipped", "updated_at"])
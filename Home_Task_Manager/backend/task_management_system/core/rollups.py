@@ -0,0 +1,170 @@
+"""
+Per-day completion rollups.
+
+CompletionRollup holds, per household, assigned member and local day, how
+many of the household's tasks are completed and the points they are worth:
+the dashboard's old COUNT over every completed task, kept ahead of time.
+A completed task counts on the local day of its completed_at (created_at
+when a task was stored completed without one). Archived tasks
+(core.archive) still count; deleted ones don't.
+
+The counts follow task writes in the same transaction:
+  - core.signals remembers each task's completion state when it is loaded
+    (remember) and, on save and delete, moves the task from the row it was
+    counted in to the one it belongs in now (record / forget);
+  - bulk_create (TaskQuerySet), the bulk endpoint's updates (core.bulk)
+    and deleting a member (unassign) call in directly, as they send no
+    per-task signals;
+  - archiving copies and raw-deletes rows, so archived completions stay
+    counted without any bookkeeping.
+
+rebuild() recomputes a household's rows from its tasks and archived tasks,
+which is what the backfill_completion_rollups command (and migration 0020)
+runs. The dashboard stats and the trend charts read a few of these rows.
+"""
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db.models import Count, F, Q
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import ArchivedTask, CompletionRollup, Task
+from .points import COMPLETION_POINTS
+
+STATE_FIELDS = ("household_id", "assignee_member_id", "completed", "completed_at", "created_at")
+MAX_KEYS_PER_UPDATE = 200
+
+
+def _key(household_id, member_id, completed, completed_at, created_at):
+    """The (household, member, day) row a task in this state counts in, or None."""
+    if not completed:
+        return None
+    return household_id, member_id, timezone.localdate(completed_at or created_at)
+
+
+def remember(task):
+    """Note the state the task is stored in (nothing, for one not saved yet)."""
+    # Read from __dict__ so deferred fields never trigger a query; a task
+    # loaded without them can't be tracked.
+    values = task.__dict__
+    if values.get("id") is None:
+        task._rollup_state = None
+    elif all(field in values for field in STATE_FIELDS):
+        task._rollup_state = tuple(values[field] for field in STATE_FIELDS)
+    else:
+        values.pop("_rollup_state", None)
+
+
+def remember_stored(task, stored):
+    """Take the state remembered for `stored`, the same row read again, as the task's."""
+    if "_rollup_state" in stored.__dict__:
+        task._rollup_state = stored._rollup_state
+    else:
+        task.__dict__.pop("_rollup_state", None)
+
+
+def _counted(task):
+    state = task.__dict__.get("_rollup_state")
+    return _key(*state) if state else None
+
+
+def _add(household_id, member_id, day, completed):
+    rows = CompletionRollup.objects.filter(household_id=household_id, member_id=member_id, day=day)
+    change = {"completed": F("completed") + completed, "points": F("points") + completed * COMPLETION_POINTS}
+    if not rows.update(**change):
+        # First change of the day: make the row (unless a concurrent writer just did), then add to it.
+        CompletionRollup.objects.bulk_create(
+            [CompletionRollup(household_id=household_id, member_id=member_id, day=day)], ignore_conflicts=True
+        )
+        rows.update(**change)
+
+
+def _apply(totals):
+    totals = {key: completed for key, completed in totals.items() if completed}
+    if len(totals) == 1:
+        [(key, completed)] = totals.items()
+        _add(*key, completed)
+        return
+    if not totals:
+        return
+    # Many rows (bulk writes): make the missing ones, then one UPDATE per
+    # distinct change instead of one per row.
+    CompletionRollup.objects.bulk_create(
+        [CompletionRollup(household_id=h, member_id=m, day=d) for h, m, d in totals],
+        ignore_conflicts=True,
+        batch_size=1000,
+    )
+    by_change = defaultdict(list)
+    for key, completed in totals.items():
+        by_change[completed].append(key)
+    for completed, keys in by_change.items():
+        for start in range(0, len(keys), MAX_KEYS_PER_UPDATE):
+            match = reduce(or_, (Q(household_id=h, member_id=m, day=d)
+                                 for h, m, d in keys[start:start + MAX_KEYS_PER_UPDATE]))
+            CompletionRollup.objects.filter(match).update(
+                completed=F("completed") + completed, points=F("points") + completed * COMPLETION_POINTS
+            )
+
+
+def record(tasks):
+    """Count saved tasks where they belong now instead of where they were remembered."""
+    totals = Counter()
+    for task in tasks:
+        if "_rollup_state" not in task.__dict__:
+            continue
+        before = _counted(task)
+        remember(task)
+        after = _counted(task)
+        if before != after:
+            if before:
+                totals[before] -= 1
+            if after:
+                totals[after] += 1
+    _apply(totals)
+
+
+def forget(tasks):
+    """Stop counting deleted tasks."""
+    totals = Counter()
+    for task in tasks:
+        before = _counted(task)
+        if before:
+            totals[before] -= 1
+        task._rollup_state = None
+    _apply(totals)
+
+
+def unassign(member):
+    """Move a member's counts to the household's unassigned ones before the member is deleted."""
+    rows = CompletionRollup.objects.filter(member=member)
+    totals = Counter()
+    for household_id, day, completed in rows.values_list("household_id", "day", "completed"):
+        totals[(household_id, None, day)] += completed
+    rows.delete()
+    _apply(totals)
+
+
+def rebuild(household_ids):
+    """Recompute the households' rollups from their tasks. Run inside a transaction."""
+    CompletionRollup.objects.filter(household_id__in=household_ids).delete()
+    totals = Counter()
+    for model in (Task, ArchivedTask):
+        rows = (
+            model.objects.filter(household_id__in=household_ids, completed=True)
+            .annotate(day=TruncDate(Coalesce("completed_at", "created_at")))
+            .values_list("household_id", "assignee_member_id", "day")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        for household_id, member_id, day, count in rows:
+            totals[(household_id, member_id, day)] += count
+    CompletionRollup.objects.bulk_create(
+        [
+            CompletionRollup(household_id=household_id, member_id=member_id, day=day, completed=completed,
+                             points=completed * COMPLETION_POINTS)
+            for (household_id, member_id, day), completed in totals.items()
+        ],
+        batch_size=1000,
+    )
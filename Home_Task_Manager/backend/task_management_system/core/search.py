@@ -0,0 +1,187 @@
+"""
+Full-text search for tasks.
+
+One small abstraction over the database's own full-text engine:
+  - SQLite: an FTS5 external-content table (core_task_fts) kept in sync
+    with core_task by triggers.
+  - PostgreSQL: a generated tsvector column (core_task.search_vector)
+    with a GIN index.
+  - anything else: the old title/description icontains scan.
+
+The index lives in the database, so it stays in sync on every insert,
+update and delete, including bulk_create / bulk_update / queryset.update().
+
+Each backend filters a Task queryset to the matches and annotates
+`search_rank` (lower is better) so callers can order by relevance.
+User input is reduced to word terms and every term is prefix-matched,
+which suits search-as-you-type.
+
+The rank is only used for unpaginated results: the task list's keyset
+cursor is (created_at, id), so paginated search comes back newest first.
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "core_task_fts"
+
+SQLITE_SETUP = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description,
+        content='core_task', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS core_task_fts_insert AFTER INSERT ON core_task BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS core_task_fts_delete AFTER DELETE ON core_task BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS core_task_fts_update AFTER UPDATE OF title, description ON core_task BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+SQLITE_TRIGGERS = ("core_task_fts_insert", "core_task_fts_delete", "core_task_fts_update")
+
+SQLITE_TEARDOWN = [
+    *(f"DROP TRIGGER IF EXISTS {name}" for name in SQLITE_TRIGGERS),
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+POSTGRES_SETUP = [
+    """
+    ALTER TABLE core_task ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS core_task_search_gin ON core_task USING GIN (search_vector)",
+]
+
+POSTGRES_TEARDOWN = [
+    "DROP INDEX IF EXISTS core_task_search_gin",
+    "ALTER TABLE core_task DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def search_terms(query):
+    return re.findall(r"\w+", query or "")
+
+
+class IContainsSearch:
+    """Fallback for databases without a supported full-text engine."""
+
+    def search(self, qs, query):
+        return qs.filter(
+            Q(title__icontains=query) | Q(description__icontains=query)
+        ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+class SQLiteFTSSearch:
+    def search(self, qs, query):
+        terms = search_terms(query)
+        if not terms:
+            return IContainsSearch().search(qs, query)
+
+        match = " ".join(f'"{term}"*' for term in terms)
+        return qs.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        ).annotate(
+            # bm25 weights: title matches count double. Lower is better.
+            search_rank=RawSQL(
+                f"SELECT bm25({FTS_TABLE}, 2.0, 1.0) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = core_task.id",
+                [match],
+                output_field=FloatField(),
+            )
+        )
+
+    def setup(self, schema_editor):
+        for sql in SQLITE_SETUP:
+            schema_editor.execute(sql)
+        schema_editor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+    def teardown(self, schema_editor):
+        for sql in SQLITE_TEARDOWN:
+            schema_editor.execute(sql)
+
+
+class PostgresSearch:
+    def search(self, qs, query):
+        terms = search_terms(query)
+        if not terms:
+            return IContainsSearch().search(qs, query)
+
+        tsquery = " & ".join(f"{term}:*" for term in terms)
+        return qs.filter(
+            RawSQL("core_task.search_vector @@ to_tsquery('simple', %s)", [tsquery], output_field=BooleanField())
+        ).annotate(
+            # Negated so that, as on SQLite, lower is better.
+            search_rank=RawSQL(
+                "-ts_rank(core_task.search_vector, to_tsquery('simple', %s))", [tsquery], output_field=FloatField()
+            )
+        )
+
+    def setup(self, schema_editor):
+        for sql in POSTGRES_SETUP:
+            schema_editor.execute(sql)
+
+    def teardown(self, schema_editor):
+        for sql in POSTGRES_TEARDOWN:
+            schema_editor.execute(sql)
+
+
+BACKENDS = {
+    "sqlite": SQLiteFTSSearch,
+    "postgresql": PostgresSearch,
+}
+
+
+_fts_available = {}
+
+
+def get_search_backend(conn=None):
+    conn = conn or connection
+    backend = BACKENDS.get(conn.vendor, IContainsSearch)
+    if backend is SQLiteFTSSearch:
+        if conn.alias not in _fts_available:
+            _fts_available[conn.alias] = FTS_TABLE in conn.introspection.table_names()
+        if not _fts_available[conn.alias]:
+            # FTS5 missing from this SQLite build (migration skipped it).
+            backend = IContainsSearch
+    return backend()
+
+
+def ensure_sqlite_triggers(conn):
+    """
+    SQLite drops triggers when Django rebuilds core_task during a later
+    migration. Recreate them, and rebuild the index since rows may have
+    changed while they were missing.
+    """
+    if conn.vendor != "sqlite" or FTS_TABLE not in conn.introspection.table_names():
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'core_task'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if set(SQLITE_TRIGGERS) <= existing:
+            return
+        for sql in SQLITE_SETUP:
+            cursor.execute(sql)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
@@ -1,6 +1,6 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
-from .models import Task, Member, Category, Pet, Household, HouseholdInvite
+from .models import ArchivedTask, Task, Member, Category, Pet, Household, HouseholdInvite
 
 User = get_user_model()
 
@@ -36,7 +36,7 @@ class TaskRowSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Task
-        fields = ["id", "title", "due_date", "priority", "completed", "assignee"]
+        fields = ["id", "title", "due_date", "priority", "completed", "assignee", "series", "occurrence_at"]
 
     def get_assignee(self, obj):
         # Prefer member if present; otherwise pet; else None
@@ -59,6 +59,57 @@ class TaskRowSerializer(serializers.ModelSerializer):
         return None
 
 
+class CalendarTaskSerializer(serializers.Serializer):
+    """
+    Compact, read-only calendar row.
+    Works on Task.objects.values(*CalendarTaskSerializer.VALUES) dicts, so no
+    model instances (or related-object lookups) are built. row() makes the
+    same dict from a task, for occurrences of a series (see core.recurrence).
+    """
+    VALUES = (
+        "id",
+        "title",
+        "start_at",
+        "due_date",
+        "priority",
+        "completed",
+        "assignee_member_id",
+        "assignee_member__name",
+        "assignee_pet_id",
+        "assignee_pet__name",
+        "series_id",
+        "occurrence_at",
+    )
+
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    start_at = serializers.DateTimeField()
+    due_date = serializers.DateTimeField()
+    priority = serializers.CharField()
+    completed = serializers.BooleanField()
+    assignee = serializers.SerializerMethodField()
+    series = serializers.IntegerField(source="series_id")
+    occurrence_at = serializers.DateTimeField()
+
+    @classmethod
+    def row(cls, task):
+        row = {}
+        for key in cls.VALUES:
+            value = task
+            for name in key.split("__"):
+                value = getattr(value, name) if value is not None else None
+            row[key] = value
+        return row
+
+    def get_assignee(self, row):
+        # Same preference as TaskRowSerializer: member, then pet
+        if row["assignee_member_id"]:
+            return {"id": row["assignee_member_id"], "name": row["assignee_member__name"], "type": "member"}
+        if row["assignee_pet_id"]:
+            return {"id": row["assignee_pet_id"], "name": row["assignee_pet__name"], "type": "pet"}
+        return None
+
+
 class TaskSerializer(serializers.ModelSerializer):
     """
     Full serializer for creating, updating, and deleting tasks.
@@ -67,6 +118,11 @@ class TaskSerializer(serializers.ModelSerializer):
     - household is read-only and set server-side from request.user.household
     - category / assignee_member / assignee_pet must belong to the same household
     - member and pet CAN both be set
+
+    Recurrence (see core.recurrence):
+    - a repeating task (a series) needs a due_date, its first occurrence
+    - a series is completed one occurrence at a time, never as a whole
+    - stored occurrences (series set) can't repeat themselves
     """
 
     category = serializers.PrimaryKeyRelatedField(
@@ -84,6 +140,10 @@ class TaskSerializer(serializers.ModelSerializer):
         required=False,
         allow_null=True,
     )
+    repeat_weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6),
+        required=False,
+    )
 
     class Meta:
         model = Task
@@ -107,6 +167,14 @@ class TaskSerializer(serializers.ModelSerializer):
             "google_last_synced_at",
             "google_sync_status",
             "google_sync_error",
+            "repeat",
+            "repeat_interval",
+            "repeat_weekdays",
+            "repeat_until",
+            "repeat_count",
+            "repeat_skipped",
+            "series",
+            "occurrence_at",
         ]
 
         read_only_fields = [
@@ -122,6 +190,11 @@ class TaskSerializer(serializers.ModelSerializer):
             "google_last_synced_at",
             "google_sync_status",
             "google_sync_error",
+
+            # occurrences are managed through /api/tasks/<id>/occurrences/
+            "repeat_skipped",
+            "series",
+            "occurrence_at",
         ]
 
     def __init__(self, *args, **kwargs):
@@ -139,9 +212,9 @@ class TaskSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         request = self.context.get("request")
         user = getattr(request, "user", None)
-        household = getattr(user, "household", None)
+        household_id = getattr(user, "household_id", None)
 
-        if user and getattr(user, "is_authenticated", False) and household is None:
+        if user and getattr(user, "is_authenticated", False) and household_id is None:
             raise serializers.ValidationError("User is not associated with a household.")
 
         member = attrs.get("assignee_member")
@@ -149,14 +222,14 @@ class TaskSerializer(serializers.ModelSerializer):
         category = attrs.get("category")
 
         # Defense-in-depth: ensure related objects belong to the same household
-        if household:
-            if category and getattr(category, "household_id", None) != household.id:
+        if household_id:
+            if category and getattr(category, "household_id", None) != household_id:
                 raise serializers.ValidationError({"category": "Category must belong to your household."})
 
-            if member and getattr(member, "household_id", None) != household.id:
+            if member and getattr(member, "household_id", None) != household_id:
                 raise serializers.ValidationError({"assignee_member": "Member must belong to your household."})
 
-            if pet and getattr(pet, "household_id", None) != household.id:
+            if pet and getattr(pet, "household_id", None) != household_id:
                 raise serializers.ValidationError({"assignee_pet": "Pet must belong to your household."})
 
         # Calendar validation: start_at must be <= due_date
@@ -175,8 +248,39 @@ class TaskSerializer(serializers.ModelSerializer):
                 {"start_at": "start_at must be before or equal to due_date."}
             )
 
+        self.validate_recurrence(attrs, due_date)
         return attrs
 
+    def validate_recurrence(self, attrs, due_date):
+        instance = self.instance
+        repeat = attrs.get("repeat", getattr(instance, "repeat", ""))
+        weekdays = attrs.get("repeat_weekdays")
+
+        if repeat and getattr(instance, "series_id", None):
+            raise serializers.ValidationError({"repeat": "An occurrence of a repeating task can't repeat itself."})
+        if repeat and due_date is None:
+            raise serializers.ValidationError({"due_date": "A repeating task needs a due date."})
+        if weekdays and repeat != Task.REPEAT_WEEKLY:
+            raise serializers.ValidationError({"repeat_weekdays": "Only weekly tasks repeat on weekdays."})
+        if weekdays is not None:
+            attrs["repeat_weekdays"] = sorted(set(weekdays))
+        if repeat and attrs.get("completed"):
+            raise serializers.ValidationError(
+                {"completed": "Complete a repeating task one occurrence at a time (POST .../occurrences/)."}
+            )
+
+
+
+class ArchivedTaskSerializer(serializers.ModelSerializer):
+    """
+    Read-only: an archived task in TaskSerializer's shape, plus archived_at.
+    Listed by TaskViewSet with ?include_archived=true (see core.archive).
+    """
+
+    class Meta:
+        model = ArchivedTask
+        fields = TaskSerializer.Meta.fields + ["archived_at"]
+        read_only_fields = fields
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -0,0 +1,142 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from django.db.models.signals import post_init, post_save, post_delete, post_migrate, pre_delete, pre_save
+
+from . import changes, rollups
+from .cache import bump_household_version, POINTS
+from .search import ensure_sqlite_triggers
+from .models import Household, Task, Member, Pet, Category
+
+HOUSEHOLD_DATA_MODELS = (Task, Member, Pet, Category)
+
+# Members and users can move between households (invite acceptance), so the
+# household they were loaded with must be invalidated as well.
+MOVABLE_MODELS = (Member, settings.AUTH_USER_MODEL)
+
+
+def remember_household(sender, instance, **kwargs):
+    # Read from __dict__ so deferred fields never trigger a query.
+    instance._loaded_household_id = instance.__dict__.get("household_id")
+
+
+def touched_households(instance):
+    household_id = instance.__dict__.get("household_id")
+    touched = {household_id}
+
+    loaded_household_id = getattr(instance, "_loaded_household_id", None)
+    if loaded_household_id is not None:
+        touched.add(loaded_household_id)
+    instance._loaded_household_id = household_id
+    return touched
+
+
+def bump_on_change(sender, instance, **kwargs):
+    for household_id in touched_households(instance):
+        bump_household_version(household_id)
+
+
+def bump_on_user_change(sender, instance, **kwargs):
+    # Users also appear on the leaderboards (names, roles, membership).
+    for household_id in touched_households(instance):
+        bump_household_version(household_id)
+        bump_household_version(household_id, POINTS)
+
+
+def deleting_household(origin):
+    # Deleting a household cascades to everything in it; there's no one
+    # left to sync those deletes to.
+    return isinstance(origin, Household) or getattr(origin, "model", None) is Household
+
+
+def record_save(sender, instance, created=False, **kwargs):
+    kind = changes.KINDS[sender]
+    # Runs before bump_on_change, which forgets the household it was loaded with.
+    loaded_household_id = getattr(instance, "_loaded_household_id", None)
+    if loaded_household_id is not None and loaded_household_id != instance.household_id:
+        changes.record(loaded_household_id, kind, [instance.pk], changes.DELETED)
+    changes.record(instance.household_id, kind, [instance.pk], changes.CREATED if created else changes.UPDATED)
+
+
+def record_delete(sender, instance, origin=None, **kwargs):
+    if not deleting_household(origin):
+        changes.record(instance.household_id, changes.KINDS[sender], [instance.pk], changes.DELETED)
+
+
+def record_unassigned_tasks(sender, instance, origin=None, **kwargs):
+    # Deleting a category, member or pet sets the tasks pointing at it to
+    # NULL with a queryset update, which sends no signals.
+    if deleting_household(origin):
+        return
+    field = {Category: "category", Member: "assignee_member", Pet: "assignee_pet"}[sender]
+    task_ids = list(Task.objects.filter(**{field: instance}).values_list("pk", flat=True))
+    changes.record(instance.household_id, changes.KINDS[Task], task_ids)
+
+
+for model in MOVABLE_MODELS:
+    post_init.connect(remember_household, sender=model, dispatch_uid=f"remember_household:{model}")
+
+for model in HOUSEHOLD_DATA_MODELS:
+    post_save.connect(record_save, sender=model, dispatch_uid=f"record_save:{model}")
+    post_delete.connect(record_delete, sender=model, dispatch_uid=f"record_delete:{model}")
+
+for model in (Category, Member, Pet):
+    pre_delete.connect(record_unassigned_tasks, sender=model, dispatch_uid=f"record_unassigned_tasks:{model}")
+
+for model in HOUSEHOLD_DATA_MODELS:
+    post_save.connect(bump_on_change, sender=model, dispatch_uid=f"bump_on_save:{model}")
+    post_delete.connect(bump_on_change, sender=model, dispatch_uid=f"bump_on_delete:{model}")
+
+post_save.connect(bump_on_user_change, sender=settings.AUTH_USER_MODEL, dispatch_uid="bump_on_user_save")
+post_delete.connect(bump_on_user_change, sender=settings.AUTH_USER_MODEL, dispatch_uid="bump_on_user_delete")
+
+
+def remember_completion(sender, instance, **kwargs):
+    rollups.remember(instance)
+
+
+def count_completion(sender, instance, **kwargs):
+    rollups.record([instance])
+
+
+def uncount_completion(sender, instance, origin=None, **kwargs):
+    # A deleted household takes its rollups with it.
+    if not deleting_household(origin):
+        rollups.forget([instance])
+
+
+def unassign_completions(sender, instance, origin=None, **kwargs):
+    if not deleting_household(origin):
+        rollups.unassign(instance)
+
+
+post_init.connect(remember_completion, sender=Task, dispatch_uid="remember_completion")
+post_save.connect(count_completion, sender=Task, dispatch_uid="count_completion")
+post_delete.connect(uncount_completion, sender=Task, dispatch_uid="uncount_completion")
+pre_delete.connect(unassign_completions, sender=Member, dispatch_uid="unassign_completions")
+
+
+def mark_calendar_pending(sender, instance, update_fields=None, **kwargs):
+    # Edits to a task linked to Google Calendar queue it for the next push
+    # (see core.calendar_sync). Partial saves only touch server-owned fields.
+    if instance.google_calendar_id and update_fields is None:
+        instance.google_sync_status = Task.SYNC_PENDING
+
+
+pre_save.connect(mark_calendar_pending, sender=Task, dispatch_uid="mark_calendar_pending")
+
+
+def restore_search_triggers(sender, using, **kwargs):
+    ensure_sqlite_triggers(connections[using])
+
+
+post_migrate.connect(restore_search_triggers, sender=Task._meta.app_config, dispatch_uid="restore_search_triggers")
+
+
+def create_cache_table(sender, using, **kwargs):
+    # For a database cache (settings.CACHES); does nothing for other backends
+    # or when the table exists.
+    call_command("createcachetable", database=using, verbosity=0)
+
+
+post_migrate.connect(create_cache_table, sender=Task._meta.app_config, dispatch_uid="create_cache_table")
@@ -0,0 +1,72 @@
+"""
+GET /api/events/: the household's live events (core.events) as a
+Server-Sent Events stream.
+
+Authenticates like the rest of the API (Authorization: Bearer <access>).
+EventSource can't send headers, so ?access_token=<access> works too. The
+stream ends when the access token expires; the client reconnects with a
+fresh one and calls GET /api/sync/ with its last cursor to catch up on
+anything it missed meanwhile.
+
+This is an async view, and it needs ASGI (e.g. uvicorn
+task_management_system.asgi:application): an open stream costs a
+coroutine, not a worker thread. Under WSGI Django consumes an async
+streaming response to the end before sending any of it, so the client
+would see nothing until the token expired while a worker waited on it;
+there the route answers 501 instead.
+"""
+import json
+import time
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from .async_views import async_api_view, authenticate
+from .events import get_broker
+
+HEARTBEAT_SECONDS = 15
+RETRY_MILLISECONDS = 3000
+
+
+def format_event(event):
+    lines = [f"event: {event['type']}"]
+    if "cursor" in event:
+        lines.append(f"id: {event['cursor']}")
+    lines.append(f"data: {json.dumps(event)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def event_stream(household_id, expires_at, heartbeat=HEARTBEAT_SECONDS):
+    # Subscribe once the response starts, so the subscription is always
+    # closed by the finally block below.
+    subscription = get_broker().subscribe(household_id)
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        while True:
+            remaining = expires_at - time.time()
+            if remaining <= 0:
+                return
+            events = await subscription.get(timeout=min(heartbeat, remaining))
+            if events is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield "".join(format_event(event) for event in events)
+    finally:
+        subscription.close()
+
+
+@require_GET
+@async_api_view
+async def household_events(request):
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"detail": "Live events need the ASGI server."}, status=501)
+    user, token = await authenticate(request, allow_query_token=True)
+    if user.household_id is None:
+        return JsonResponse({"detail": "User is not associated with a household."}, status=400)
+
+    response = StreamingHttpResponse(event_stream(user.household_id, token["exp"]), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Don't let nginx buffer the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,201 @@
+"""
+Per-request performance instrumentation (settings.REQUEST_TIMING).
+
+RequestTimingMiddleware measures, for every request:
+  - SQL: number of queries and time spent in the database, through an
+    execute wrapper on each connection (see instrument()). Commits and
+    rollbacks don't go through a cursor and aren't counted;
+  - serialization: time spent rendering the response to JSON, through
+    TimedJSONRenderer (the first of REST_FRAMEWORK's
+    DEFAULT_RENDERER_CLASSES). Building serializer .data happens in the
+    view and counts in total, its queries in db;
+  - total: time spent in the view and the middleware below this one.
+
+and reports them three ways:
+  - a Server-Timing header (db, serialize, total), shown by the browser's
+    network panel;
+  - one log record per request on the "core.timing" logger, with the
+    numbers as a dict in the record's `timing` attribute;
+  - a warning on the same logger, with the most expensive statements
+    attached, when a request makes more than REQUEST_TIMING_MAX_QUERIES
+    queries or takes longer than REQUEST_TIMING_SLOW_MS.
+
+With REQUEST_TIMING off the middleware removes itself when Django starts
+and nothing is instrumented.
+
+timed() is the same measurement for code outside a request, e.g. the
+benchmarks.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework import renderers
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOW_MS = 500
+DEFAULT_MAX_QUERIES = 30
+DEFAULT_TOP_STATEMENTS = 5
+
+_current = ContextVar("request_timings", default=None)
+_instrumented = False
+
+
+class Timings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.serializing = 0  # nesting depth of timed serialization calls
+        self.statements = {}  # sql -> [count, seconds]
+
+    def record_query(self, sql, seconds):
+        self.queries += 1
+        self.db += seconds
+        entry = self.statements.setdefault(sql, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def top_statements(self, n):
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)[:n]
+        return [{"sql": sql, "count": count, "ms": round(seconds * 1000, 2)} for sql, (count, seconds) in ranked]
+
+    def as_dict(self):
+        return {
+            "total_ms": round(self.total * 1000, 2),
+            "queries": self.queries,
+            "db_ms": round(self.db * 1000, 2),
+            "serialize_ms": round(self.serialize * 1000, 2),
+        }
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries", '
+            f"serialize;dur={self.serialize * 1000:.1f}, "
+            f"total;dur={self.total * 1000:.1f}"
+        )
+
+
+def record_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.record_query(sql, time.perf_counter() - started)
+
+
+def timed_serialization(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        timings = _current.get()
+        if timings is None or timings.serializing:
+            return fn(*args, **kwargs)
+        timings.serializing += 1
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            timings.serialize += time.perf_counter() - started
+            timings.serializing -= 1
+    return wrapper
+
+
+class TimedJSONRenderer(renderers.JSONRenderer):
+    """JSONRenderer whose rendering time counts as the request's serialization."""
+
+    render = timed_serialization(renderers.JSONRenderer.render)
+
+
+def install_query_wrapper(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def instrument():
+    """
+    Hook into every database connection. Idempotent. The hooks (and
+    TimedJSONRenderer) only measure while a timed() block is active.
+    """
+    global _instrumented
+    if _instrumented:
+        return
+    _instrumented = True
+    connection_created.connect(install_query_wrapper, dispatch_uid="core.timing")
+    # Connections this thread opened before now.
+    for connection in connections.all(initialized_only=True):
+        install_query_wrapper(connection)
+
+
+@contextmanager
+def timed():
+    """Measure the enclosed block; yields its Timings. Call instrument() first."""
+    timings = Timings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        timings.total = time.perf_counter() - timings.started
+        _current.reset(token)
+
+
+class RequestTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_TIMING", False):
+            raise MiddlewareNotUsed()
+        instrument()
+        self.get_response = get_response
+        self.slow = getattr(settings, "REQUEST_TIMING_SLOW_MS", DEFAULT_SLOW_MS) / 1000
+        self.max_queries = getattr(settings, "REQUEST_TIMING_MAX_QUERIES", DEFAULT_MAX_QUERIES)
+        self.top = getattr(settings, "REQUEST_TIMING_TOP_STATEMENTS", DEFAULT_TOP_STATEMENTS)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with timed() as timings:
+            response = self.get_response(request)
+        self.report(request, response, timings)
+        return response
+
+    async def __acall__(self, request):
+        with timed() as timings:
+            response = await self.get_response(request)
+        self.report(request, response, timings)
+        return response
+
+    def report(self, request, response, timings):
+        response["Server-Timing"] = timings.server_timing()
+
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            **timings.as_dict(),
+        }
+        message = "%s %s %s in %.1f ms (%d queries, %.1f ms db, %.1f ms serialize)"
+        args = (request.method, request.path, response.status_code, timings.total * 1000, timings.queries,
+                timings.db * 1000, timings.serialize * 1000)
+
+        if timings.queries > self.max_queries or timings.total > self.slow:
+            record["top_statements"] = timings.top_statements(self.top)
+            logger.warning("Slow request: " + message, *args, extra={"timing": record})
+        else:
+            logger.info(message, *args, extra={"timing": record})
@@ -1,7 +1,11 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
+from .stream import household_events
 from .views import (
     DashboardView,
+    DashboardTrendsView,
     MembersListView,
     TaskViewSet,
     CategoryViewSet,
@@ -14,11 +18,13 @@ from .views import (
     ChangePasswordView,
     GoogleAuthView,
     CalendarTasksView,
+    CalendarDayCountsView,
     HouseholdInviteCreateView,
     HouseholdInviteAcceptView,
     HouseholdUserRoleUpdateView,
     RewardsSummaryView,
     RewardsRedeemView,
+    SyncView,
 )
 
 router = DefaultRouter()
@@ -27,20 +33,33 @@ router.register(r"categories", CategoryViewSet, basename="category")
 router.register(r"member-items", MemberViewSet, basename="member")
 router.register(r"pets", PetViewSet, basename="pet")
 
+if settings.ASYNC_VIEWS:
+    google_auth_view = async_views.google_auth
+    password_reset_view = async_views.password_reset_request
+    household_invite_create_view = async_views.household_invite_create
+else:
+    google_auth_view = GoogleAuthView.as_view()
+    password_reset_view = PasswordResetRequestView.as_view()
+    household_invite_create_view = HouseholdInviteCreateView.as_view()
+
 urlpatterns = [
     path("dashboard/", DashboardView.as_view(), name="dashboard"),
+    path("dashboard/trends/", DashboardTrendsView.as_view(), name="dashboard-trends"),
     path("members/", MembersListView.as_view(), name="members-list"),
     path("register/", RegisterView.as_view(), name="register"),
-    path("password-reset/", PasswordResetRequestView.as_view(), name="password-reset"),
+    path("password-reset/", password_reset_view, name="password-reset"),
     path("password-reset-confirm/", PasswordResetConfirmView.as_view(), name="password-reset-confirm"),
     path("me/", MeView.as_view(), name="me"),
     path("change-password/", ChangePasswordView.as_view(), name="change-password"),
     path("", include(router.urls)),
-    path("auth/google/", GoogleAuthView.as_view(), name="auth-google"),
+    path("auth/google/", google_auth_view, name="auth-google"),
     path("calendar/tasks/", CalendarTasksView.as_view(), name="calendar-tasks"),
+    path("calendar/day-counts/", CalendarDayCountsView.as_view(), name="calendar-day-counts"),
     path("rewards/summary/", RewardsSummaryView.as_view(), name="rewards-summary"),
     path("rewards/redeem/", RewardsRedeemView.as_view(), name="rewards-redeem"),
-    path("household/invites/", HouseholdInviteCreateView.as_view(), name="household-invite-create"),
+    path("sync/", SyncView.as_view(), name="sync"),
+    path("events/", household_events, name="household-events"),
+    path("household/invites/", household_invite_create_view, name="household-invite-create"),
     path("household/invites/accept/", HouseholdInviteAcceptView.as_view(), name="household-invite-accept"),
     path("household/users/<int:user_id>/role/", HouseholdUserRoleUpdateView.as_view(), name="household-user-role-update"),
 ]
@@ -1,14 +1,16 @@
 
 from django.conf import settings
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
-from django.core.mail import send_mail
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
 
+from .jobs import aenqueue_email, enqueue_email
 
-def send_password_reset_email(user):
+
+def password_reset_email(user):
     """
-    Create a password reset token & UID, build a frontend URL, and email it.
+    Create a password reset token & UID and build the frontend URL and the
+    email. Returns (email kwargs for core.jobs.enqueue_email, reset_url).
     """
     token_generator = PasswordResetTokenGenerator()
     token = token_generator.make_token(user)
@@ -25,12 +27,17 @@ def send_password_reset_email(user):
 
     from_email = getattr(settings, "PASSWORD_RESET_FROM_EMAIL", settings.DEFAULT_FROM_EMAIL)
 
-    send_mail(
-        subject=subject,
-        message=message,
-        from_email=from_email,
-        recipient_list=[user.email],
-        fail_silently=False,
-    )
+    return {"subject": subject, "body": message, "to": [user.email], "from_email": from_email}, reset_url
+
+
+def send_password_reset_email(user):
+    """Queue the password reset email (sent by `manage.py run_jobs`, see core.jobs)."""
+    email, reset_url = password_reset_email(user)
+    enqueue_email(**email)
+    return reset_url
+
 
+async def asend_password_reset_email(user):
+    email, reset_url = password_reset_email(user)
+    await aenqueue_email(**email)
     return reset_url
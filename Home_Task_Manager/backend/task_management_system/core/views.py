@@ -1,39 +1,55 @@
+import hashlib
+from collections import defaultdict
 from datetime import timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from datetime import datetime, time
+from datetime import date, datetime, time
 from django.utils.dateparse import parse_date
 from django.utils.timezone import make_aware, get_current_timezone
-from django.db.models import Q
+from django.db.models import Q, Count, Max, Sum
+from django.db.models.functions import Coalesce, TruncDate
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.conf import settings
 from django.db import transaction
+from django.http import Http404
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.utils.encoding import force_str
-from django.utils.http import urlsafe_base64_decode
+from django.utils.http import urlsafe_base64_decode, http_date
+from django.utils.cache import get_conditional_response, patch_vary_headers, quote_etag
 
 from .permissions import IsNotChild, IsAdmin
+from users.authentication import ClaimsRefreshToken, bump_token_version, full_user
 
 from .utils import send_password_reset_email
+from .cache import household_cached, get_household_version
+from .pagination import TaskKeysetPagination
+from .search import IContainsSearch, get_search_backend
+from .bulk import BulkTaskOperations, MAX_OPERATIONS
+from .google_auth import verify_google_id_token
+from .leaderboard import household_leaderboard, period_window, PERIODS as LEADERBOARD_PERIODS
+from . import changes, jobs, points, recurrence, rollups
 
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError
+from rest_framework.fields import DateTimeField
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
-
-from .models import Task, Member, Category, Pet, Household, HouseholdInvite, RewardRedemption
+from .models import ArchivedTask, CompletionRollup, Task, Member, Category, Pet, Household, HouseholdInvite
 from .serializers import (
     TaskRowSerializer,
+    ArchivedTaskSerializer,
     MemberSerializer,
     TaskSerializer,
+    CalendarTaskSerializer,
     CategorySerializer,
     PetSerializer,
     RegisterSerializer,
@@ -49,37 +65,134 @@ password_reset_token = PasswordResetTokenGenerator()
 
 class DashboardView(APIView):
     permission_classes = [IsAuthenticated, IsNotChild]
+    # How far back missed occurrences of repeating tasks count as overdue
+    overdue_occurrence_days = 7
 
 
     def get(self, request):
-        qs = Task.objects.filter(household=request.user.household)
+        household_id = request.user.household_id
+        data = household_cached(household_id, "dashboard", lambda: self.build(household_id))
+        return Response(data)
 
-        now = timezone.now()
-        start_of_week = now - timedelta(days=now.weekday())
+    def build(self, household_id):
+        """
+        Costs a fixed four queries: one aggregate over the household's
+        completion rollups for the stats (see core.rollups),
+        one joined query per list (assignees come in via select_related) and
+        one for the household's repeating tasks, plus one for their stored
+        occurrences when there are any. Repeating tasks are expanded over the
+        last overdue_occurrence_days days and their next ten occurrences
+        (see core.recurrence).
+
+        The payload also depends on the clock, so it is cached only until the
+        next upcoming task falls due or the week rolls over.
+        """
+        qs = Task.objects.filter(household_id=household_id)
 
-        completed_this_week = qs.filter(completed=True, completed_at__gte=start_of_week).count()
-        pending_rewards = qs.filter(completed=True).count()
+        now = timezone.now()
+        today = timezone.localdate(now)
+        start_of_week = make_aware(datetime.combine(today - timedelta(days=today.weekday()), time.min))
 
-        overdue = qs.filter(completed=False, due_date__lt=now).order_by("due_date")[:10]
-        upcoming = qs.filter(completed=False, due_date__gte=now).order_by("due_date")[:10]
+        stats = CompletionRollup.objects.filter(household_id=household_id).aggregate(
+            completed_this_week=Coalesce(Sum("completed", filter=Q(day__gte=start_of_week.date())), 0),
+            pending_rewards=Coalesce(Sum("completed"), 0),
+        )
 
-        return Response({
-            "stats": {
-                "completed_this_week": completed_this_week,
-                "pending_rewards": pending_rewards,
-            },
+        rows = qs.select_related("assignee_member", "assignee_pet").filter(completed=False)
+        overdue = list(rows.filter(repeat="", due_date__lt=now).order_by("due_date")[:10])
+        upcoming = list(rows.filter(repeat="", due_date__gte=now).order_by("due_date")[:10])
+
+        since = now - timedelta(days=self.overdue_occurrence_days)
+        series = list(recurrence.series_overlapping(rows, since))
+        exclude = recurrence.stored_occurrences(series, since)
+        missed = recurrence.expand(series, since, now, exclude=exclude)
+        overdue = sorted(overdue + missed, key=lambda task: task.due_date)[:10]
+        upcoming = sorted(upcoming + recurrence.expand(series, now, limit=10, exclude=exclude),
+                          key=lambda task: task.due_date)[:10]
+
+        expires_at = start_of_week + timedelta(days=7)
+        if upcoming:
+            expires_at = min(expires_at, upcoming[0].due_date)
+        if missed:
+            expires_at = min(expires_at, missed[0].due_date + timedelta(days=self.overdue_occurrence_days))
+
+        data = {
+            "stats": stats,
             "overdue": TaskRowSerializer(overdue, many=True).data,
             "upcoming": TaskRowSerializer(upcoming, many=True).data,
-        })
+        }
+        return data, int((expires_at - now).total_seconds())
+
+
+def period_starts(period, current, count):
+    """First days of the `count` local weeks / months ending with the one starting on `current`."""
+    if period == "week":
+        return [current - timedelta(weeks=back) for back in range(count - 1, -1, -1)]
+    index = current.year * 12 + current.month - 1
+    return [date(month // 12, month % 12 + 1, 1) for month in range(index - count + 1, index + 1)]
+
+
+class DashboardTrendsView(APIView):
+    """
+    GET /api/dashboard/trends/?period=week (default) | month&count=12
+
+    Completed tasks and the points they are worth per local week or month
+    of completion, oldest first and ending with the current one, each with
+    every assigned member's share (member null: unassigned). One query over
+    the household's completion rollups (core.rollups); cached until the
+    current period ends.
+    """
+    permission_classes = [IsAuthenticated, IsNotChild]
+    max_count = 60
+
+    def get(self, request):
+        period = request.query_params.get("period", "week")
+        if period not in ("week", "month"):
+            raise ParseError("period must be one of: week, month.")
+        try:
+            count = max(1, min(int(request.query_params.get("count", 12)), self.max_count))
+        except ValueError:
+            raise ParseError("count must be a number.")
+
+        start, end = period_window(period)
+        starts = period_starts(period, start.date(), count)
+        household_id = request.user.household_id
+
+        def build():
+            timeout = max(1, int((end - timezone.now()).total_seconds()))
+            return {"period": period, "buckets": self.buckets(household_id, period, starts)}, timeout
+
+        name = f"trends:{period}:{count}:{starts[-1].isoformat()}"
+        return Response(household_cached(household_id, name, build))
+
+    def buckets(self, household_id, period, starts):
+        buckets = {first: {"start": first.isoformat(), "completed": 0, "points": 0, "members": {}} for first in starts}
+        rows = CompletionRollup.objects.filter(household_id=household_id, day__gte=starts[0]).values_list(
+            "day", "member_id", "completed", "points"
+        )
+        for day, member_id, completed, earned in rows:
+            first = day - timedelta(days=day.weekday()) if period == "week" else day.replace(day=1)
+            bucket = buckets[first]
+            share = bucket["members"].setdefault(member_id, {"member": member_id, "completed": 0, "points": 0})
+            for row in (bucket, share):
+                row["completed"] += completed
+                row["points"] += earned
+        for bucket in buckets.values():
+            bucket["members"] = sorted(bucket["members"].values(), key=lambda share: share["member"] or 0)
+        return list(buckets.values())
 
 
 class MembersListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        qs = Member.objects.filter(household=request.user.household).order_by("name")
-        data = MemberSerializer(qs, many=True).data
-        return Response(data)
+        household_id = request.user.household_id
+
+        def build():
+            qs = Member.objects.filter(household_id=household_id).order_by("name")
+            return MemberSerializer(qs, many=True).data, None
+
+        return Response(household_cached(household_id, "members", build))
 
 
 class MemberViewSet(viewsets.ModelViewSet):
@@ -87,10 +200,10 @@ class MemberViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Member.objects.filter(household=self.request.user.household).order_by("name")
+        return Member.objects.filter(household_id=self.request.user.household_id).order_by("name")
 
     def perform_create(self, serializer):
-        serializer.save(household=self.request.user.household)
+        serializer.save(household_id=self.request.user.household_id)
 
 
 class PetViewSet(viewsets.ModelViewSet):
@@ -98,10 +211,16 @@ class PetViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Pet.objects.filter(household=self.request.user.household).order_by("name")
+        return Pet.objects.filter(household_id=self.request.user.household_id).order_by("name")
+
+    def list(self, request, *args, **kwargs):
+        def build():
+            return super(PetViewSet, self).list(request, *args, **kwargs).data, None
+
+        return Response(household_cached(request.user.household_id, "pets", build))
 
     def perform_create(self, serializer):
-        serializer.save(household=self.request.user.household)
+        serializer.save(household_id=self.request.user.household_id)
 
 
 
@@ -110,31 +229,50 @@ class TaskViewSet(viewsets.ModelViewSet):
     CRUD API for tasks.
 
     Supports filters via query parameters:
-      - search: text in title/description
+      - search: full-text, prefix-matched search over title/description
+        (see core.search); unpaginated results come back best match first,
+        paginated ones newest first like the rest of the list
       - category: category id
       - assignee_member: member id
       - assignee_pet: pet id
       - completed: true/false/1/0
 
+    The list is cursor-paginated (see TaskKeysetPagination);
+    pass paginate=false for the full, unpaginated list.
+
+    A repeating task is listed once, as its series; occurrences are listed
+    only once stored (see occurrences() and core.recurrence).
+
+    Tasks completed long ago are archived (core.archive). include_archived=true
+    lists and retrieves them too, read-only and with an archived_at; search
+    matches them by substring, after the hot matches when unpaginated.
+
     Household is ALWAYS inferred from the authenticated user.
     """
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated, IsNotChild]
+    pagination_class = TaskKeysetPagination
 
     def get_queryset(self):
         # Always scope to user's household
         qs = Task.objects.filter(
-            household=self.request.user.household
-        ).order_by("-created_at")
-
+            household_id=self.request.user.household_id
+        ).order_by("-created_at", "-id")
+        return self.filter_tasks(qs, get_search_backend())
+
+    def get_archived_queryset(self):
+        qs = ArchivedTask.objects.filter(
+            household_id=self.request.user.household_id
+        ).order_by("-created_at", "-id")
+        # The full-text indexes only cover core_task.
+        return self.filter_tasks(qs, IContainsSearch())
+
+    def filter_tasks(self, qs, search_backend):
         p = self.request.query_params
 
         search = p.get("search")
         if search:
-            qs = qs.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search)
-            )
+            qs = search_backend.search(qs, search).order_by("search_rank", "-created_at", "-id")
 
         category = p.get("category")
         if category:
@@ -158,30 +296,138 @@ class TaskViewSet(viewsets.ModelViewSet):
 
         return qs
 
+    def include_archived(self):
+        return self.request.query_params.get("include_archived", "").lower() in ("1", "true", "yes")
+
+    def list(self, request, *args, **kwargs):
+        if not self.include_archived():
+            return super().list(request, *args, **kwargs)
+
+        hot, archived = self.filter_queryset(self.get_queryset()), self.get_archived_queryset()
+        page = self.paginate_queryset([hot, archived])
+        if page is not None:
+            return self.get_paginated_response(self.serialize_rows(page))
+
+        rows = [*hot, *archived]
+        if not request.query_params.get("search"):
+            rows.sort(key=lambda obj: (obj.created_at, obj.pk), reverse=True)
+        return Response(self.serialize_rows(rows))
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            if not self.include_archived():
+                raise
+        archived = get_object_or_404(self.get_archived_queryset(), pk=kwargs["pk"])
+        return Response(ArchivedTaskSerializer(archived).data)
+
+    def serialize_rows(self, rows):
+        """Hot and archived tasks, in order; archived ids never clash with hot ones."""
+        hot = self.get_serializer([row for row in rows if isinstance(row, Task)], many=True).data
+        archived = ArchivedTaskSerializer([row for row in rows if isinstance(row, ArchivedTask)], many=True).data
+        by_id = {row["id"]: row for row in [*hot, *archived]}
+        return [by_id[row.pk] for row in rows]
+
     def perform_create(self, serializer):
         # 🔐 Always assign task to user's household
         serializer.save(
-            household=self.request.user.household
+            household_id=self.request.user.household_id
         )
 
+    @transaction.atomic
     def perform_update(self, serializer):
         """
-        Automatically stamps completed_at when a task is marked completed.
+        Automatically stamps completed_at when a task is marked completed,
+        and credits / takes back the completion points.
+        """
+        instance = serializer.instance
+        was_completed = instance.completed
+        completed = serializer.validated_data.get("completed", was_completed)
+
+        # Claim the completion change with a conditional UPDATE, so two
+        # concurrent requests toggling the same task award points once.
+        toggled = completed != was_completed and Task.objects.filter(
+            pk=instance.pk, completed=was_completed
+        ).update(completed=completed) == 1
+        if completed != was_completed and not toggled:
+            # The other request's save already counted this change in the
+            # completion rollups; start from what it stored.
+            instance.refresh_from_db(fields=["completed", "completed_at"])
+            rollups.remember(instance)
+
+        stamp = {}
+        if not was_completed and completed and instance.completed_at is None:
+            stamp["completed_at"] = timezone.now()
+        obj = serializer.save(**stamp)
+
+        if toggled:
+            points.record_completion(self.request.user, obj, obj.completed)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        # A deleted occurrence must not come back when its series is expanded.
+        if instance.series_id:
+            recurrence.skip(instance.series_id, instance.occurrence_at)
+        instance.delete()
+
+    @action(detail=True, methods=["post", "delete"])
+    def occurrences(self, request, pk=None):
+        """
+        POST /api/tasks/<series id>/occurrences/
+        Body: { "occurrence_at": "<its due date>", ...task fields to change... }
+        Stores one occurrence of a repeating task as a task of its own (if it
+        isn't already) and applies the changes, e.g. {"completed": true}.
+        201 with the task when it was stored now, 200 when it already was.
+
+        DELETE /api/tasks/<series id>/occurrences/?occurrence_at=<its due date>
+        Removes one occurrence from the series.
+        """
+        series = self.get_object()
+        if not series.repeat:
+            return Response({"detail": "Not a repeating task."}, status=status.HTTP_400_BAD_REQUEST)
+
+        source = request.data if request.method == "POST" else request.query_params
+        occurrence_at = DateTimeField().run_validation(source.get("occurrence_at"))
+        if not recurrence.is_occurrence(series, occurrence_at):
+            return Response({"occurrence_at": ["Not an occurrence of this task."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            if request.method == "DELETE":
+                recurrence.skip(series.pk, occurrence_at)
+                Task.objects.filter(series=series, occurrence_at=occurrence_at).delete()
+                return Response(status=status.HTTP_204_NO_CONTENT)
+
+            if ArchivedTask.objects.filter(series=series, occurrence_at=occurrence_at).exists():
+                return Response({"occurrence_at": ["This occurrence is archived."]}, status=status.HTTP_400_BAD_REQUEST)
+            task, created = recurrence.materialize(series, occurrence_at)
+            edits = {key: value for key, value in request.data.items() if key != "occurrence_at"}
+            serializer = self.get_serializer(task, data=edits, partial=True)
+            serializer.is_valid(raise_exception=True)
+            self.perform_update(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
         """
-        was_completed = serializer.instance.completed
-        obj = serializer.save()
+        POST /api/tasks/bulk/
+        Body: { "operations": [ {"op": "create" | "update" | "complete" | "delete", ...}, ... ] }
 
-        if was_completed != obj.completed:
-            points_delta = 10 if obj.completed else -10
-            user = self.request.user
-            new_balance = max(0, user.points_balance + points_delta)
-            if new_balance != user.points_balance:
-                user.points_balance = new_balance
-                user.save(update_fields=["points_balance"])
+        All-or-nothing: see core.bulk for the operation format.
+        """
+        operations = request.data.get("operations")
+        if not isinstance(operations, list) or not operations:
+            return Response({"detail": "operations must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(operations) > MAX_OPERATIONS:
+            return Response(
+                {"detail": f"At most {MAX_OPERATIONS} operations per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        if not was_completed and obj.completed and obj.completed_at is None:
-            obj.completed_at = timezone.now()
-            obj.save(update_fields=["completed_at"])
+        result, errors = BulkTaskOperations(request).run(operations)
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
 
 
 class CategoryViewSet(viewsets.ModelViewSet):
@@ -194,12 +440,18 @@ class CategoryViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         return Category.objects.filter(
-            household=self.request.user.household
+            household_id=self.request.user.household_id
         ).order_by("name")
 
+    def list(self, request, *args, **kwargs):
+        def build():
+            return super(CategoryViewSet, self).list(request, *args, **kwargs).data, None
+
+        return Response(household_cached(request.user.household_id, "categories", build))
+
     def perform_create(self, serializer):
         serializer.save(
-            household=self.request.user.household
+            household_id=self.request.user.household_id
         )
 
 
@@ -221,6 +473,99 @@ class RegisterView(APIView):
             )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+def google_login_profile(idinfo):
+    """
+    (email, given_name, family_name, full_name) from verified Google ID
+    token claims. Raises ParseError if the token can't be used to log in.
+    """
+    email = (idinfo.get("email") or "").strip().lower()
+    if not email:
+        raise ParseError("Google token missing email")
+
+    # Email Verification
+    if idinfo.get("email_verified") is False:
+        raise ParseError("Google email not verified")
+
+    given_name = (idinfo.get("given_name") or "").strip()
+    family_name = (idinfo.get("family_name") or "").strip()
+    full_name = (idinfo.get("name") or "").strip()
+    return email, given_name, family_name, full_name
+
+
+def google_login_needs_update(user, given_name, family_name):
+    """Whether google_login_user would write to an existing user."""
+    return (
+        getattr(user, "auth_provider", "") != "google"
+        or getattr(user, "household_id", None) is None
+        or (not user.first_name and bool(given_name))
+        or (not user.last_name and bool(family_name))
+    )
+
+
+@transaction.atomic
+def google_login_user(email, given_name, family_name, full_name):
+    """Find or create the user (with a household and member profile) for a Google login."""
+    # 2) Find existing user
+    user = User.objects.filter(email__iexact=email).first()
+
+    # 3) Create user + household if new
+    if not user:
+        household_name = f"{full_name}'s Household" if full_name else f"{email}'s Household"
+        household = Household.objects.create(name=household_name)
+
+        # Create user with safe defaults.
+        return User.objects.create(
+            email=email,
+            username=email,
+            first_name=given_name,
+            last_name=family_name,
+            household=household,
+            role="admin",
+            auth_provider="google",
+        )
+
+    # Existing user: ensure provider is set correctly
+    if getattr(user, "auth_provider", "") != "google":
+        user.auth_provider = "google"
+        user.save(update_fields=["auth_provider"])
+
+    # Safety: if an old user somehow has no household, create one.
+    if getattr(user, "household_id", None) is None:
+        household_name = f"{full_name}'s Household" if full_name else f"{email}'s Household"
+        user.household = Household.objects.create(name=household_name)
+        user.save(update_fields=["household"])
+
+    # Optional: fill names if blank
+    update_fields = []
+    if hasattr(user, "first_name") and not user.first_name and given_name:
+        user.first_name = given_name
+        update_fields.append("first_name")
+    if hasattr(user, "last_name") and not user.last_name and family_name:
+        user.last_name = family_name
+        update_fields.append("last_name")
+    if update_fields:
+        user.save(update_fields=update_fields)
+
+    # Ensure this user has a Member profile in the household
+    Member.objects.get_or_create(
+        household=user.household,
+        user=user,
+        defaults={
+            "name": user.get_full_name().strip() or user.username,
+            "avatar_url": "",
+        },
+    )
+    return user
+
+
+def login_tokens(user):
+    refresh = ClaimsRefreshToken.for_user(user)
+    return {
+        "access": str(refresh.access_token),
+        "refresh": str(refresh),
+    }
+
+
 class GoogleAuthView(APIView):
     """
     POST /api/auth/google/
@@ -228,10 +573,11 @@ class GoogleAuthView(APIView):
 
     Returns:
       { "access": "...", "refresh": "..." }
+
+    core.async_views.google_auth is the same for ASGI deployments.
     """
     permission_classes = [AllowAny]
 
-    @transaction.atomic
     def post(self, request):
         token = request.data.get("id_token")
         if not token:
@@ -240,141 +586,227 @@ class GoogleAuthView(APIView):
         if not getattr(settings, "GOOGLE_OAUTH_CLIENT_ID", ""):
             return Response({"detail": "GOOGLE_OAUTH_CLIENT_ID not configured"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        # 1) Verify Google ID token
+        # 1) Verify Google ID token (certificates are cached, see core.google_auth)
         try:
-            idinfo = id_token.verify_oauth2_token(
-                token,
-                google_requests.Request(),
-                settings.GOOGLE_OAUTH_CLIENT_ID,
-            )
+            idinfo = verify_google_id_token(token, settings.GOOGLE_OAUTH_CLIENT_ID)
         except Exception:
             return Response({"detail": "Invalid Google token"}, status=status.HTTP_400_BAD_REQUEST)
 
-        email = (idinfo.get("email") or "").strip().lower()
-        if not email:
-            return Response({"detail": "Google token missing email"}, status=status.HTTP_400_BAD_REQUEST)
+        user = google_login_user(*google_login_profile(idinfo))
 
-        # Email Verification
-        if idinfo.get("email_verified") is False:
-            return Response({"detail": "Google email not verified"}, status=status.HTTP_400_BAD_REQUEST)
+        # 4) Issue SimpleJWT tokens
+        return Response(login_tokens(user), status=status.HTTP_200_OK)
 
-        given_name = (idinfo.get("given_name") or "").strip()
-        family_name = (idinfo.get("family_name") or "").strip()
-        full_name = (idinfo.get("name") or "").strip()
+def parse_calendar_range(request):
+    """
+    Parse the ?start=YYYY-MM-DD&end=YYYY-MM-DD pair shared by the calendar views.
+    """
+    start_param = request.query_params.get("start")
+    end_param = request.query_params.get("end")
 
-        # 2) Find existing user
-        user = User.objects.filter(email__iexact=email).first()
+    if not start_param or not end_param:
+        raise ParseError("start and end query parameters are required (YYYY-MM-DD).")
 
-        # 3) Create user + household if new
-        if not user:
-            household_name = f"{full_name}'s Household" if full_name else f"{email}'s Household"
-            household = Household.objects.create(name=household_name)
-
-            # Create user with safe defaults.
-            user = User.objects.create(
-                email=email,
-                username=email,
-                first_name=given_name,
-                last_name=family_name,
-                household=household,
-                role="admin",
-                auth_provider="google",
-            )
+    # Parse as dates (recommended for calendar month/week views)
+    start_date = parse_date(start_param)
+    end_date = parse_date(end_param)
 
-        else:
-            # Existing user: ensure provider is set correctly
-            if getattr(user, "auth_provider", "") != "google":
-                user.auth_provider = "google"
-                user.save(update_fields=["auth_provider"])
-
-            # Safety: if an old user somehow has no household, create one.
-            if getattr(user, "household_id", None) is None:
-                household_name = f"{full_name}'s Household" if full_name else f"{email}'s Household"
-                user.household = Household.objects.create(name=household_name)
-                user.save(update_fields=["household"])
-
-            # Optional: fill names if blank
-            update_fields = []
-            if hasattr(user, "first_name") and not user.first_name and given_name:
-                user.first_name = given_name
-                update_fields.append("first_name")
-            if hasattr(user, "last_name") and not user.last_name and family_name:
-                user.last_name = family_name
-                update_fields.append("last_name")
-            if update_fields:
-                user.save(update_fields=update_fields)
-
-            # Ensure this user has a Member profile in the household
-            Member.objects.get_or_create(
-                household=user.household,
-                user=user,
-                defaults={
-                    "name": user.get_full_name().strip() or user.username,
-                    "avatar_url": "",
-                },
-            )
+    if not start_date or not end_date:
+        raise ParseError("Invalid date format. Use YYYY-MM-DD for start and end.")
+
+    return start_date, end_date
+
+
+def local_day_bounds(start_date, end_date, tz):
+    start_dt = make_aware(datetime.combine(start_date, time.min), timezone=tz)
+    end_dt = make_aware(datetime.combine(end_date, time.min), timezone=tz)
+    return start_dt, end_dt
+
+
+def tasks_overlapping(qs, start_dt, end_dt):
+    """
+    Overlap logic:
+    If start_at exists: task window is [start_at, due_date]
+    Else: treat task as "instant" at due_date
+    Include tasks whose window overlaps [start_dt, end_dt)
+
+    Repeating tasks are left out; callers expand them over the range
+    (see core.recurrence).
+    """
+    return qs.filter(repeat="").filter(
+        Q(start_at__isnull=False, due_date__isnull=False, start_at__lt=end_dt, due_date__gte=start_dt)
+        | Q(start_at__isnull=True, due_date__isnull=False, due_date__gte=start_dt, due_date__lt=end_dt)
+    )
+
+
+def expand_series(household_tasks, start_dt, end_dt):
+    """Occurrences of repeating tasks overlapping [start_dt, end_dt); one or two queries."""
+    series = list(recurrence.series_overlapping(household_tasks, start_dt, end_dt)
+                  .select_related("assignee_member", "assignee_pet"))
+    if not series:
+        return []
+    latest = end_dt + max(recurrence.lead_time(s) for s in series)
+    exclude = recurrence.stored_occurrences(series, start_dt, latest)
+    return recurrence.expand(series, start_dt, end_dt, exclude=exclude, overlapping=True)
 
-        # 4) Issue SimpleJWT tokens
-        refresh = RefreshToken.for_user(user)
-        return Response(
-            {
-                "access": str(refresh.access_token),
-                "refresh": str(refresh),
-            },
-            status=status.HTTP_200_OK,
-        )
 
 class CalendarTasksView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         """
-        GET /api/calendar/tasks/?start=YYYY-MM-DD&end=YYYY-MM-DD
+        GET /api/calendar/tasks/?start=YYYY-MM-DD&end=YYYY-MM-DD[&compact=true]
         Returns tasks overlapping the [start, end) range, household-scoped.
-        """
-        start_param = request.query_params.get("start")
-        end_param = request.query_params.get("end")
 
-        if not start_param or not end_param:
-            return Response(
-                {"detail": "start and end query parameters are required (YYYY-MM-DD)."},
-                status=400,
-            )
+        compact=true returns CalendarTaskSerializer rows (ids, titles, times,
+        priority, assignee) instead of full tasks.
 
-        # Parse as dates (recommended for calendar month/week views)
-        start_date = parse_date(start_param)
-        end_date = parse_date(end_param)
+        Repeating tasks are expanded over the range: each occurrence that
+        isn't stored comes back as a copy of its series with no id, "series"
+        set to the series id and "occurrence_at" to its due date (see
+        core.recurrence).
 
-        if not start_date or not end_date:
-            return Response(
-                {"detail": "Invalid date format. Use YYYY-MM-DD for start and end."},
-                status=400,
-            )
+        Responses carry ETag / Last-Modified derived from the tasks in range,
+        so a re-fetch of an unchanged range is a 304 with nothing serialized.
+        """
+        start_date, end_date = parse_calendar_range(request)
+        start_dt, end_dt = local_day_bounds(start_date, end_date, get_current_timezone())
 
-        tz = get_current_timezone()
-        start_dt = make_aware(datetime.combine(start_date, time.min), timezone=tz)
-        end_dt = make_aware(datetime.combine(end_date, time.min), timezone=tz)
+        household_id = request.user.household_id
+        compact = request.query_params.get("compact", "").lower() in ("1", "true", "yes")
 
         # Household scoped
-        qs = Task.objects.filter(household=request.user.household)
-
-        # Overlap logic:
-        # If start_at exists: task window is [start_at, due_date]
-        # Else: treat task as "instant" at due_date
-        # Include tasks whose window overlaps [start_dt, end_dt)
-        qs = qs.filter(
-            Q(start_at__isnull=False, due_date__isnull=False, start_at__lt=end_dt, due_date__gte=start_dt)
-            | Q(start_at__isnull=True, due_date__isnull=False, due_date__gte=start_dt, due_date__lt=end_dt)
-        ).order_by("due_date")
-
-        data = TaskSerializer(qs, many=True, context={"request": request}).data
-        return Response(data)
+        household_tasks = Task.objects.filter(household_id=household_id)
+        qs = tasks_overlapping(household_tasks, start_dt, end_dt).order_by("due_date")
+
+        # max(updated_at) catches edits, the count catches tasks deleted from
+        # or moved out of the range; the household version catches renamed
+        # assignees, which don't touch Task.updated_at, and changed series.
+        state = qs.aggregate(last_modified=Max("updated_at"), count=Count("id"))
+        last_modified = state["last_modified"]
+        etag = quote_etag(hashlib.md5(
+            f"{get_household_version(household_id)}:{last_modified}:{state['count']}:{compact}".encode()
+        ).hexdigest())
+        last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+
+        not_modified = get_conditional_response(request._request, etag=etag, last_modified=last_modified_ts)
+        if not_modified is not None:
+            response = not_modified
+        else:
+            occurrences = expand_series(household_tasks, start_dt, end_dt)
+            if compact:
+                rows = list(qs.values(*CalendarTaskSerializer.VALUES))
+                if occurrences:
+                    rows = sorted(rows + [CalendarTaskSerializer.row(task) for task in occurrences],
+                                  key=lambda row: row["due_date"])
+                response = Response(CalendarTaskSerializer(rows, many=True).data)
+            else:
+                tasks = list(qs)
+                if occurrences:
+                    tasks = sorted(tasks + occurrences, key=lambda task: task.due_date)
+                response = Response(TaskSerializer(tasks, many=True, context={"request": request}).data)
+
+        response["ETag"] = etag
+        if last_modified_ts is not None:
+            response["Last-Modified"] = http_date(last_modified_ts)
+        # Always revalidate; the payload is per user.
+        response["Cache-Control"] = "private, no-cache"
+        patch_vary_headers(response, ["Authorization"])
+        return response
+
+class CalendarDayCountsView(APIView):
+    """
+    GET /api/calendar/day-counts/?start=YYYY-MM-DD&end=YYYY-MM-DD[&tz=Area/City]
+
+    Per-day task counts for month grids and heatmaps, using the same overlap
+    rules as CalendarTasksView. A task spanning start_at -> due_date counts
+    on every local day it touches. Days are local to `tz` (an IANA name,
+    defaulting to the server time zone).
+
+    Counting happens in the database: every task contributes +1 on its first
+    day and -1 on the day after its last, grouped by truncated local date.
+    A running sum over the range then gives each day's count, so the cost is
+    two grouped queries and the payload is O(days), not O(tasks). Occurrences
+    of repeating tasks are expanded in Python (core.recurrence) and added to
+    the same running sum, for one more query (two if there are any).
+    """
+    permission_classes = [IsAuthenticated]
+    max_days = 366
+
+    def get(self, request):
+        start_date, end_date = parse_calendar_range(request)
+        if end_date <= start_date:
+            raise ParseError("end must be after start.")
+        if (end_date - start_date).days > self.max_days:
+            raise ParseError(f"Range may span at most {self.max_days} days.")
+
+        tz_name = request.query_params.get("tz")
+        try:
+            tz = ZoneInfo(tz_name) if tz_name else get_current_timezone()
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ParseError("Unknown time zone.")
+
+        start_dt, end_dt = local_day_bounds(start_date, end_date, tz)
+        now = timezone.now()
+
+        household_tasks = Task.objects.filter(household_id=request.user.household_id)
+        qs = tasks_overlapping(household_tasks, start_dt, end_dt)
+        qs = qs.annotate(
+            first_day=TruncDate(Coalesce("start_at", "due_date"), tzinfo=tz),
+            last_day=TruncDate("due_date", tzinfo=tz),
+        )
+        counts = {
+            "total": Count("id"),
+            "overdue": Count("id", filter=Q(completed=False, due_date__lt=now)),
+            "high_priority": Count("id", filter=Q(priority="high")),
+        }
+
+        deltas = defaultdict(lambda: dict.fromkeys(counts, 0))
+        for row in qs.values("first_day").annotate(**counts).order_by():
+            # Tasks that began before the range open on its first day
+            day = max(row["first_day"], start_date)
+            for key in counts:
+                deltas[day][key] += row[key]
+        for row in qs.values("last_day").annotate(**counts).order_by():
+            day = row["last_day"] + timedelta(days=1)
+            for key in counts:
+                deltas[day][key] -= row[key]
+        for task in expand_series(household_tasks, start_dt, end_dt):
+            counted = {"total": 1, "overdue": int(task.due_date < now), "high_priority": int(task.priority == "high")}
+            first_day = max(timezone.localdate(task.start_at or task.due_date, tz), start_date)
+            last_day = timezone.localdate(task.due_date, tz) + timedelta(days=1)
+            for key in counts:
+                deltas[first_day][key] += counted[key]
+                deltas[last_day][key] -= counted[key]
+
+        days = []
+        running = dict.fromkeys(counts, 0)
+        day = start_date
+        while day < end_date:
+            if day in deltas:
+                for key in counts:
+                    running[key] += deltas[day][key]
+            days.append({"date": day.isoformat(), **running})
+            day += timedelta(days=1)
+
+        return Response({
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat(),
+            "timezone": str(tz),
+            "days": days,
+        })
+
+
+PASSWORD_RESET_SENT = "If this email exists, a reset link will be sent."
+
 
 class PasswordResetRequestView(APIView):
     """
     POST /api/password-reset/
     Body: { "email": "user@example.com" }
     Always returns success to avoid revealing which emails exist.
+
+    core.async_views.password_reset_request is the same for ASGI deployments.
     """
     permission_classes = []
 
@@ -382,18 +814,18 @@ class PasswordResetRequestView(APIView):
         email = request.data.get("email", "").strip()
 
         if not email:
-            return Response({"detail": "If this email exists, a reset link will be sent."})
+            return Response({"detail": PASSWORD_RESET_SENT})
 
         try:
             user = User.objects.get(email__iexact=email)
         except User.DoesNotExist:
             # Do NOT reveal existence of emails
-            return Response({"detail": "If this email exists, a reset link will be sent."})
+            return Response({"detail": PASSWORD_RESET_SENT})
 
-        # This handles uid, token, reset_url, and sending the email
+        # This handles uid, token, reset_url, and queueing the email
         send_password_reset_email(user)
 
-        return Response({"detail": "If this email exists, a reset link will be sent."})
+        return Response({"detail": PASSWORD_RESET_SENT})
 
 
 class PasswordResetConfirmView(APIView):
@@ -430,6 +862,8 @@ class PasswordResetConfirmView(APIView):
 
 
 class TokenObtainPairWithMemberSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
     def validate(self, attrs):
         data = super().validate(attrs)
         user = self.user
@@ -460,12 +894,12 @@ class MeView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        serializer = CurrentUserSerializer(request.user)
+        serializer = CurrentUserSerializer(full_user(request.user))
         return Response(serializer.data)
 
     def patch(self, request):
         serializer = CurrentUserSerializer(
-            request.user,
+            full_user(request.user),
             data=request.data,
             partial=True
         )
@@ -492,7 +926,7 @@ class ChangePasswordView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        user = request.user
+        user = full_user(request.user)
         if not user.check_password(old_password):
             return Response(
                 {"detail": "Old password is incorrect."},
@@ -513,7 +947,23 @@ class ChangePasswordView(APIView):
 
         return Response({"detail": "Password updated successfully."})
     
+@transaction.atomic
+def create_invite(household_id, email, role):
+    """Create an invite and queue its email. Returns the invite link."""
+    email = email.lower().strip()
+    invite = HouseholdInvite.objects.create(household_id=household_id, email=email, role=role)
+    invite_link = f"{settings.FRONTEND_BASE_URL}/invite/accept?token={invite.token}"
+    # Sent by `manage.py run_jobs`; queued only if the invite commits.
+    jobs.enqueue_email(
+        subject="You’ve been invited to join a household",
+        body=f"Accept your invite here: {invite_link}",
+        to=[email],
+    )
+    return invite_link
+
+
 class HouseholdInviteCreateView(APIView):
+    """core.async_views.household_invite_create is the same for ASGI deployments."""
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
@@ -524,37 +974,20 @@ class HouseholdInviteCreateView(APIView):
         serializer = HouseholdInviteCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        invite = HouseholdInvite.objects.create(
-            household=request.user.household,
-            email=serializer.validated_data["email"].lower().strip(),
-            role=serializer.validated_data["role"],
+        invite_link = create_invite(
+            request.user.household_id,
+            serializer.validated_data["email"],
+            serializer.validated_data["role"],
         )
-
-        invite_link = f"{settings.FRONTEND_BASE_URL}/invite/accept?token={invite.token}"
-
-        from django.core.mail import send_mail
-
-        email_sent = True
-        email_error = None
-
-        try:
-            send_mail(
-                subject="You’ve been invited to join a household",
-                message=f"Accept your invite here: {invite_link}",
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[invite.email],
-                fail_silently=False,
-            )
-        except Exception as e:
-            email_sent = False
-            email_error = str(e)
-
         return Response(
             {
                 "detail": "Invite created.",
                 "invite_link": invite_link,
-                "email_sent": email_sent,
-                "email_error": email_error,
+                "email_queued": True,
+                # Kept for clients written against the synchronous send: the email
+                # is accepted for delivery, and failures are retried by run_jobs.
+                "email_sent": True,
+                "email_error": None,
             },
             status=status.HTTP_201_CREATED,
         )
@@ -577,19 +1010,23 @@ class HouseholdInviteAcceptView(APIView):
         if invite.is_expired():
             return Response({"detail": "Invite expired."}, status=status.HTTP_400_BAD_REQUEST)
         
-        if request.user.email.strip().lower() != invite.email.strip().lower():
+        user = full_user(request.user)
+        if user.email.strip().lower() != invite.email.strip().lower():
             return Response(
                 {"detail": "This invite was sent to a different email address."},
                 status=status.HTTP_403_FORBIDDEN,
         )
 
 
-        request.user.household = invite.household
-        request.user.role = invite.role
-        request.user.save(update_fields=["household", "role"])
+        user.household = invite.household
+        user.role = invite.role
+        user.save(update_fields=["household", "role"])
+        # Tokens carry household and role; make the client use new ones.
+        bump_token_version(user.pk)
+        user.refresh_from_db(fields=["token_version"])
 
-        member_name = request.user.get_full_name().strip() or request.user.username
-        existing_member = Member.objects.filter(user=request.user).first()
+        member_name = user.get_full_name().strip() or user.username
+        existing_member = Member.objects.filter(user=user).first()
         if existing_member:
             existing_member.household = invite.household
             if member_name:
@@ -598,7 +1035,7 @@ class HouseholdInviteAcceptView(APIView):
         else:
             Member.objects.create(
                 household=invite.household,
-                user=request.user,
+                user=user,
                 name=member_name,
                 avatar_url="",
             )
@@ -607,7 +1044,15 @@ class HouseholdInviteAcceptView(APIView):
         invite.accepted_at = timezone.now()
         invite.save(update_fields=["accepted_at"])
 
-        return Response({"detail": "Invite accepted."}, status=status.HTTP_200_OK)
+        refresh = ClaimsRefreshToken.for_user(user)
+        return Response(
+            {
+                "detail": "Invite accepted.",
+                "access": str(refresh.access_token),
+                "refresh": str(refresh),
+            },
+            status=status.HTTP_200_OK,
+        )
     
 class HouseholdUserRoleUpdateView(APIView):
     permission_classes = [IsAuthenticated, IsAdmin]
@@ -618,12 +1063,13 @@ class HouseholdUserRoleUpdateView(APIView):
         if role not in ["admin", "adult", "child"]:
             return Response({"detail": "Invalid role."}, status=status.HTTP_400_BAD_REQUEST)
 
-        user = User.objects.filter(id=user_id, household=request.user.household).first()
+        user = User.objects.filter(id=user_id, household_id=request.user.household_id).first()
         if not user:
             return Response({"detail": "User not found in your household."}, status=status.HTTP_404_NOT_FOUND)
 
         user.role = role
         user.save(update_fields=["role"])
+        bump_token_version(user.pk)
 
         return Response({"detail": "Role updated successfully.", "role": user.role})
 
@@ -632,28 +1078,23 @@ class RewardsSummaryView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
+        """
+        ?period=all (default, current balances) | week | month (points
+        earned from tasks in the current local week / month).
+        """
         user = request.user
-        household = getattr(user, "household", None)
-        if household is None:
+        if user.household_id is None:
             return Response({"detail": "User is not associated with a household."}, status=status.HTTP_400_BAD_REQUEST)
 
-        users = User.objects.filter(household=household).order_by("-points_balance", "id")
-        leaderboard = []
-        for member in users:
-            name = member.get_full_name().strip() or member.username
-            leaderboard.append(
-                {
-                    "id": member.id,
-                    "name": name,
-                    "points": member.points_balance,
-                    "role": member.role,
-                }
-            )
+        period = request.query_params.get("period", "all")
+        if period not in LEADERBOARD_PERIODS:
+            raise ParseError(f"period must be one of: {', '.join(LEADERBOARD_PERIODS)}.")
 
-        household_total_points = sum(m.points_balance for m in users)
+        leaderboard, household_total_points = household_leaderboard(user.household_id, period)
 
         return Response(
             {
+                "period": period,
                 "my_points": user.points_balance,
                 "household_total_points": household_total_points,
                 "leaderboard": leaderboard,
@@ -669,27 +1110,55 @@ class RewardsRedeemView(APIView):
         serializer.is_valid(raise_exception=True)
 
         user = request.user
-        household = getattr(user, "household", None)
-        if household is None:
+        if user.household_id is None:
             return Response({"detail": "User is not associated with a household."}, status=status.HTTP_400_BAD_REQUEST)
 
-        points = serializer.validated_data["points"]
+        amount = serializer.validated_data["points"]
         note = serializer.validated_data.get("note", "").strip()
 
-        if user.points_balance < points:
+        try:
+            points.redeem(user, amount, note)
+        except points.InsufficientPoints:
             return Response({"detail": "Not enough points."}, status=status.HTTP_400_BAD_REQUEST)
 
-        RewardRedemption.objects.create(
-            household=household,
-            user=user,
-            points_redeemed=points,
-            note=note,
-        )
+        return Response({"detail": "Rewards redeemed.", "new_balance": points.current_balance(user)})
 
-        user.points_balance = max(0, user.points_balance - points)
-        user.save(update_fields=["points_balance"])
 
-        return Response({"detail": "Rewards redeemed.", "new_balance": user.points_balance})
 
 
 
+class SyncView(APIView):
+    """
+    GET /api/sync/?since=<cursor>&limit=500
+
+    Tasks, members, pets and categories created, updated or deleted since
+    `cursor`, in change order (see core.changes). Omit `since` to download
+    the whole household. Keep the returned cursor and ask again while
+    has_more is true. `reset` means the cursor belongs to another household
+    (the user moved): drop local data and apply the full download returned.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        household_id = request.user.household_id
+        if household_id is None:
+            return Response({"detail": "User is not associated with a household."}, status=status.HTTP_400_BAD_REQUEST)
+
+        since, reset = 0, False
+        cursor = request.query_params.get("since")
+        if cursor:
+            try:
+                cursor_household_id, since = changes.parse_cursor(cursor)
+            except ValueError:
+                raise ParseError("since must be a cursor returned by this endpoint.")
+            if cursor_household_id != household_id:
+                since, reset = 0, True
+
+        try:
+            limit = int(request.query_params.get("limit", changes.DEFAULT_PAGE_SIZE))
+        except ValueError:
+            raise ParseError("limit must be an integer.")
+        limit = max(1, min(limit, changes.MAX_PAGE_SIZE))
+
+        page = changes.changes_page(household_id, since, limit, {"request": request})
+        return Response({"reset": reset, **page})
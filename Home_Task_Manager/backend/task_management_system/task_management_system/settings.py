@@ -45,6 +45,7 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'users.User'
 
 MIDDLEWARE = [
+    'core.timing.RequestTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',    
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -86,7 +87,8 @@ if DATABASE_URL:
         "default": dj_database_url.parse(
             DATABASE_URL,
             conn_max_age=600,
-            ssl_require=True,
+            # False for a local database, e.g. for benchmarks/endpoint_benchmark.py
+            ssl_require=os.environ.get("DATABASE_SSL_REQUIRE", "True") == "True",
         )
     }
 else:
@@ -97,6 +99,28 @@ else:
         }
     }
 
+# Cache for household responses and their versions (core.cache). Versions
+# are bumped by the job worker and management commands as well as the web
+# workers, so every process must share one cache. DJANGO_CACHE_URL picks it:
+#   db://<table>       the database (core.signals creates the table on migrate)
+#   redis://host:port  Redis (needs the redis package)
+#   locmem://          per-process memory: single-process development and tests only
+# Production (DEBUG off) defaults to the database.
+CACHE_URL = os.environ.get("DJANGO_CACHE_URL", "locmem://" if DEBUG else "db://django_cache")
+
+if CACHE_URL.startswith(("redis://", "rediss://")):
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": CACHE_URL}}
+elif CACHE_URL.startswith("db://"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": CACHE_URL.removeprefix("db://"),
+        }
+    }
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -139,9 +163,19 @@ STATIC_URL = 'static/'
 # Django REST Framework global settings
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.ClaimsJWTAuthentication",
     ],
     # For now we won't enforce auth globally; we'll do that later per-view if needed.
+    # DRF's defaults, with JSON rendering timed for REQUEST_TIMING (core.timing).
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.timing.TimedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+
+SIMPLE_JWT = {
+    # Re-read the user's claims on refresh (see users.authentication).
+    "TOKEN_REFRESH_SERIALIZER": "users.authentication.ClaimsTokenRefreshSerializer",
 }
 
 
@@ -162,3 +196,28 @@ FRONTEND_BASE_URL = os.getenv("FRONTEND_BASE_URL", "http://localhost:5173")
 
 # Google OAuth
 GOOGLE_OAUTH_CLIENT_ID = os.environ.get("GOOGLE_OAUTH_CLIENT_ID", "")
+
+# Google Calendar sync (core.calendar_sync): a service account with access
+# to the linked calendars, and its request budget in calls per second.
+GOOGLE_CALENDAR_API_URL = os.environ.get("GOOGLE_CALENDAR_API_URL", "https://www.googleapis.com")
+GOOGLE_CALENDAR_CREDENTIALS_FILE = os.environ.get("GOOGLE_CALENDAR_CREDENTIALS_FILE", "")
+GOOGLE_CALENDAR_RATE_LIMIT = float(os.environ.get("GOOGLE_CALENDAR_RATE_LIMIT", "10"))
+
+# Live household events (core.events): LocalBroker only reaches streams in
+# the same process; use core.events.PostgresBroker with several workers.
+HOUSEHOLD_EVENTS_BROKER = os.environ.get("HOUSEHOLD_EVENTS_BROKER", "core.events.LocalBroker")
+
+# Serve Google login, invites and password reset with the async views in
+# core.async_views. asgi.py turns this on; WSGI keeps the DRF views.
+ASYNC_VIEWS = os.environ.get("DJANGO_ASYNC_VIEWS", "0") == "1"
+
+# Per-request SQL / serialization timings (core.timing): Server-Timing
+# headers and a "core.timing" log record per request; requests over either
+# threshold are logged as warnings with their most expensive statements.
+REQUEST_TIMING = os.environ.get("DJANGO_REQUEST_TIMING", "0") == "1"
+REQUEST_TIMING_SLOW_MS = int(os.environ.get("DJANGO_REQUEST_TIMING_SLOW_MS", "500"))
+REQUEST_TIMING_MAX_QUERIES = int(os.environ.get("DJANGO_REQUEST_TIMING_MAX_QUERIES", "30"))
+
+# Tasks completed this many days ago are moved to the archive table by the
+# archive_tasks command (core.archive).
+TASK_ARCHIVE_AFTER_DAYS = int(os.environ.get("DJANGO_TASK_ARCHIVE_AFTER_DAYS", "90"))
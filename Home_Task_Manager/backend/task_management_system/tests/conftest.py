@@ -0,0 +1,18 @@
+import pytest
+from django.core.cache import cache
+
+from users.authentication import local_token_versions
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings):
+    # Cache hits are asserted to run no queries: keep the cache in local
+    # memory whatever DJANGO_CACHE_URL says.
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    # Test databases reuse primary keys, so household-keyed cache entries
+    # must not leak from one test into the next.
+    cache.clear()
+    local_token_versions.clear()
+    yield
+    cache.clear()
+    local_token_versions.clear()
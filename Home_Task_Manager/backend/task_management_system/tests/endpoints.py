@@ -0,0 +1,173 @@
+"""
+One representative request for every route in core.urls, for the query
+budget tests and benchmarks/endpoint_benchmark.py.
+
+ENDPOINTS maps a name to a function that takes a SyntheticHousehold (see
+tests.synthetic) and returns the Call to make. The name is the route's URL
+name, plus ":<variant>" when a route is exercised more than one way. The
+functions may create what their request needs (a task to delete, an
+invite to accept); only the request itself is measured.
+
+Routes that can't be benchmarked this way are in EXCLUDED with the reason.
+test_query_budgets checks that every route is in one or the other.
+"""
+from collections import namedtuple
+from datetime import date
+from urllib.parse import urlencode
+
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.urls import URLResolver
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from rest_framework.test import APIClient
+
+from core import urls
+from core.models import HouseholdInvite, Task
+from users.authentication import ClaimsRefreshToken
+
+from tests.synthetic import PASSWORD
+
+# user: who sends it (default the household admin); None for anonymous.
+Call = namedtuple("Call", "method path data user status", defaults=(None, "admin", 200))
+
+EXCLUDED = {
+    "auth-google": "needs an ID token signed by Google; see benchmarks/async_views_benchmark.py",
+    "household-events": "a stream that stays open until the access token expires",
+}
+
+
+def next_month(start):
+    return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def calendar_month():
+    start = date.today().replace(day=1)
+    return f"start={start.isoformat()}&end={next_month(start).isoformat()}"
+
+
+def first_task(h):
+    return Task.objects.filter(household=h.household).values_list("id", flat=True).first()
+
+
+def toggle_task(h):
+    task = h.new_task()
+    return Call("patch", f"/api/tasks/{task.pk}/", {"completed": True})
+
+
+def complete_occurrence(h):
+    series = h.new_task(repeat=Task.REPEAT_DAILY, due_date=timezone.now())
+    return Call("post", f"/api/tasks/{series.pk}/occurrences/",
+                {"occurrence_at": series.due_date.isoformat(), "completed": True}, status=201)
+
+
+def skip_occurrence(h):
+    series = h.new_task(repeat=Task.REPEAT_DAILY, due_date=timezone.now())
+    query = urlencode({"occurrence_at": series.due_date.isoformat()})
+    return Call("delete", f"/api/tasks/{series.pk}/occurrences/?{query}", status=204)
+
+
+def bulk_complete(h):
+    ids = [h.new_task().pk for _ in range(20)]
+    return Call("post", "/api/tasks/bulk/", {"operations": [{"op": "complete", "id": pk} for pk in ids]})
+
+
+def register(h):
+    h.created += 1
+    name = f"{h.household.pk}-signup-{h.created}"
+    return Call("post", "/api/register/", {"username": name, "email": f"{name}@example.com", "password": PASSWORD},
+                user=None, status=201)
+
+
+def password_reset_confirm(h):
+    user = h.new_user()
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    token = PasswordResetTokenGenerator().make_token(user)
+    return Call("post", "/api/password-reset-confirm/", {"uid": uid, "token": token, "new_password": "n3w-pass-789"},
+                user=None)
+
+
+def change_password(h):
+    return Call("post", "/api/change-password/", {"old_password": PASSWORD, "new_password": "n3w-pass-789"},
+                user=h.new_user())
+
+
+def accept_invite(h):
+    joiner = h.new_user(household=False)
+    invite = HouseholdInvite.objects.create(household=h.household, email=joiner.email)
+    return Call("post", "/api/household/invites/accept/", {"token": str(invite.token)}, user=joiner)
+
+
+def update_role(h):
+    return Call("patch", f"/api/household/users/{h.new_user().pk}/role/", {"role": "child"})
+
+
+ENDPOINTS = {
+    "api-root": lambda h: Call("get", "/api/"),
+    "dashboard": lambda h: Call("get", "/api/dashboard/"),
+    "dashboard-trends": lambda h: Call("get", "/api/dashboard/trends/?period=month"),
+    "members-list": lambda h: Call("get", "/api/members/"),
+    "register": register,
+    "password-reset": lambda h: Call("post", "/api/password-reset/", {"email": h.adult.email}, user=None),
+    "password-reset-confirm": password_reset_confirm,
+    "me": lambda h: Call("get", "/api/me/"),
+    "me:patch": lambda h: Call("patch", "/api/me/", {"first_name": "Alex"}),
+    "change-password": change_password,
+    "task-list": lambda h: Call("get", "/api/tasks/"),
+    "task-list:filtered": lambda h: Call(
+        "get", f"/api/tasks/?completed=false&assignee_member={h.members[0].pk}&category={h.categories[0].pk}"
+    ),
+    "task-list:search": lambda h: Call("get", "/api/tasks/?search=laundry"),
+    "task-list:archived": lambda h: Call("get", "/api/tasks/?include_archived=true&search=laundry"),
+    "task-list:create": lambda h: Call("post", "/api/tasks/", {"title": "New chore"}, status=201),
+    "task-detail": lambda h: Call("get", f"/api/tasks/{first_task(h)}/"),
+    "task-detail:complete": toggle_task,
+    "task-detail:delete": lambda h: Call("delete", f"/api/tasks/{h.new_task().pk}/", status=204),
+    "task-occurrences": complete_occurrence,
+    "task-occurrences:delete": skip_occurrence,
+    "task-bulk": bulk_complete,
+    "category-list": lambda h: Call("get", "/api/categories/"),
+    "category-detail": lambda h: Call("get", f"/api/categories/{h.categories[0].pk}/"),
+    "member-list": lambda h: Call("get", "/api/member-items/"),
+    "member-detail": lambda h: Call("get", f"/api/member-items/{h.members[0].pk}/"),
+    "pet-list": lambda h: Call("get", "/api/pets/"),
+    "pet-detail": lambda h: Call("get", f"/api/pets/{h.pets[0].pk}/"),
+    "calendar-tasks": lambda h: Call("get", f"/api/calendar/tasks/?{calendar_month()}"),
+    "calendar-tasks:compact": lambda h: Call("get", f"/api/calendar/tasks/?{calendar_month()}&compact=true"),
+    "calendar-day-counts": lambda h: Call("get", f"/api/calendar/day-counts/?{calendar_month()}"),
+    "rewards-summary": lambda h: Call("get", "/api/rewards/summary/"),
+    "rewards-summary:month": lambda h: Call("get", "/api/rewards/summary/?period=month"),
+    "rewards-redeem": lambda h: Call("post", "/api/rewards/redeem/", {"points": 1}),
+    "sync": lambda h: Call("get", "/api/sync/"),
+    "household-invite-create": lambda h: Call(
+        "post", "/api/household/invites/", {"email": "guest@example.com", "role": "adult"}, status=201
+    ),
+    "household-invite-accept": accept_invite,
+    "household-user-role-update": update_role,
+}
+
+
+def client_for(h, call):
+    client = APIClient()
+    user = h.admin if call.user == "admin" else call.user
+    if user is not None:
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {ClaimsRefreshToken.for_user(user).access_token}")
+    return client
+
+
+def send(client, call):
+    response = getattr(client, call.method)(call.path, call.data, format="json")
+    assert response.status_code == call.status, (call.path, response.status_code, response.content[:500])
+    return response
+
+
+def route_names(patterns=None):
+    """The URL names of every route in core.urls."""
+    names = set()
+    for pattern in urls.urlpatterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            names |= route_names(pattern.url_patterns)
+        elif pattern.name:
+            names.add(pattern.name)
+    return names
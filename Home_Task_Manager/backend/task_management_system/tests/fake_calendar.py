@@ -0,0 +1,206 @@
+"""
+A local stand-in for the Google Calendar API, for tests and benchmarks.
+
+Implements the batch endpoint (POST /batch/calendar/v3) with events
+insert and patch, and events.list (GET .../events) with page and sync
+tokens. Keeps events in memory, counts requests, and can be told to fail
+the next calls, to add latency to every request, or to expire every sync
+token handed out so far.
+
+Every change stamps the event with a sequence number; a sync token is just
+the sequence number it was issued at, so listing with it returns events
+stamped later. Deleted events stay behind as "cancelled" tombstones.
+"""
+import json
+import threading
+import time
+import uuid
+from email import message_from_bytes
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+
+class FakeCalendarServer:
+    def __init__(self, latency=0.0, max_page_size=250):
+        self.latency = latency
+        self.max_page_size = max_page_size
+        self.events = {}  # (calendar id, event id) -> event
+        self.changed = {}  # (calendar id, event id) -> sequence number of the last change
+        self.sequence = 0
+        self.token_epoch = 0
+        self.batches = 0
+        self.calls = 0
+        self.lists = 0
+        self.largest_batch = 0
+        self.failures = []  # (status, reason) for the next calls
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                if self.path != "/batch/calendar/v3":
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if server.latency:
+                    time.sleep(server.latency)
+                content_type, payload = server.handle_batch(self.headers["Content-Type"], body)
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                status, result = server.handle_list(self.path)
+                payload = json.dumps(result).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def fail(self, status, times=1, reason=None):
+        """Answer the next `times` calls with an error."""
+        with self.lock:
+            self.failures.extend([(status, reason)] * times)
+
+    def expire_sync_tokens(self):
+        """Make every sync token handed out so far answer 410 Gone."""
+        with self.lock:
+            self.token_epoch += 1
+
+    def touch(self, calendar_id, event_id):
+        self.sequence += 1
+        self.changed[calendar_id, event_id] = self.sequence
+
+    def edit_event(self, calendar_id, event_id, **fields):
+        """Change an event as if in Google Calendar."""
+        with self.lock:
+            self.events[calendar_id, event_id].update(fields)
+            self.touch(calendar_id, event_id)
+
+    def delete_event(self, calendar_id, event_id):
+        with self.lock:
+            self.events[calendar_id, event_id] = {"id": event_id, "status": "cancelled"}
+            self.touch(calendar_id, event_id)
+
+    def handle_list(self, path):
+        url = urlsplit(path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        segments = [unquote(s) for s in url.path.split("/")]
+        # ["", "calendar", "v3", "calendars", calendar_id, "events"]
+        if len(segments) != 6 or segments[5] != "events":
+            return 404, {"error": {"code": 404, "message": "Not Found"}}
+        calendar_id = segments[4]
+
+        with self.lock:
+            self.lists += 1
+            if self.failures:
+                status, reason = self.failures.pop(0)
+                error = {"code": status, "message": "Injected failure"}
+                if reason:
+                    error["errors"] = [{"reason": reason}]
+                return status, {"error": error}
+
+            # Tokens are "<epoch>:<sequence>"; page tokens add ":<offset>".
+            since = 0
+            if "syncToken" in query:
+                epoch, since = map(int, query["syncToken"].split(":"))
+                if epoch != self.token_epoch:
+                    return 410, {"error": {"code": 410, "message": "Sync token is no longer valid"}}
+            if "pageToken" in query:
+                since, upto, offset = map(int, query["pageToken"].split(":"))
+            else:
+                upto, offset = self.sequence, 0
+
+            changed = sorted(
+                (seq, event_id) for (cal, event_id), seq in self.changed.items()
+                if cal == calendar_id and since < seq <= upto
+            )
+            if since == 0:
+                # A full listing leaves out deleted events.
+                changed = [(seq, eid) for seq, eid in changed
+                           if self.events[calendar_id, eid].get("status") != "cancelled"]
+            size = min(int(query.get("maxResults", 250)), self.max_page_size)
+            page = changed[offset:offset + size]
+            result = {"items": [dict(self.events[calendar_id, eid]) for _, eid in page]}
+            if offset + size < len(changed):
+                result["nextPageToken"] = f"{since}:{upto}:{offset + size}"
+            else:
+                result["nextSyncToken"] = f"{self.token_epoch}:{upto}"
+            return 200, result
+
+    def handle_batch(self, content_type, body):
+        message = message_from_bytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+        parts = message.get_payload()
+        with self.lock:
+            self.batches += 1
+            self.calls += len(parts)
+            self.largest_batch = max(self.largest_batch, len(parts))
+
+        boundary = f"batch_{uuid.uuid4().hex}"
+        out = []
+        for part in parts:
+            content_id = part["Content-ID"].strip("<>")
+            raw = part.get_payload().replace("\r\n", "\n")
+            head, _, data = raw.partition("\n\n")
+            method, path, _ = head.split("\n", 1)[0].split(" ", 2)
+            status, result = self.handle_call(method, path, json.loads(data) if data.strip() else None)
+            out.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} X\r\n"
+                "Content-Type: application/json\r\n\r\n"
+                f"{json.dumps(result)}\r\n"
+            )
+        out.append(f"--{boundary}--\r\n")
+        return f"multipart/mixed; boundary={boundary}", "".join(out).encode()
+
+    def handle_call(self, method, path, body):
+        with self.lock:
+            if self.failures:
+                status, reason = self.failures.pop(0)
+                error = {"code": status, "message": "Injected failure"}
+                if reason:
+                    error["errors"] = [{"reason": reason}]
+                return status, {"error": error}
+
+            segments = [unquote(s) for s in path.split("/")]
+            # ["", "calendar", "v3", "calendars", calendar_id, "events", (event_id)]
+            calendar_id = segments[4]
+            if method == "POST":
+                event_id = body.get("id") or uuid.uuid4().hex
+                if (calendar_id, event_id) in self.events:
+                    return 409, {"error": {"code": 409, "message": "The requested identifier already exists."}}
+                event = {**body, "id": event_id, "status": "confirmed"}
+                self.events[calendar_id, event_id] = event
+                self.touch(calendar_id, event_id)
+                return 200, event
+            if method == "PATCH":
+                key = (calendar_id, segments[6])
+                if key not in self.events:
+                    return 404, {"error": {"code": 404, "message": "Not Found"}}
+                self.events[key].update(body)
+                self.touch(*key)
+                return 200, self.events[key]
+            return 405, {"error": {"code": 405, "message": "Method not allowed"}}
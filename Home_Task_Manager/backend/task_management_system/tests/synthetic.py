@@ -0,0 +1,189 @@
+"""
+Synthetic households for tests and benchmarks.
+
+build_household(tasks) creates a household shaped like a real one: an
+admin, an adult and a child with Member profiles, a Member without an
+account, two pets and six categories, then `tasks` tasks spread like a
+family's chores:
+
+  - assignees: most tasks go to the adults, fewer to the child, some to
+    the pets, about a fifth to nobody;
+  - categories: most tasks have one, the common ones more often;
+  - due dates: spread over a year either side of today (denser near
+    today), a few with a start time, a few with none;
+  - completion: most past tasks are done (and credited in the points
+    ledger), a few future ones too.
+
+On top of those come SERIES, repeating chores (see core.recurrence)
+started a few months ago, each with one stored, completed occurrence.
+
+Every account also starts with STARTING_POINTS, so there is something to
+redeem.
+
+The same seed always builds the same household.
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db.models import Sum
+from django.utils import timezone
+
+from core import rollups
+from core.models import Category, Household, Member, Pet, PointsLedgerEntry, Task
+from core.points import COMPLETION_POINTS
+
+User = get_user_model()
+
+PASSWORD = "pass12345"
+
+CHORES = [
+    "Laundry", "Dishes", "Vacuum living room", "Take out bins", "Water plants", "Walk the dog",
+    "Feed the cat", "Clean bathroom", "Grocery shopping", "Mow the lawn", "Change bed sheets",
+    "Homework check", "Pay bills", "Cook dinner", "Tidy bedroom", "Clean windows",
+]
+CATEGORIES = ["Kitchen", "Cleaning", "Garden", "Pets", "Errands", "School"]
+CATEGORY_WEIGHTS = [5, 5, 2, 2, 3, 1]
+PRIORITIES = ["low", "med", "high"]
+PRIORITY_WEIGHTS = [6, 3, 1]
+
+# (title, repeat, weekdays, days since the first occurrence)
+SERIES = [
+    ("Feed the cat", Task.REPEAT_DAILY, [], 60),
+    ("Take out bins", Task.REPEAT_WEEKLY, [0, 3], 90),
+    ("Pay bills", Task.REPEAT_MONTHLY, [], 120),
+]
+
+STARTING_POINTS = 1000
+
+BATCH_SIZE = 5000
+
+_password_hash = None
+
+
+class SyntheticHousehold:
+    def __init__(self, household, users, members, pets, categories):
+        self.household = household
+        self.admin, self.adult, self.child = users
+        self.members = members
+        self.pets = pets
+        self.categories = categories
+        self.created = 0
+
+    def new_user(self, role="adult", household=True, **fields):
+        """A throwaway account, e.g. for a request that changes its password."""
+        self.created += 1
+        name = f"{self.household.pk}-extra-{self.created}"
+        return User.objects.create(
+            username=name,
+            email=f"{name}@example.com",
+            password=password_hash(),
+            household=self.household if household else None,
+            role=role,
+            **fields,
+        )
+
+    def new_task(self, **fields):
+        return Task.objects.create(household=self.household, title=fields.pop("title", "Scratch task"), **fields)
+
+
+def password_hash():
+    # Hashing is deliberately slow; every synthetic user shares one hash.
+    global _password_hash
+    if _password_hash is None:
+        _password_hash = make_password(PASSWORD)
+    return _password_hash
+
+
+def build_household(tasks, seed=0, name=None):
+    rng = random.Random(seed)
+    household = Household.objects.create(name=name or f"Synthetic {tasks}")
+    prefix = f"h{household.pk}"
+
+    users = [
+        User.objects.create(
+            username=f"{prefix}-{role}",
+            email=f"{prefix}-{role}@example.com",
+            password=password_hash(),
+            household=household,
+            role=role,
+        )
+        for role in ("admin", "adult", "child")
+    ]
+    members = Member.objects.bulk_create(
+        [Member(household=household, user=user, name=user.username) for user in users]
+        + [Member(household=household, name="Grandma")]
+    )
+    pets = Pet.objects.bulk_create(
+        [Pet(household=household, name="Rex", species="Dog"), Pet(household=household, name="Tom", species="Cat")]
+    )
+    categories = Category.objects.bulk_create([Category(household=household, name=c) for c in CATEGORIES])
+
+    assignees = [("member", members[0]), ("member", members[1]), ("member", members[2]), ("member", members[3]),
+                 ("pet", pets[0]), ("pet", pets[1]), (None, None)]
+    assignee_weights = [30, 25, 10, 5, 6, 4, 20]
+
+    now = timezone.now()
+    rows = []
+    for i in range(tasks):
+        kind, assignee = rng.choices(assignees, assignee_weights)[0]
+        # Most chores sit within a couple of months of today.
+        offset = max(-365.0, min(365.0, rng.gauss(0, 60)))
+        due = now + timedelta(days=offset, minutes=rng.randrange(0, 24 * 60, 15))
+        if rng.random() < 0.05:
+            due = None
+        completed = due is not None and rng.random() < (0.85 if due < now else 0.05)
+        rows.append(
+            Task(
+                household=household,
+                title=f"{rng.choice(CHORES)} #{i}",
+                description="" if rng.random() < 0.7 else "Remember to check the list on the fridge.",
+                category=rng.choices(categories, CATEGORY_WEIGHTS)[0] if rng.random() < 0.8 else None,
+                assignee_member=assignee if kind == "member" else None,
+                assignee_pet=assignee if kind == "pet" else None,
+                due_date=due,
+                start_at=due - timedelta(hours=rng.choice([1, 2, 4])) if due and rng.random() < 0.2 else None,
+                priority=rng.choices(PRIORITIES, PRIORITY_WEIGHTS)[0],
+                completed=completed,
+                completed_at=min(due + timedelta(hours=rng.randint(-12, 36)), now) if completed else None,
+            )
+        )
+    Task.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+
+    first_due = now.replace(hour=8, minute=0, second=0, microsecond=0)
+    for title, repeat, weekdays, days in SERIES:
+        series = Task.objects.create(household=household, title=title, repeat=repeat, repeat_weekdays=weekdays,
+                                     due_date=first_due - timedelta(days=days), assignee_member=members[1])
+        Task.objects.create(household=household, title=title, series=series, occurrence_at=series.due_date,
+                            due_date=series.due_date, assignee_member=members[1], completed=True,
+                            completed_at=series.due_date)
+
+    # Credit completions to the assignee's account, as if they had ticked them off.
+    accounts = {member.pk: member.user for member in members if member.user is not None}
+    entries = [
+        PointsLedgerEntry(
+            user=accounts[assignee_member_id],
+            household=household,
+            task_id=task_id,
+            delta=COMPLETION_POINTS,
+            reason=PointsLedgerEntry.REASON_COMPLETION,
+        )
+        for task_id, assignee_member_id in Task.objects.filter(
+            household=household, completed=True, assignee_member_id__in=accounts
+        ).values_list("id", "assignee_member_id")
+    ]
+    entries += [
+        PointsLedgerEntry(user=user, household=household, delta=STARTING_POINTS,
+                          reason=PointsLedgerEntry.REASON_ADJUSTMENT, note="Starting balance")
+        for user in users
+    ]
+    PointsLedgerEntry.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+    rollups.rebuild([household.pk])
+    for user in users:
+        user.points_balance = (
+            PointsLedgerEntry.objects.filter(user=user).aggregate(total=Sum("delta"))["total"] or 0
+        )
+    User.objects.bulk_update(users, ["points_balance"])
+
+    return SyntheticHousehold(household, users, members, pets, categories)
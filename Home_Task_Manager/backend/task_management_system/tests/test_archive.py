@@ -0,0 +1,140 @@
+import io
+from datetime import datetime, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Sum
+from django.utils import timezone
+from django.utils.timezone import make_aware
+from rest_framework.test import APIClient
+
+from core.models import ArchivedTask, CompletionRollup, Household, PointsLedgerEntry, Task
+
+pytestmark = pytest.mark.django_db
+User = get_user_model()
+
+
+@pytest.fixture
+def household():
+    return Household.objects.create(name="H")
+
+
+@pytest.fixture
+def user(household):
+    return User.objects.create_user(username="u", email="u@e.com", password="pass12345", household=household,
+                                    role="admin")
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def complete(client, task, days_ago):
+    assert client.patch(f"/api/tasks/{task.pk}/", {"completed": True}, format="json").status_code == 200
+    Task.objects.filter(pk=task.pk).update(completed_at=timezone.now() - timedelta(days=days_ago))
+
+
+def archive(*args):
+    call_command("archive_tasks", "--older-than-days", "90", *args, stdout=io.StringIO())
+
+
+@pytest.fixture
+def history(client, household):
+    """Ten tasks newest first: the even ones completed a year ago, the odd ones open or recent."""
+    tasks = Task.objects.bulk_create([Task(household=household, title=f"Chore {i}") for i in range(10)])
+    base = timezone.now()
+    for i, task in enumerate(tasks):
+        Task.objects.filter(pk=task.pk).update(created_at=base - timedelta(days=400 + i))
+        if i % 2 == 0:
+            complete(client, task, 365)
+        elif i % 3 == 0:
+            complete(client, task, 10)
+    return [task.pk for task in tasks]
+
+
+def test_archiving_moves_old_completions_and_keeps_points(client, user, history):
+    user.refresh_from_db()  # the client is authenticated as this instance
+    stats = client.get("/api/dashboard/").json()["stats"]
+    rewards = client.get("/api/rewards/summary/").json()
+
+    archive()
+
+    assert sorted(ArchivedTask.objects.values_list("pk", flat=True)) == history[::2]
+    assert sorted(Task.objects.values_list("pk", flat=True)) == history[1::2]
+    assert set(PointsLedgerEntry.objects.filter(task__isnull=True).values_list("archived_task", flat=True)) == set(
+        history[::2]
+    )
+    user.refresh_from_db()
+    assert user.points_balance == 70 == PointsLedgerEntry.objects.filter(user=user).aggregate(total=Sum("delta"))["total"]
+    assert client.get("/api/dashboard/").json()["stats"] == stats
+    assert client.get("/api/rewards/summary/").json() == rewards
+
+
+def test_an_interrupted_run_carries_on(household, history):
+    archive("--batch-size", "2", "--max-batches", "1")
+    assert ArchivedTask.objects.count() == 2
+
+    archive()
+    assert ArchivedTask.objects.count() == 5
+    assert PointsLedgerEntry.objects.filter(archived_task__isnull=False).count() == 5
+    # The five archived completions still count, with the two recent ones.
+    assert CompletionRollup.objects.filter(household=household).aggregate(total=Sum("completed"))["total"] == 7
+
+
+def test_include_archived_pages_through_both_tables(client, history):
+    archive()
+
+    assert [task["id"] for task in client.get("/api/tasks/").json()["results"]] == history[1::2]
+
+    ids, url = [], "/api/tasks/?include_archived=true&page_size=3"
+    while url:
+        body = client.get(url).json()
+        ids += [task["id"] for task in body["results"]]
+        url = body["next"]
+    assert ids == history
+
+    rows = client.get("/api/tasks/?include_archived=true&paginate=false").json()
+    assert [row["id"] for row in rows] == history
+    assert [row.get("archived_at") is not None for row in rows] == [i % 2 == 0 for i in range(10)]
+
+
+def test_delta_sync_drops_archived_tasks(client, history):
+    cursor = client.get("/api/sync/").json()["cursor"]
+    archive()
+
+    data = client.get("/api/sync/", {"since": cursor}).json()
+    assert data["tasks"] == []
+    assert data["deleted"]["tasks"] == sorted(history[::2])
+
+
+def test_archived_tasks_are_read_only_but_retrievable(client, history):
+    archive()
+    pk = history[0]
+
+    assert client.get(f"/api/tasks/{pk}/").status_code == 404
+    res = client.get(f"/api/tasks/{pk}/?include_archived=true")
+    assert res.status_code == 200 and res.json()["title"] == "Chore 0" and res.json()["completed"]
+    assert client.patch(f"/api/tasks/{pk}/?include_archived=true", {"title": "x"}, format="json").status_code == 404
+
+    found = client.get("/api/tasks/?include_archived=true&search=chore 4&paginate=false").json()
+    assert [row["id"] for row in found] == [history[4]]
+
+
+def test_archived_occurrences_stay_out_of_the_series(client, household):
+    start = make_aware(datetime(2025, 1, 6, 8, 0))
+    series = Task.objects.create(household=household, title="Bins", repeat="weekly", due_date=start)
+    res = client.post(f"/api/tasks/{series.pk}/occurrences/",
+                      {"occurrence_at": start.isoformat(), "completed": True}, format="json")
+    Task.objects.filter(pk=res.json()["id"]).update(completed_at=start)
+
+    archive()
+
+    rows = client.get("/api/calendar/tasks/?start=2025-01-06&end=2025-01-13").json()
+    assert rows == []
+    assert client.post(f"/api/tasks/{series.pk}/occurrences/", {"occurrence_at": start.isoformat()},
+                       format="json").status_code == 400
+    assert Task.objects.filter(pk=series.pk).exists()
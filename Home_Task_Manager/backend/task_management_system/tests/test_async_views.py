@@ -0,0 +1,153 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import AsyncRequestFactory
+
+from core import async_views
+from core.views import PASSWORD_RESET_SENT
+from core.models import Household, HouseholdInvite, Job, Member
+from users.authentication import ClaimsRefreshToken
+
+pytestmark = pytest.mark.django_db
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def google_client_id(settings):
+    settings.GOOGLE_OAUTH_CLIENT_ID = "client.apps.googleusercontent.com"
+
+
+@pytest.fixture
+def idinfo(monkeypatch):
+    """What the (faked) Google verifier returns for any token."""
+    info = {"email": "g@e.com", "given_name": "Grace", "family_name": "Hopper", "name": "Grace Hopper"}
+
+    async def verify(token, audience):
+        if token != "good":
+            raise ValueError("bad token")
+        return info
+
+    monkeypatch.setattr(async_views, "averify_google_id_token", verify)
+    return info
+
+
+@pytest.fixture
+def household():
+    return Household.objects.create(name="H")
+
+
+def call(view, data=None, user=None):
+    headers = {}
+    if user is not None:
+        headers["Authorization"] = f"Bearer {ClaimsRefreshToken.for_user(user).access_token}"
+    request = AsyncRequestFactory().post("/", json.dumps(data or {}), content_type="application/json",
+                                         headers=headers)
+    response = async_to_sync(view)(request)
+    return response.status_code, json.loads(response.content)
+
+
+def test_google_login_creates_user_with_household(idinfo):
+    status, body = call(async_views.google_auth, {"id_token": "good"})
+
+    assert status == 200
+    assert body.keys() == {"access", "refresh"}
+    user = User.objects.get(email="g@e.com")
+    assert (user.first_name, user.last_name) == ("Grace", "Hopper")
+    assert user.household_id is not None and user.role == "admin"
+    assert user.auth_provider == "google"
+
+
+def test_returning_google_user_is_logged_in_without_writes(idinfo, household, django_assert_num_queries):
+    user = User.objects.create_user(username="g", email="G@e.com", first_name="Grace", last_name="Hopper",
+                                    household=household, auth_provider="google")
+    Member.objects.create(household=household, user=user, name="Grace Hopper")
+
+    with django_assert_num_queries(2):
+        status, body = call(async_views.google_auth, {"id_token": "good"})
+
+    assert status == 200
+    assert body.keys() == {"access", "refresh"}
+    assert User.objects.count() == 1
+
+
+def test_google_login_completes_an_existing_users_profile(idinfo, household):
+    user = User.objects.create_user(username="g", email="g@e.com", password="pass12345", household=household)
+
+    assert call(async_views.google_auth, {"id_token": "good"})[0] == 200
+
+    user.refresh_from_db()
+    assert (user.auth_provider, user.first_name) == ("google", "Grace")
+    assert Member.objects.filter(household=household, user=user).exists()
+
+
+@pytest.mark.parametrize("data", [{}, {"id_token": "forged"}])
+def test_google_login_rejects_missing_or_invalid_tokens(idinfo, data):
+    status, _ = call(async_views.google_auth, data)
+    assert status == 400
+    assert not User.objects.exists()
+
+
+def test_admin_invite_queues_email(household):
+    admin = User.objects.create_user(username="a", email="a@e.com", password="pass12345",
+                                     household=household, role="admin")
+
+    status, body = call(async_views.household_invite_create, {"email": "New@E.com", "role": "adult"}, admin)
+
+    assert status == 201
+    assert (body["email_queued"], body["email_sent"], body["email_error"]) == (True, True, None)
+    invite = HouseholdInvite.objects.get()
+    assert (invite.household_id, invite.email) == (household.pk, "new@e.com")
+    assert str(invite.token) in body["invite_link"]
+    assert Job.objects.get().payload["to"] == ["new@e.com"]
+
+
+def test_invite_requires_an_admin(household):
+    adult = User.objects.create_user(username="b", email="b@e.com", password="pass12345",
+                                     household=household, role="adult")
+
+    assert call(async_views.household_invite_create, {"email": "x@e.com"}, adult)[0] == 403
+    assert call(async_views.household_invite_create, {"email": "x@e.com"})[0] == 401
+    assert not HouseholdInvite.objects.exists() and not Job.objects.exists()
+
+
+def test_invite_validation_errors_match_the_drf_view(household):
+    admin = User.objects.create_user(username="a", email="a@e.com", password="pass12345",
+                                     household=household, role="admin")
+
+    status, body = call(async_views.household_invite_create, {"email": "not-an-email"}, admin)
+
+    assert status == 400
+    assert "email" in body
+
+
+def test_bodies_are_parsed_like_the_drf_views(household):
+    admin = User.objects.create_user(username="a", email="a@e.com", password="pass12345",
+                                     household=household, role="admin")
+    headers = {"Authorization": f"Bearer {ClaimsRefreshToken.for_user(admin).access_token}"}
+    factory = AsyncRequestFactory()
+
+    form = factory.post("/", {"email": "form@e.com", "role": "adult"}, headers=headers)  # multipart
+    urlencoded = factory.post("/", "email=url%40e.com&role=adult",
+                              content_type="application/x-www-form-urlencoded", headers=headers)
+    for request in (form, urlencoded):
+        assert async_to_sync(async_views.household_invite_create)(request).status_code == 201
+    assert sorted(HouseholdInvite.objects.values_list("email", flat=True)) == ["form@e.com", "url@e.com"]
+
+    other = factory.post("/", "email", content_type="text/plain", headers=headers)
+    assert async_to_sync(async_views.household_invite_create)(other).status_code == 415
+    broken = factory.post("/", "{", content_type="application/json", headers=headers)
+    assert async_to_sync(async_views.household_invite_create)(broken).status_code == 400
+
+
+def test_password_reset_queues_email_and_hides_unknown_addresses():
+    User.objects.create_user(username="u", email="u@e.com", password="pass12345")
+
+    known = call(async_views.password_reset_request, {"email": "U@e.com"})
+    unknown = call(async_views.password_reset_request, {"email": "nobody@e.com"})
+
+    assert known == unknown == (200, {"detail": PASSWORD_RESET_SENT})
+    job = Job.objects.get()
+    assert job.payload["to"] == ["u@e.com"]
+    assert job.payload["subject"] == "Reset your password"
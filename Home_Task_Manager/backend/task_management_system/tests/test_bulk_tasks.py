@@ -0,0 +1,206 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from core.bulk import BulkTaskOperations
+from core.models import CompletionRollup, Household, PointsLedgerEntry, Task, Category, Member
+
+pytestmark = pytest.mark.django_db
+User = get_user_model()
+
+URL = "/api/tasks/bulk/"
+
+
+@pytest.fixture
+def household():
+    return Household.objects.create(name="H")
+
+
+@pytest.fixture
+def user(household):
+    return User.objects.create_user(
+        username="u", email="u@e.com", password="pass12345", household=household, points_balance=5
+    )
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def test_mixed_batch_is_applied(client, household, user):
+    category = Category.objects.create(household=household, name="Kitchen")
+    member = Member.objects.create(household=household, name="Alex")
+    to_update = Task.objects.create(household=household, title="Old title")
+    to_complete = Task.objects.create(household=household, title="Dishes")
+    to_delete = Task.objects.create(household=household, title="Gone")
+
+    res = client.post(URL, {"operations": [
+        {"op": "create", "data": {"title": "New", "category": category.id, "assignee_member": member.id}},
+        {"op": "update", "id": to_update.id, "data": {"title": "New title", "priority": "high"}},
+        {"op": "complete", "id": to_complete.id},
+        {"op": "delete", "id": to_delete.id},
+    ]}, format="json")
+
+    assert res.status_code == 200, res.json()
+    body = res.json()
+    assert body["updated"] == sorted([to_update.id, to_complete.id])
+    assert body["deleted"] == [to_delete.id]
+    assert body["points_delta"] == 10
+
+    created = Task.objects.get(pk=body["created"][0])
+    assert (created.title, created.category_id, created.assignee_member_id) == ("New", category.id, member.id)
+    to_update.refresh_from_db()
+    assert (to_update.title, to_update.priority) == ("New title", "high")
+    to_complete.refresh_from_db()
+    assert to_complete.completed and to_complete.completed_at is not None
+    assert not Task.objects.filter(pk=to_delete.id).exists()
+    user.refresh_from_db()
+    assert user.points_balance == 15
+
+
+def test_points_are_aggregated_and_never_negative(client, household, user):
+    done = [Task.objects.create(household=household, title=f"T{i}", completed=True) for i in range(3)]
+
+    res = client.post(URL, {"operations": [
+        {"op": "complete", "id": t.id, "completed": False} for t in done
+    ]}, format="json")
+
+    # Only the 5 points the user had can be taken back
+    assert res.json()["points_delta"] == -5
+    user.refresh_from_db()
+    assert user.points_balance == 0
+
+
+def test_a_task_completed_since_the_preload_is_not_credited_twice(client, household, user, monkeypatch):
+    task = Task.objects.create(household=household, title="Dishes")
+    retitled = Task.objects.create(household=household, title="Bins")
+    preload = BulkTaskOperations.preload
+
+    def preload_then_race(self, operations):
+        preloaded = preload(self, operations)
+        # Another request completes both tasks before the batch is written.
+        for other in (task, retitled):
+            res = client.patch(f"/api/tasks/{other.id}/", {"completed": True}, format="json")
+            assert res.status_code == 200
+        return preloaded
+
+    monkeypatch.setattr(BulkTaskOperations, "preload", preload_then_race)
+    res = client.post(URL, {"operations": [
+        {"op": "complete", "id": task.id},
+        {"op": "update", "id": retitled.id, "data": {"title": "Bins out"}},
+    ]}, format="json")
+
+    assert res.status_code == 200, res.json()
+    assert res.json()["points_delta"] == 0
+    user.refresh_from_db()
+    assert user.points_balance == 25
+    assert PointsLedgerEntry.objects.filter(task=task, reason=PointsLedgerEntry.REASON_COMPLETION).count() == 1
+    # The retitle doesn't undo the other request's completion.
+    retitled.refresh_from_db()
+    assert (retitled.title, retitled.completed) == ("Bins out", True)
+    assert CompletionRollup.objects.get().completed == 2
+
+
+def test_invalid_items_are_reported_and_nothing_is_written(client, household):
+    other_category = Category.objects.create(household=Household.objects.create(name="Other"), name="X")
+    task = Task.objects.create(household=household, title="Keep")
+
+    res = client.post(URL, {"operations": [
+        {"op": "update", "id": task.id, "data": {"title": "Changed"}},
+        {"op": "create", "data": {"title": "Bad", "category": other_category.id}},
+        {"op": "delete", "id": 999999},
+        {"op": "explode"},
+    ]}, format="json")
+
+    assert res.status_code == 400
+    errors = res.json()["errors"]
+    assert [e["index"] for e in errors] == [3]
+
+    res = client.post(URL, {"operations": [
+        {"op": "update", "id": task.id, "data": {"title": "Changed"}},
+        {"op": "create", "data": {"title": "Bad", "category": other_category.id}},
+        {"op": "delete", "id": 999999},
+    ]}, format="json")
+
+    assert res.status_code == 400
+    assert [e["index"] for e in res.json()["errors"]] == [1, 2]
+    task.refresh_from_db()
+    assert task.title == "Keep"
+    assert Task.objects.count() == 1
+
+
+def test_other_households_tasks_are_not_found(client):
+    foreign = Task.objects.create(household=Household.objects.create(name="Other"), title="Theirs")
+
+    res = client.post(URL, {"operations": [{"op": "delete", "id": foreign.id}]}, format="json")
+
+    assert res.status_code == 400
+    assert Task.objects.filter(pk=foreign.id).exists()
+
+
+def test_batch_is_written_in_a_handful_of_queries(client, household, django_assert_max_num_queries):
+    tasks = Task.objects.bulk_create([Task(household=household, title=f"T{i}") for i in range(200)])
+
+    # 4 preload queries + savepoints + the locked re-read of the changed
+    # tasks' completion + the points update and ledger insert,
+    # the day's completion rollup (update, and on its first change of the
+    # day insert and update again), the change-sequence update and read
+    # (core.changes), plus however many
+    # batches the backend splits bulk_create / bulk_update into (on SQLite,
+    # 999 parameters per INSERT: 6 batches of at most 38 tasks).
+    with django_assert_max_num_queries(27):
+        res = client.post(URL, {"operations": [
+            *({"op": "complete", "id": t.id} for t in tasks),
+            *({"op": "create", "data": {"title": f"New {i}"}} for i in range(200)),
+        ]}, format="json")
+
+    assert res.status_code == 200
+    assert Task.objects.filter(completed=True).count() == 200
+
+
+def test_children_cannot_bulk_edit(household):
+    child = User.objects.create_user(username="c", email="c@e.com", password="pass12345", household=household, role="child")
+    client = APIClient()
+    client.force_authenticate(user=child)
+
+    res = client.post(URL, {"operations": [{"op": "create", "data": {"title": "x"}}]}, format="json")
+    assert res.status_code == 403
+
+
+def test_varied_updates_are_all_applied(client, household):
+    tasks = Task.objects.bulk_create([Task(household=household, title=f"T{i}") for i in range(15)])
+
+    res = client.post(URL, {"operations": [
+        {"op": "update", "id": t.id, "data": {"title": f"Renamed {t.id}"}} for t in tasks
+    ]}, format="json")
+
+    assert res.status_code == 200
+    assert all(t.title == f"Renamed {t.id}" for t in Task.objects.all())
+
+
+@pytest.mark.parametrize("count", [2, 15])
+def test_each_task_is_written_with_only_its_own_changes(client, household, monkeypatch, count):
+    tasks = Task.objects.bulk_create([Task(household=household, title=f"T{i}") for i in range(count)])
+    preload = BulkTaskOperations.preload
+
+    def preload_then_race(self, operations):
+        preloaded = preload(self, operations)
+        # Another request edits fields the batch changes only on other tasks.
+        Task.objects.filter(pk__in=[t.pk for t in tasks]).update(title="Edited", description="Edited")
+        return preloaded
+
+    monkeypatch.setattr(BulkTaskOperations, "preload", preload_then_race)
+    res = client.post(URL, {"operations": [
+        {"op": "update", "id": t.id, "data": {"title": f"Renamed {t.id}"} if i % 2 else {"description": f"Notes {t.id}"}}
+        for i, t in enumerate(tasks)
+    ]}, format="json")
+
+    assert res.status_code == 200, res.json()
+    for i, task in enumerate(Task.objects.order_by("id")):
+        if i % 2:
+            assert (task.title, task.description) == (f"Renamed {task.id}", "Edited")
+        else:
+            assert (task.title, task.description) == ("Edited", f"Notes {task.id}")
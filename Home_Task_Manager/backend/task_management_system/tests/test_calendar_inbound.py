@@ -0,0 +1,200 @@
+import io
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core import calendar_inbound
+from core.calendar_inbound import CalendarPull
+from core.calendar_sync import CalendarClient, CalendarError, CalendarSyncEngine
+from core.models import CalendarSyncState, Household, Task
+from tests.fake_calendar import FakeCalendarServer
+
+pytestmark = pytest.mark.django_db
+
+CALENDAR = "family@group.calendar.google.com"
+
+
+@pytest.fixture
+def server():
+    server = FakeCalendarServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def client(server):
+    return CalendarClient(server.url)
+
+
+@pytest.fixture
+def household():
+    return Household.objects.create(name="H")
+
+
+def synced_tasks(client, household, n, **fields):
+    """n tasks pushed to the fake calendar, followed by a first (full) pull."""
+    fields.setdefault("due_date", timezone.now() + timedelta(days=1))
+    Task.objects.bulk_create([
+        Task(household=household, title=f"T{i}", google_calendar_id=CALENDAR,
+             google_sync_status=Task.SYNC_PENDING, **fields)
+        for i in range(n)
+    ])
+    CalendarSyncEngine(client, backoff_base=0).run()
+    CalendarPull(client, backoff_base=0).run()
+    return list(Task.objects.filter(household=household).order_by("pk"))
+
+
+def test_only_changed_events_are_fetched(client, server, household):
+    tasks = synced_tasks(client, household, 5)
+    state = CalendarSyncState.objects.get(calendar_id=CALENDAR)
+    assert state.sync_token and state.last_full_sync_at
+
+    server.edit_event(CALENDAR, tasks[2].google_event_id, summary="Renamed", description="From phone")
+    stats = CalendarPull(client).run()
+
+    assert stats == {"calendars": 1, "pages": 1, "events": 1, "updated": 1, "unlinked": 0, "full_resyncs": 0}
+    task = Task.objects.get(pk=tasks[2].pk)
+    assert (task.title, task.description) == ("Renamed", "From phone")
+    assert task.google_sync_status == Task.SYNC_SYNCED
+    # Nothing new since the last pull: an empty page.
+    assert CalendarPull(client).run()["events"] == 0
+
+
+def test_moved_event_moves_the_due_date(client, server, household):
+    task = synced_tasks(client, household, 1)[0]
+    moved = task.due_date + timedelta(days=2)
+
+    server.edit_event(CALENDAR, task.google_event_id, start={"dateTime": moved.isoformat()},
+                      end={"dateTime": (moved + timedelta(hours=1)).isoformat()})
+    CalendarPull(client).run()
+
+    task.refresh_from_db()
+    assert task.due_date == moved
+    assert task.start_at is None
+
+
+def test_completed_prefix_is_not_copied_into_the_title(client, server, household):
+    task = synced_tasks(client, household, 1)[0]
+    server.edit_event(CALENDAR, task.google_event_id, summary="✓ T0")
+
+    assert CalendarPull(client).run()["updated"] == 0
+
+
+def test_large_change_sets_are_paged_and_applied_per_page(client, server, household):
+    server.max_page_size = 40
+    tasks = synced_tasks(client, household, 100)
+    for task in tasks:
+        server.edit_event(CALENDAR, task.google_event_id, summary=f"Edited {task.pk}")
+
+    with CaptureQueriesContext(connection) as queries:
+        stats = CalendarPull(client).run()
+
+    assert stats["pages"] == 3 and stats["updated"] == 100
+    assert not Task.objects.exclude(title__startswith="Edited").exists()
+    assert len(queries) < 40
+
+
+def test_expired_token_falls_back_to_a_full_resync(client, server, household):
+    server.max_page_size = 10
+    tasks = synced_tasks(client, household, 25)
+    server.edit_event(CALENDAR, tasks[0].google_event_id, summary="Changed")
+    server.delete_event(CALENDAR, tasks[1].google_event_id)
+    server.expire_sync_tokens()
+
+    stats = CalendarPull(client).run()
+
+    assert stats["full_resyncs"] == 1
+    assert stats["pages"] == 3  # 24 live events, 10 per page
+    assert Task.objects.get(pk=tasks[0].pk).title == "Changed"
+    # The full listing leaves out deleted events, so the task is unlinked.
+    assert Task.objects.get(pk=tasks[1].pk).google_event_id is None
+    assert stats["unlinked"] == 1
+    # The new token works again.
+    assert CalendarPull(client).run()["full_resyncs"] == 0
+
+
+def test_deleted_event_unlinks_but_keeps_the_task(client, server, household):
+    task = synced_tasks(client, household, 1)[0]
+    server.delete_event(CALENDAR, task.google_event_id)
+
+    assert CalendarPull(client).run()["unlinked"] == 1
+
+    task.refresh_from_db()
+    assert task.google_calendar_id is None and task.google_event_id is None
+    assert task.google_sync_status is None
+    # An unlinked task is no longer pushed.
+    task.save()
+    assert CalendarSyncEngine(client).run()["synced"] == 0
+
+
+def test_local_edits_waiting_to_be_pushed_win(client, server, household):
+    task = synced_tasks(client, household, 1)[0]
+    task.title = "Local"
+    task.save()
+    server.edit_event(CALENDAR, task.google_event_id, summary="Remote")
+
+    assert CalendarPull(client).run()["updated"] == 0
+    CalendarSyncEngine(client).run()
+
+    assert Task.objects.get(pk=task.pk).title == "Local"
+    assert server.events[CALENDAR, task.google_event_id]["summary"] == "Local"
+
+
+def test_local_edit_committed_during_a_pull_is_not_overwritten(client, server, household, monkeypatch):
+    task = synced_tasks(client, household, 1)[0]
+    server.edit_event(CALENDAR, task.google_event_id, summary="Remote")
+    apply_event = calendar_inbound.apply_event
+
+    def edit_then_apply(loaded, event):
+        # The user saves an edit after the pull has read the task.
+        local = Task.objects.get(pk=loaded.pk)
+        local.title = "Local"
+        local.save()
+        return apply_event(loaded, event)
+
+    monkeypatch.setattr(calendar_inbound, "apply_event", edit_then_apply)
+    assert CalendarPull(client).run()["updated"] == 0
+
+    task.refresh_from_db()
+    assert (task.title, task.google_sync_status) == ("Local", Task.SYNC_PENDING)
+    CalendarSyncEngine(client).run()
+    assert server.events[CALENDAR, task.google_event_id]["summary"] == "Local"
+
+
+def test_pulled_changes_are_not_pushed_back(client, server, household):
+    task = synced_tasks(client, household, 1)[0]
+    server.edit_event(CALENDAR, task.google_event_id, summary="Remote")
+    CalendarPull(client).run()
+
+    assert Task.objects.get(pk=task.pk).google_sync_status == Task.SYNC_SYNCED
+    assert CalendarSyncEngine(client).run()["synced"] == 0
+
+
+def test_token_is_kept_when_a_page_fails(client, server, household):
+    server.max_page_size = 2
+    tasks = synced_tasks(client, household, 4)
+    token = CalendarSyncState.objects.get(calendar_id=CALENDAR).sync_token
+    for task in tasks:
+        server.edit_event(CALENDAR, task.google_event_id, summary="Edited")
+    server.fail(400)
+
+    with pytest.raises(CalendarError):
+        CalendarPull(client).run()
+
+    assert CalendarSyncState.objects.get(calendar_id=CALENDAR).sync_token == token
+    assert CalendarPull(client).run()["updated"] == 4
+
+
+def test_command_pulls_then_pushes(server, household, settings):
+    settings.GOOGLE_CALENDAR_API_URL = server.url
+    synced_tasks(CalendarClient(server.url), household, 2)
+    out = io.StringIO()
+
+    call_command("sync_google_calendar", "--rate", "0", stdout=out)
+
+    assert "Pulled 0 changed events from 1 calendars" in out.getvalue()
+    assert "Synced 0 tasks" in out.getvalue()
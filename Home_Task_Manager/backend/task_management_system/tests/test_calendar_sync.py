@@ -0,0 +1,252 @@
+import io
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import calendar_sync
+from core.calendar_sync import CalendarClient, CalendarSyncEngine
+from core.models import Household, Task
+from tests.fake_calendar import FakeCalendarServer
+
+pytestmark = pytest.mark.django_db
+User = get_user_model()
+
+CALENDAR = "family@group.calendar.google.com"
+
+
+@pytest.fixture
+def server():
+    server = FakeCalendarServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def engine(server):
+    return CalendarSyncEngine(CalendarClient(server.url), workers=2, backoff_base=0)
+
+
+@pytest.fixture
+def household():
+    return Household.objects.create(name="H")
+
+
+def linked_task(household, title="Bins", **fields):
+    fields.setdefault("due_date", timezone.now() + timedelta(days=1))
+    return Task.objects.create(household=household, title=title, google_calendar_id=CALENDAR, **fields)
+
+
+def test_pending_tasks_are_inserted_then_patched(engine, server, household):
+    task = linked_task(household)
+    assert task.google_sync_status == Task.SYNC_PENDING
+
+    assert engine.run() == {"synced": 1, "failed": 0, "batches": 1}
+    task.refresh_from_db()
+    assert task.google_sync_status == Task.SYNC_SYNCED
+    assert task.google_event_id == calendar_sync.event_id(task)
+    assert task.google_last_synced_at is not None
+    assert server.events[CALENDAR, task.google_event_id]["summary"] == "Bins"
+
+    task.title = "Recycling"
+    task.save()
+    engine.run()
+    assert server.events[CALENDAR, task.google_event_id]["summary"] == "Recycling"
+    assert len(server.events) == 1
+
+
+def test_edits_between_pushes_are_coalesced(engine, server, household):
+    task = linked_task(household)
+    for title in ("One", "Two", "Three"):
+        task.title = title
+        task.save()
+
+    engine.run()
+
+    task.refresh_from_db()
+    assert server.calls == 1
+    assert server.events[CALENDAR, task.google_event_id]["summary"] == "Three"
+
+
+def test_edit_during_push_is_pushed_again(engine, server, household, monkeypatch):
+    task = linked_task(household)
+    record = engine.record
+
+    def edit_then_record(*args):
+        # The user edits the task while the batch is in flight.
+        Task.objects.filter(pk=task.pk).update(title="Edited", google_sync_status=Task.SYNC_PENDING)
+        record(*args)
+
+    monkeypatch.setattr(engine, "record", edit_then_record)
+    engine.run(limit=1)
+    task.refresh_from_db()
+    assert task.google_sync_status == Task.SYNC_PENDING
+
+    monkeypatch.setattr(engine, "record", record)
+    engine.run()
+    task.refresh_from_db()
+    assert task.google_sync_status == Task.SYNC_SYNCED
+    assert server.events[CALENDAR, task.google_event_id]["summary"] == "Edited"
+
+
+def test_only_stale_claims_are_taken_over(engine, server, household):
+    mine = linked_task(household, "Mine")
+    theirs = linked_task(household, "Theirs")
+    crashed = linked_task(household, "Crashed")
+    Task.objects.filter(pk=theirs.pk).update(google_sync_status=Task.SYNC_SYNCING,
+                                            google_sync_claimed_at=timezone.now())
+    Task.objects.filter(pk=crashed.pk).update(google_sync_status=Task.SYNC_SYNCING,
+                                             google_sync_claimed_at=timezone.now() - timedelta(hours=1))
+
+    assert engine.run()["synced"] == 2
+
+    # Another run is still pushing "Theirs": it isn't pushed a second time.
+    assert sorted(event["summary"] for event in server.events.values()) == ["Crashed", "Mine"]
+    assert Task.objects.get(pk=theirs.pk).google_sync_status == Task.SYNC_SYNCING
+    assert Task.objects.get(pk=mine.pk).google_sync_status == Task.SYNC_SYNCED
+
+
+def test_results_are_written_only_for_the_runs_own_claim(engine, server, household, monkeypatch):
+    task = linked_task(household)
+    record = engine.record
+
+    def reclaimed_then_record(*args):
+        # The claim went stale and another run took the task over meanwhile.
+        Task.objects.filter(pk=task.pk).update(google_sync_claimed_at=timezone.now() + timedelta(seconds=1))
+        record(*args)
+
+    monkeypatch.setattr(engine, "record", reclaimed_then_record)
+    engine.run()
+
+    task.refresh_from_db()
+    assert task.google_sync_status == Task.SYNC_SYNCING
+    assert task.google_event_id == calendar_sync.event_id(task)
+
+
+def test_sync_results_change_the_calendar_etag(engine, household):
+    task = linked_task(household)
+    client = APIClient()
+    client.force_authenticate(user=User.objects.create_user(
+        username="u", email="u@e.com", password="pass12345", household=household,
+    ))
+    day = timezone.localdate(task.due_date)
+    url = f"/api/calendar/tasks/?start={day.isoformat()}&end={(day + timedelta(days=1)).isoformat()}"
+    etag = client.get(url)["ETag"]
+
+    engine.run()
+
+    res = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+    assert res.json()[0]["google_sync_status"] == Task.SYNC_SYNCED
+
+
+def test_many_tasks_go_out_in_batches_of_fifty(engine, server, household):
+    Task.objects.bulk_create([
+        Task(household=household, title=f"T{i}", due_date=timezone.now(),
+             google_calendar_id=CALENDAR, google_sync_status=Task.SYNC_PENDING)
+        for i in range(120)
+    ])
+
+    stats = engine.run()
+
+    assert stats == {"synced": 120, "failed": 0, "batches": 3}
+    assert server.largest_batch == 50
+    assert not Task.objects.exclude(google_sync_status=Task.SYNC_SYNCED).exists()
+
+
+def test_rate_limited_calls_are_retried(engine, server, household):
+    task = linked_task(household)
+    server.fail(429, times=2)
+
+    assert engine.run()["synced"] == 1
+    assert server.calls == 3
+    task.refresh_from_db()
+    assert task.google_sync_status == Task.SYNC_SYNCED
+
+
+def test_retries_run_out_and_record_the_error(server, household):
+    engine = CalendarSyncEngine(CalendarClient(server.url), max_attempts=3, backoff_base=0)
+    task = linked_task(household)
+    server.fail(403, times=5, reason="rateLimitExceeded")
+
+    assert engine.run() == {"synced": 0, "failed": 1, "batches": 3}
+    task.refresh_from_db()
+    assert task.google_sync_status == Task.SYNC_ERROR
+    assert "Injected failure" in task.google_sync_error
+
+    # Errors stay put until an edit, or an explicit retry.
+    assert engine.run()["synced"] == 0
+    assert engine.run(retry_errors=True)["synced"] == 1
+
+
+def test_permanent_failures_are_not_retried(engine, server, household):
+    task = linked_task(household)
+    undated = linked_task(household, title="Someday", due_date=None)
+    server.fail(400)
+
+    assert engine.run()["failed"] == 2
+    assert server.calls == 1
+    assert Task.objects.get(pk=task.pk).google_sync_error.startswith("HTTP 400")
+    assert Task.objects.get(pk=undated.pk).google_sync_error == "Task has no start or due date"
+
+
+def test_lost_event_id_patches_instead_of_duplicating(engine, server, household):
+    task = linked_task(household)
+    engine.run()
+    # e.g. a concurrent save wrote back a stale, empty event id
+    Task.objects.filter(pk=task.pk).update(google_event_id=None, google_sync_status=Task.SYNC_PENDING, title="New")
+
+    assert engine.run()["synced"] == 1
+    assert len(server.events) == 1
+    assert server.events[CALENDAR, calendar_sync.event_id(task)]["summary"] == "New"
+
+
+def test_event_deleted_on_google_is_recreated(engine, server, household):
+    task = linked_task(household)
+    engine.run()
+    server.events.clear()
+    task.save()
+
+    assert engine.run()["synced"] == 1
+    assert (CALENDAR, calendar_sync.event_id(task)) in server.events
+
+
+def test_api_and_bulk_edits_mark_linked_tasks_pending(household):
+    user = User.objects.create_user(username="u", email="u@e.com", password="pass12345", household=household)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    linked = linked_task(household, google_sync_status=Task.SYNC_SYNCED)
+    Task.objects.filter(pk=linked.pk).update(google_sync_status=Task.SYNC_SYNCED)
+    unlinked = Task.objects.create(household=household, title="Local")
+
+    client.patch(f"/api/tasks/{linked.pk}/", {"title": "Changed"}, format="json")
+    assert Task.objects.get(pk=linked.pk).google_sync_status == Task.SYNC_PENDING
+
+    Task.objects.filter(pk=linked.pk).update(google_sync_status=Task.SYNC_SYNCED)
+    res = client.post("/api/tasks/bulk/", {"operations": [
+        {"op": "complete", "id": linked.pk}, {"op": "complete", "id": unlinked.pk},
+    ]}, format="json")
+    assert res.status_code == 200
+    assert Task.objects.get(pk=linked.pk).google_sync_status == Task.SYNC_PENDING
+    assert Task.objects.get(pk=unlinked.pk).google_sync_status is None
+
+
+def test_command_reports_progress(server, household, settings):
+    settings.GOOGLE_CALENDAR_API_URL = server.url
+    linked_task(household)
+    out = io.StringIO()
+
+    call_command("sync_google_calendar", "--rate", "0", stdout=out)
+
+    assert "Synced 1 tasks, 0 failed" in out.getvalue()
+
+
+def test_rate_limiter_spaces_out_calls():
+    limiter = calendar_sync.RateLimiter(rate=100, burst=10)
+    started = timezone.now()
+    for _ in range(3):
+        limiter.acquire(10)
+    assert timezone.now() - started >= timedelta(seconds=0.19)
@@ -0,0 +1,163 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils.timezone import make_aware
+from rest_framework.test import APIClient
+
+from core.models import Household, Task, Member
+
+pytestmark = pytest.mark.django_db
+User = get_user_model()
+
+URL = "/api/calendar/tasks/?start=2026-03-01&end=2026-04-01"
+
+
+@pytest.fixture
+def household():
+    return Household.objects.create(name="H")
+
+
+@pytest.fixture
+def client(household):
+    user = User.objects.create_user(username="u", email="u@e.com", password="pass12345", household=household)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def task(household):
+    member = Member.objects.create(household=household, name="Alex")
+    return Task.objects.create(
+        household=household,
+        title="Dentist",
+        description="bring forms",
+        assignee_member=member,
+        due_date=make_aware(datetime(2026, 3, 10, 9, 0)),
+    )
+
+
+def test_compact_rows_only_carry_calendar_fields(client, task):
+    res = client.get(URL + "&compact=true")
+
+    assert res.status_code == 200
+    assert res.json() == [
+        {
+            "id": task.id,
+            "title": "Dentist",
+            "start_at": None,
+            "due_date": res.json()[0]["due_date"],
+            "priority": "low",
+            "completed": False,
+            "assignee": {"id": task.assignee_member_id, "name": "Alex", "type": "member"},
+            "series": None,
+            "occurrence_at": None,
+        }
+    ]
+    # Same timestamp rendering as the full serializer
+    assert res.json()[0]["due_date"] == client.get(URL).json()[0]["due_date"]
+
+
+def test_unchanged_range_returns_304_with_one_query(client, task, django_assert_num_queries):
+    first = client.get(URL)
+    assert first.status_code == 200
+    assert first["ETag"] and first["Last-Modified"]
+
+    with django_assert_num_queries(1):
+        second = client.get(URL, HTTP_IF_NONE_MATCH=first["ETag"])
+
+    assert second.status_code == 304
+    assert second.content == b""
+
+
+@pytest.mark.parametrize("change", ["edit", "delete", "move_out", "rename_assignee"])
+def test_changes_invalidate_etag(client, task, household, change):
+    Task.objects.create(household=household, title="Other", due_date=make_aware(datetime(2026, 3, 2)))
+    etag = client.get(URL + "&compact=true")["ETag"]
+
+    if change == "edit":
+        task.title = "Dentist (moved)"
+        task.save()
+    elif change == "delete":
+        task.delete()
+    elif change == "move_out":
+        Task.objects.filter(pk=task.pk).update(due_date=make_aware(datetime(2026, 5, 1)))
+    elif change == "rename_assignee":
+        member = task.assignee_member
+        member.name = "Alexandra"
+        member.save()
+
+    res = client.get(URL + "&compact=true", HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+
+
+def test_compact_and_full_have_different_etags(client, task):
+    assert client.get(URL)["ETag"] != client.get(URL + "&compact=true")["ETag"]
+
+
+def day_counts(client, **params):
+    res = client.get("/api/calendar/day-counts/", {"start": "2026-03-01", "end": "2026-03-08", **params})
+    assert res.status_code == 200
+    return {d["date"]: {k: v for k, v in d.items() if k != "date"} for d in res.json()["days"]}
+
+
+def test_day_counts_expand_multi_day_tasks(client, household):
+    utc = ZoneInfo("UTC")
+    # Spans from before the range into it: Feb 27 -> Mar 3
+    Task.objects.create(
+        household=household, title="Trip", priority="high",
+        start_at=datetime(2026, 2, 27, 9, tzinfo=utc), due_date=datetime(2026, 3, 3, 9, tzinfo=utc),
+    )
+    Task.objects.create(household=household, title="Bins", due_date=datetime(2026, 3, 3, 7, tzinfo=utc))
+    Task.objects.create(
+        household=household, title="Done", completed=True, due_date=datetime(2026, 3, 5, 7, tzinfo=utc),
+    )
+    Task.objects.create(household=household, title="Outside", due_date=datetime(2026, 3, 9, 7, tzinfo=utc))
+
+    days = day_counts(client, tz="UTC")
+
+    assert len(days) == 7
+    assert days["2026-03-01"] == {"total": 1, "overdue": 1, "high_priority": 1}
+    assert days["2026-03-02"] == {"total": 1, "overdue": 1, "high_priority": 1}
+    assert days["2026-03-03"] == {"total": 2, "overdue": 2, "high_priority": 1}
+    assert days["2026-03-04"] == {"total": 0, "overdue": 0, "high_priority": 0}
+    assert days["2026-03-05"] == {"total": 1, "overdue": 0, "high_priority": 0}
+
+
+def test_day_counts_use_requested_time_zone(client, household):
+    Task.objects.create(household=household, title="Late", due_date=datetime(2026, 3, 4, 2, tzinfo=ZoneInfo("UTC")))
+
+    assert day_counts(client, tz="UTC")["2026-03-04"]["total"] == 1
+    new_york = day_counts(client, tz="America/New_York")
+    assert new_york["2026-03-03"]["total"] == 1
+    assert new_york["2026-03-04"]["total"] == 0
+
+
+def test_day_counts_match_calendar_tasks(client, household):
+    tz = ZoneInfo("Europe/Dublin")
+    for day in (1, 1, 4, 6):
+        Task.objects.create(household=household, title=f"T{day}", due_date=datetime(2026, 3, day, 12, tzinfo=tz))
+
+    listed = client.get("/api/calendar/tasks/?start=2026-03-01&end=2026-03-08").json()
+    days = day_counts(client, tz="Europe/Dublin")
+
+    assert sum(d["total"] for d in days.values()) == len(listed)
+
+
+def test_day_counts_validate_parameters(client):
+    url = "/api/calendar/day-counts/"
+    assert client.get(url).status_code == 400
+    assert client.get(url, {"start": "2026-03-08", "end": "2026-03-01"}).status_code == 400
+    assert client.get(url, {"start": "2026-01-01", "end": "2028-01-01"}).status_code == 400
+    assert client.get(url, {"start": "2026-03-01", "end": "2026-03-08", "tz": "Mars/Olympus"}).status_code == 400
+
+
+def test_day_counts_cost_three_queries(client, household, django_assert_num_queries):
+    for day in range(1, 8):
+        Task.objects.create(household=household, title=f"T{day}", due_date=datetime(2026, 3, day, 12, tzinfo=ZoneInfo("UTC")))
+
+    # Two grouped counts and the (empty) list of repeating tasks
+    with django_assert_num_queries(3):
+        day_counts(client)
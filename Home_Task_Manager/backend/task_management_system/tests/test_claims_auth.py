@@ -0,0 +1,137 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.models import Household, HouseholdInvite, Task
+
+pytestmark = pytest.mark.django_db
+User = get_user_model()
+
+
+@pytest.fixture
+def household():
+    return Household.objects.create(name="H")
+
+
+def make_user(household, username, role="adult"):
+    return User.objects.create_user(
+        username=username, email=f"{username}@e.com", password="pass12345", household=household, role=role
+    )
+
+
+def login(username):
+    res = APIClient().post("/api/token/", {"username": username, "password": "pass12345"}, format="json")
+    assert res.status_code == 200
+    return res.json()
+
+
+def client_for(access):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+    return client
+
+
+def test_authenticated_requests_do_not_load_the_user(household):
+    make_user(household, "u")
+    Task.objects.create(household=household, title="Dishes")
+    client = client_for(login("u")["access"])
+    client.get("/api/tasks/")  # warms the cached token version
+
+    with CaptureQueriesContext(connection) as ctx:
+        res = client.get("/api/tasks/")
+
+    assert res.status_code == 200
+    assert [t["title"] for t in res.json()["results"]] == ["Dishes"]
+    tables = " ".join(q["sql"] for q in ctx.captured_queries)
+    assert "users_user" not in tables
+    assert "core_household" not in tables
+
+
+def test_token_version_costs_no_cache_query_with_the_database_cache(household, settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                                   "LOCATION": "django_cache"}}
+    call_command("createcachetable", verbosity=0)
+    user = make_user(household, "u")
+    client = client_for(login("u")["access"])
+    client.get("/api/tasks/")
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert client.get("/api/tasks/").status_code == 200
+
+    assert not [q for q in ctx.captured_queries if f"user:{user.pk}:token_version" in q["sql"]]
+
+
+def test_cached_dashboard_costs_no_queries(household, django_assert_num_queries):
+    make_user(household, "u")
+    client = client_for(login("u")["access"])
+    client.get("/api/dashboard/")
+
+    with django_assert_num_queries(0):
+        assert client.get("/api/dashboard/").status_code == 200
+
+
+def test_full_user_is_loaded_when_a_view_needs_it(household):
+    make_user(household, "u")
+    client = client_for(login("u")["access"])
+
+    assert client.get("/api/me/").json()["email"] == "u@e.com"
+    res = client.patch("/api/me/", {"first_name": "Una"}, format="json")
+    assert res.status_code == 200
+    assert User.objects.get(username="u").first_name == "Una"
+
+    res = client.post("/api/change-password/", {"old_password": "pass12345", "new_password": "N3w-pass-9876"}, format="json")
+    assert res.status_code == 200
+
+
+def test_role_change_invalidates_tokens(household):
+    make_user(household, "admin", role="admin")
+    make_user(household, "kid", role="adult")
+    kid_tokens = login("kid")
+    kid = client_for(kid_tokens["access"])
+    assert kid.post("/api/tasks/", {"title": "Mine"}, format="json").status_code == 201
+
+    admin = client_for(login("admin")["access"])
+    kid_id = User.objects.get(username="kid").pk
+    res = admin.patch(f"/api/household/users/{kid_id}/role/", {"role": "child"}, format="json")
+    assert res.status_code == 200
+
+    assert kid.get("/api/tasks/").status_code == 401
+
+    # Refreshing picks up the new role.
+    res = APIClient().post("/api/token/refresh/", {"refresh": kid_tokens["refresh"]}, format="json")
+    kid = client_for(res.json()["access"])
+    assert kid.get("/api/tasks/").status_code == 200
+    assert kid.post("/api/tasks/", {"title": "Mine"}, format="json").status_code == 403
+
+
+def test_invite_acceptance_invalidates_tokens_and_returns_new_ones(household):
+    make_user(None, "joiner")
+    old = client_for(login("joiner")["access"])
+    invite = HouseholdInvite.objects.create(household=household, email="joiner@e.com", role="adult")
+    Task.objects.create(household=household, title="Theirs")
+
+    res = old.post("/api/household/invites/accept/", {"token": str(invite.token)}, format="json")
+    assert res.status_code == 200
+
+    assert old.get("/api/tasks/").status_code == 401
+    new = client_for(res.json()["access"])
+    assert [t["title"] for t in new.get("/api/tasks/").json()["results"]] == ["Theirs"]
+
+
+def test_tokens_without_claims_still_work(household):
+    user = make_user(household, "u")
+    client = client_for(str(RefreshToken.for_user(user).access_token))
+
+    assert client.get("/api/me/").json()["username"] == "u"
+
+
+def test_deleted_user_token_is_rejected(household):
+    make_user(household, "u")
+    client = client_for(login("u")["access"])
+    User.objects.filter(username="u").delete()
+
+    assert client.get("/api/tasks/").status_code == 401
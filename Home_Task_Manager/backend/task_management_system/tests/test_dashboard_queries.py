@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Household, Task, Member, Pet
+
+User = get_user_model()
+
+# stats aggregate + overdue list + upcoming list + repeating tasks
+DASHBOARD_QUERY_BUDGET = 4
+
+
+def make_tasks(household, count):
+    member = Member.objects.create(household=household, name="Alex")
+    pet = Pet.objects.create(household=household, name="Rex")
+    now = timezone.now()
+
+    tasks = []
+    for i in range(count):
+        tasks.append(
+            Task(
+                household=household,
+                title=f"Task {i}",
+                assignee_member=member if i % 2 == 0 else None,
+                assignee_pet=pet if i % 2 == 1 else None,
+                due_date=now + timedelta(days=i - count // 2),
+                completed=i % 5 == 0,
+                completed_at=now if i % 5 == 0 else None,
+            )
+        )
+    Task.objects.bulk_create(tasks)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("count", [0, 10, 60])
+def test_dashboard_query_budget_is_fixed(django_assert_num_queries, count):
+    household = Household.objects.create(name="H")
+    user = User.objects.create_user(username="u", email="u@e.com", password="pass12345", household=household)
+    make_tasks(household, count)
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    with django_assert_num_queries(DASHBOARD_QUERY_BUDGET):
+        res = client.get("/api/dashboard/")
+
+    assert res.status_code == 200
+    body = res.json()
+    assert body["stats"]["pending_rewards"] == len([i for i in range(count) if i % 5 == 0])
+    assert body["stats"]["completed_this_week"] == body["stats"]["pending_rewards"]
+    assert all(row["assignee"] is not None for row in body["overdue"] + body["upcoming"])
+
+
+@pytest.mark.django_db
+def test_dashboard_stats_only_count_own_household():
+    household = Household.objects.create(name="H")
+    other = Household.objects.create(name="Other")
+    user = User.objects.create_user(username="u", email="u@e.com", password="pass12345", household=household)
+    Task.objects.create(household=household, title="Mine", completed=True, completed_at=timezone.now())
+    Task.objects.create(household=other, title="Theirs", completed=True, completed_at=timezone.now())
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    res = client.get("/api/dashboard/")
+
+    assert res.json()["stats"] == {"completed_this_week": 1, "pending_rewards": 1}
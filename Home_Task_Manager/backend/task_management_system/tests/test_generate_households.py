@@ -0,0 +1,63 @@
+import io
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Sum
+from rest_framework.test import APIClient
+
+from core.models import CompletionRollup, Household, PointsLedgerEntry, Task
+
+pytestmark = pytest.mark.django_db
+User = get_user_model()
+
+
+def generate(*args):
+    call_command("generate_households", "--households", "3", "--tasks-per-household", "40", "--chunk-tasks", "80",
+                 *args, stdout=io.StringIO())
+
+
+def snapshot():
+    return list(Task.objects.order_by("id").values_list("title", "priority", "completed", "due_date"))
+
+
+def test_generates_households_with_consistent_points():
+    generate()
+
+    assert Household.objects.count() == 3
+    assert 60 <= Task.objects.count() <= 180
+    for user in User.objects.all():
+        ledger = PointsLedgerEntry.objects.filter(user=user).aggregate(total=Sum("delta"))["total"] or 0
+        assert user.points_balance == ledger >= 0
+    completions = PointsLedgerEntry.objects.filter(reason=PointsLedgerEntry.REASON_COMPLETION)
+    assert completions.count() == Task.objects.filter(completed=True).count()
+    assert CompletionRollup.objects.aggregate(total=Sum("completed"))["total"] == completions.count()
+
+    # Generated users can log in, and tasks inserted afterwards get fresh ids.
+    admin = User.objects.filter(role="admin").first()
+    res = APIClient().post("/api/token/", {"username": admin.username, "password": "pass12345"}, format="json")
+    assert res.status_code == 200
+    last = Task.objects.latest("id").pk
+    assert Task.objects.create(household=admin.household, title="New").pk > last
+
+
+def test_generated_tasks_are_searchable():
+    generate()
+    admin = User.objects.filter(role="admin").first()
+    client = APIClient()
+    client.force_authenticate(admin)
+
+    res = client.get("/api/tasks/", {"search": "laundr"})
+
+    assert res.status_code == 200
+    titles = {task["title"] for task in res.json()["results"]}
+    assert titles and all("Laundry" in title for title in titles)
+
+
+def test_same_seed_same_data():
+    generate("--seed", "7")
+    first = snapshot()
+    Household.objects.all().delete()
+    generate("--seed", "7")
+
+    assert [row[:3] for row in snapshot()] == [row[:3] for row in first]
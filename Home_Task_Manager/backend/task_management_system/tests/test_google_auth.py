@@ -11,7 +11,7 @@ User = get_user_model()
 def test_google_auth_creates_user_and_household(monkeypatch, settings):
     settings.GOOGLE_OAUTH_CLIENT_ID = "fake-client.apps.googleusercontent.com"
 
-    def fake_verify(token, req, audience):
+    def fake_verify(token, audience):
         assert audience == settings.GOOGLE_OAUTH_CLIENT_ID
         return {
             "email": "new@example.com",
@@ -22,7 +22,7 @@ def test_google_auth_creates_user_and_household(monkeypatch, settings):
             "sub": "google-sub-123",
         }
 
-    monkeypatch.setattr("core.views.id_token.verify_oauth2_token", fake_verify)
+    monkeypatch.setattr("core.views.verify_google_id_token", fake_verify)
 
     client = APIClient()
     res = client.post("/api/auth/google/", {"id_token": "fake"}, format="json")
@@ -42,7 +42,7 @@ def test_google_auth_existing_user_preserves_household(monkeypatch, settings):
     hh = Household.objects.create(name="Existing HH")
     user = User.objects.create(email="existing@example.com", username="existing@example.com", household=hh)
 
-    def fake_verify(token, req, audience):
+    def fake_verify(token, audience):
         return {
             "email": "existing@example.com",
             "email_verified": True,
@@ -52,7 +52,7 @@ def test_google_auth_existing_user_preserves_household(monkeypatch, settings):
             "sub": "google-sub-456",
         }
 
-    monkeypatch.setattr("core.views.id_token.verify_oauth2_token", fake_verify)
+    monkeypatch.setattr("core.views.verify_google_id_token", fake_verify)
 
     client = APIClient()
     res = client.post("/api/auth/google/", {"id_token": "fake"}, format="json")
@@ -65,10 +65,10 @@ def test_google_auth_existing_user_preserves_household(monkeypatch, settings):
 def test_google_auth_rejects_unverified_email(monkeypatch, settings):
     settings.GOOGLE_OAUTH_CLIENT_ID = "fake-client.apps.googleusercontent.com"
 
-    def fake_verify(token, req, audience):
+    def fake_verify(token, audience):
         return {"email": "u@example.com", "email_verified": False}
 
-    monkeypatch.setattr("core.views.id_token.verify_oauth2_token", fake_verify)
+    monkeypatch.setattr("core.views.verify_google_id_token", fake_verify)
 
     client = APIClient()
     res = client.post("/api/auth/google/", {"id_token": "fake"}, format="json")
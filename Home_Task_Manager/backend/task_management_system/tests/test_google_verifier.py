@@ -0,0 +1,210 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, exceptions, jwt
+
+from core.google_auth import GoogleTokenVerifier, cache_lifetime
+
+AUDIENCE = "client.apps.googleusercontent.com"
+
+
+@pytest.fixture(scope="module")
+def signing_key():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "test")])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(1)
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    signer = crypt.RSASigner.from_string(private_pem, key_id="kid-1")
+    return signer, {"kid-1": cert.public_bytes(serialization.Encoding.PEM).decode()}
+
+
+class CertServer:
+    """Stands in for Google's certificate endpoint and counts fetches."""
+
+    def __init__(self, certs, max_age):
+        self.fetches = 0
+        self.max_age = max_age
+        self.delay = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.fetches += 1
+                time.sleep(server.delay)
+                body = json.dumps(certs).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Cache-Control", f"public, max-age={server.max_age}")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/certs"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def cert_server(signing_key):
+    server = CertServer(signing_key[1], max_age=3600)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def make_token(signing_key):
+    def make(**claims):
+        now = int(time.time())
+        payload = {
+            "iss": "https://accounts.google.com",
+            "aud": AUDIENCE,
+            "sub": "123",
+            "email": "u@example.com",
+            "iat": now,
+            "exp": now + 600,
+            **claims,
+        }
+        return jwt.encode(signing_key[0], payload).decode()
+
+    return make
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+
+def test_one_fetch_per_max_age_window(cert_server, make_token):
+    verifier = GoogleTokenVerifier(cert_server.url)
+    for _ in range(50):
+        assert verifier.verify(make_token(), AUDIENCE)["email"] == "u@example.com"
+
+    # A second worker process shares the certificates through the cache.
+    GoogleTokenVerifier(cert_server.url).verify(make_token(), AUDIENCE)
+
+    assert cert_server.fetches == 1
+
+
+def test_concurrent_cold_logins_share_one_fetch(cert_server, make_token):
+    verifier = GoogleTokenVerifier(cert_server.url)
+    token = make_token()
+    errors = []
+
+    def login():
+        try:
+            verifier.verify(token, AUDIENCE)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=login) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert cert_server.fetches == 1
+
+
+def test_certificates_are_refetched_after_max_age(cert_server, make_token):
+    cert_server.max_age = 1
+    verifier = GoogleTokenVerifier(cert_server.url)
+    verifier.verify(make_token(), AUDIENCE)
+    time.sleep(1.1)
+
+    verifier.verify(make_token(), AUDIENCE)
+    verifier.verify(make_token(), AUDIENCE)
+
+    assert cert_server.fetches == 2
+
+
+def test_refresh_ahead_happens_in_background(cert_server, make_token):
+    cert_server.max_age = 2
+    verifier = GoogleTokenVerifier(cert_server.url)
+    verifier.verify(make_token(), AUDIENCE)
+    first_expiry = verifier.request.entry["expires_at"]
+    time.sleep(1.7)  # inside the last REFRESH_AHEAD of the window
+
+    verifier.verify(make_token(), AUDIENCE)
+    wait_for(lambda: cert_server.fetches == 2)
+    wait_for(lambda: not verifier.request.refreshing)
+
+    assert verifier.request.entry["expires_at"] > first_expiry
+
+
+def test_logins_during_a_slow_refresh_use_the_current_certificates(cert_server, make_token):
+    cert_server.max_age = 2
+    verifier = GoogleTokenVerifier(cert_server.url)
+    verifier.verify(make_token(), AUDIENCE)
+    first_expiry = verifier.request.entry["expires_at"]
+    time.sleep(1.7)
+    cert_server.delay = 1.5
+
+    verifier.verify(make_token(), AUDIENCE)  # starts the refresh
+    wait_for(lambda: cert_server.fetches == 2)
+    started = time.time()
+    verifier.verify(make_token(), AUDIENCE)
+    asyncio.run(verifier.averify(make_token(), AUDIENCE))
+
+    assert time.time() - started < 0.5
+    assert verifier.request.refreshing
+    assert verifier.request.entry["expires_at"] == first_expiry
+    wait_for(lambda: not verifier.request.refreshing)
+    assert verifier.request.entry["expires_at"] > first_expiry
+
+
+@pytest.mark.parametrize("claims", [{"aud": "someone-else"}, {"iss": "https://evil.example.com"}])
+def test_invalid_tokens_are_still_rejected(cert_server, make_token, claims):
+    with pytest.raises((ValueError, exceptions.GoogleAuthError)):
+        GoogleTokenVerifier(cert_server.url).verify(make_token(**claims), AUDIENCE)
+
+
+def test_cache_lifetime_honours_cache_control():
+    assert cache_lifetime({"Cache-Control": "public, max-age=21600, must-revalidate"}) == 21600
+    assert cache_lifetime({"Cache-Control": "max-age=600", "Age": "100"}) == 500
+    assert cache_lifetime({"Cache-Control": "no-store"}) == 0
+    assert cache_lifetime({}) == 0
+
+
+def test_async_verify_shares_one_fetch_across_concurrent_logins(cert_server, make_token):
+    verifier = GoogleTokenVerifier(cert_server.url)
+    token = make_token()
+
+    async def logins():
+        return await asyncio.gather(*(verifier.averify(token, AUDIENCE) for _ in range(20)))
+
+    assert {idinfo["email"] for idinfo in asyncio.run(logins())} == {"u@example.com"}
+    assert cert_server.fetches == 1
+    # The sync path reuses what the async one fetched.
+    verifier.verify(token, AUDIENCE)
+    assert cert_server.fetches == 1
@@ -0,0 +1,92 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from core.cache import household_cached
+from core.models import Household, Task, Member, Pet, Category, HouseholdInvite
+
+pytestmark = pytest.mark.django_db
+User = get_user_model()
+
+
+@pytest.fixture
+def household():
+    return Household.objects.create(name="H")
+
+
+@pytest.fixture
+def client(household):
+    user = User.objects.create_user(username="u", email="u@e.com", password="pass12345", household=household)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.mark.parametrize("url", ["/api/dashboard/", "/api/members/", "/api/pets/", "/api/categories/"])
+def test_cache_hit_runs_no_queries(client, household, django_assert_num_queries, url):
+    Member.objects.create(household=household, name="Alex")
+    Pet.objects.create(household=household, name="Rex")
+    Category.objects.create(household=household, name="Kitchen")
+
+    first = client.get(url)
+    assert first.status_code == 200
+
+    with django_assert_num_queries(0):
+        second = client.get(url)
+
+    assert second.json() == first.json()
+
+
+def test_save_and_delete_invalidate(client, household):
+    assert client.get("/api/categories/").json() == []
+
+    category = Category.objects.create(household=household, name="Garden")
+    assert [c["name"] for c in client.get("/api/categories/").json()] == ["Garden"]
+
+    category.delete()
+    assert client.get("/api/categories/").json() == []
+
+
+def test_task_change_invalidates_dashboard(client, household):
+    assert client.get("/api/dashboard/").json()["stats"]["pending_rewards"] == 0
+
+    res = client.post("/api/tasks/", {"title": "Dishes"}, format="json")
+    client.patch(f"/api/tasks/{res.json()['id']}/", {"completed": True}, format="json")
+
+    assert client.get("/api/dashboard/").json()["stats"]["pending_rewards"] == 1
+
+
+def test_other_household_changes_do_not_invalidate(client, household, django_assert_num_queries):
+    client.get("/api/members/")
+    Member.objects.create(household=Household.objects.create(name="Other"), name="Sam")
+
+    with django_assert_num_queries(0):
+        client.get("/api/members/")
+
+
+def test_member_moving_household_invalidates_old_household(client, household):
+    new_household = Household.objects.create(name="New")
+    mover = User.objects.create_user(username="m", email="m@e.com", password="pass12345", household=household)
+    Member.objects.create(household=household, user=mover, name="Mover")
+    assert [m["name"] for m in client.get("/api/members/").json()] == ["Mover"]
+
+    invite = HouseholdInvite.objects.create(household=new_household, email="m@e.com")
+    mover_client = APIClient()
+    mover_client.force_authenticate(user=User.objects.get(pk=mover.pk))
+    res = mover_client.post("/api/household/invites/accept/", {"token": str(invite.token)}, format="json")
+    assert res.status_code == 200
+
+    assert client.get("/api/members/").json() == []
+
+
+def test_read_before_commit_does_not_poison_the_cache(household, django_capture_on_commit_callbacks):
+    def build(payload):
+        return lambda: (payload, None)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Category.objects.create(household=household, name="Garden")
+        # Another process reading before the commit still sees the old rows
+        # and caches them under the version the save just bumped to.
+        assert household_cached(household.pk, "categories", build([])) == []
+
+    assert household_cached(household.pk, "categories", build(["Garden"])) == ["Garden"]
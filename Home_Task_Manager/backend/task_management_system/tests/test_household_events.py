@@ -0,0 +1,148 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient
+from rest_framework.test import APIClient
+
+from core import events
+from core.models import Household, Task
+from users.authentication import ClaimsRefreshToken
+
+pytestmark = pytest.mark.django_db
+User = get_user_model()
+
+URL = "/api/events/"
+
+
+@pytest.fixture
+def household():
+    return Household.objects.create(name="H")
+
+
+@pytest.fixture
+def user(household):
+    return User.objects.create_user(username="u", email="u@e.com", password="pass12345", household=household)
+
+
+def access_token(user):
+    return str(ClaimsRefreshToken.for_user(user).access_token)
+
+
+def parse(chunk):
+    """SSE text -> [(event type, data)]."""
+    out = []
+    for block in chunk.decode().strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if not line.startswith(":"))
+        if "event" in fields:
+            out.append((fields["event"], json.loads(fields["data"])))
+    return out
+
+
+def test_broker_delivers_to_the_household_from_any_thread():
+    broker = events.LocalBroker()
+
+    async def scenario():
+        mine = broker.subscribe(1)
+        theirs = broker.subscribe(2)
+        thread = threading.Thread(target=broker.publish, args=(1, [{"type": "task.created", "id": 5}]))
+        thread.start()
+        assert await mine.get(timeout=2) == [{"type": "task.created", "id": 5}]
+        assert await theirs.get(timeout=0.05) is None
+        mine.close()
+        theirs.close()
+
+    asyncio.run(scenario())
+    assert not broker.subscribers
+
+
+def test_slow_subscribers_are_told_to_resync():
+    broker = events.LocalBroker()
+
+    async def scenario():
+        subscription = broker.subscribe(1)
+        for i in range(events.MAX_PENDING + 1):
+            broker.publish(1, [{"type": "task.updated", "id": i}])
+        await asyncio.sleep(0)
+        assert await subscription.get(timeout=1) == [events.RESYNC]
+        assert await subscription.get(timeout=0.05) is None
+
+    asyncio.run(scenario())
+
+
+def test_events_are_published_on_commit(household, monkeypatch, django_capture_on_commit_callbacks):
+    published = []
+    monkeypatch.setattr(events.get_broker(), "publish", lambda hid, batch: published.append((hid, batch)))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        task = Task.objects.create(household=household, title="Bins")
+        assert published == []
+
+    [(household_id, [event])] = published
+    assert household_id == household.pk
+    assert (event["type"], event["id"]) == ("task.created", task.pk)
+
+
+def test_completing_a_task_publishes_completion_and_points(household, user, monkeypatch,
+                                                            django_capture_on_commit_callbacks):
+    task = Task.objects.create(household=household, title="Bins")
+    published = []
+    monkeypatch.setattr(events.get_broker(), "publish", lambda hid, batch: published.extend(batch))
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.patch(f"/api/tasks/{task.pk}/", {"completed": True}, format="json")
+
+    types = [event["type"] for event in published]
+    assert "task.completed" in types and "points.changed" in types and "task.updated" in types
+    assert {"type": "points.changed", "user_id": user.pk, "delta": 10} in published
+
+
+def test_stream_requires_a_valid_token():
+    async def scenario():
+        client = AsyncClient()
+        assert (await client.get(URL)).status_code == 401
+        assert (await client.get(URL, {"access_token": "nope"})).status_code == 401
+
+    async_to_sync(scenario)()
+
+
+def test_stream_is_not_served_over_wsgi(user):
+    # Under WSGI the whole stream would be buffered until the token expired.
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token(user)}")
+    assert client.get(URL).status_code == 501
+
+
+def test_stream_pushes_only_the_households_events(household, user, django_capture_on_commit_callbacks):
+    other = Household.objects.create(name="Other")
+
+    def create_tasks():
+        with django_capture_on_commit_callbacks(execute=True):
+            Task.objects.create(household=other, title="Not mine")
+            return Task.objects.create(household=household, title="Mine")
+
+    async def scenario():
+        response = await AsyncClient().get(URL, headers={"Authorization": f"Bearer {access_token(user)}"})
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/event-stream"
+        stream = aiter(response.streaming_content)
+        try:
+            assert (await anext(stream)).startswith(b"retry:")
+            task = await sync_to_async(create_tasks)()
+            received = parse(await asyncio.wait_for(anext(stream), 2))
+        finally:
+            await stream.aclose()
+        return task, received
+
+    task, received = async_to_sync(scenario)()
+
+    [(kind, data)] = received
+    assert kind == "task.created"
+    assert data["id"] == task.pk
+    assert data["cursor"].startswith(f"{household.pk}:")
+    assert not events.get_broker().subscribers
@@ -60,5 +60,5 @@ def only_household_a_tasks_returned(ctx):
     res = ctx["response"]
     assert res.status_code == 200
 
-    titles = [t["title"] for t in res.json()]
+    titles = [t["title"] for t in res.json()["results"]]
     assert set(titles) == {"Task A1", "Task A2"}
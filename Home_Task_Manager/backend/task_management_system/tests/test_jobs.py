@@ -0,0 +1,151 @@
+import io
+import time
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import jobs
+from core.models import Household, Job
+
+pytestmark = pytest.mark.django_db
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def locmem_email(settings):
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    settings.DEFAULT_FROM_EMAIL = "noreply@example.com"
+
+
+@pytest.fixture
+def admin_client():
+    household = Household.objects.create(name="H")
+    user = User.objects.create_user(username="a", email="a@e.com", password="pass12345", household=household, role="admin")
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def run_jobs():
+    call_command("run_jobs", "--once", "--workers", "1", stdout=io.StringIO())
+
+
+def test_invite_queues_email_instead_of_sending(admin_client):
+    res = admin_client.post("/api/household/invites/", {"email": "New@E.com", "role": "adult"}, format="json")
+
+    assert res.status_code == 201
+    assert res.json()["email_queued"] is True
+    # The keys the response had before email was queued are still there.
+    assert (res.json()["email_sent"], res.json()["email_error"]) == (True, None)
+    assert mail.outbox == []
+    assert Job.objects.get().status == Job.STATUS_PENDING
+
+    run_jobs()
+
+    assert [m.to for m in mail.outbox] == [["new@e.com"]]
+    assert res.json()["invite_link"] in mail.outbox[0].body
+    assert Job.objects.get().status == Job.STATUS_DONE
+
+
+def test_password_reset_queues_email():
+    User.objects.create_user(username="u", email="u@e.com", password="pass12345")
+
+    res = APIClient().post("/api/password-reset/", {"email": "u@e.com"}, format="json")
+
+    assert res.status_code == 200
+    assert mail.outbox == []
+    run_jobs()
+    assert mail.outbox[0].subject == "Reset your password"
+
+
+def test_failed_send_is_retried_with_backoff(monkeypatch):
+    job = jobs.enqueue_email("Hi", "Body", ["x@e.com"])
+
+    def fail(self, messages):
+        raise ConnectionError("provider down")
+
+    monkeypatch.setattr(EmailBackend, "send_messages", fail)
+    before = timezone.now()
+    run_jobs()
+
+    job.refresh_from_db()
+    assert job.status == Job.STATUS_PENDING
+    assert job.attempts == 1
+    assert "provider down" in job.last_error
+    assert job.run_after >= before + jobs.BACKOFF_BASE
+
+    # Not due yet, so another pass leaves it alone.
+    run_jobs()
+    job.refresh_from_db()
+    assert job.attempts == 1
+
+
+def test_job_fails_after_max_attempts(monkeypatch):
+    job = jobs.enqueue_email("Hi", "Body", ["x@e.com"])
+    monkeypatch.setattr(EmailBackend, "send_messages", lambda self, messages: 1 / 0)
+
+    for _ in range(job.max_attempts):
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        run_jobs()
+
+    job.refresh_from_db()
+    assert job.status == Job.STATUS_FAILED
+    assert job.attempts == job.max_attempts
+    assert job.finished_at is not None
+
+
+def test_one_bad_message_does_not_fail_the_batch(monkeypatch):
+    good = jobs.enqueue_email("Hi", "Body", ["good@e.com"])
+    bad = jobs.enqueue(jobs.EMAIL, {"subject": "Hi", "body": "Body", "to": ["bad@e.com"], "bogus": 1})
+
+    run_jobs()
+
+    assert Job.objects.get(pk=good.pk).status == Job.STATUS_DONE
+    assert Job.objects.get(pk=bad.pk).status == Job.STATUS_PENDING
+    assert [m.to for m in mail.outbox] == [["good@e.com"]]
+
+
+def test_abandoned_running_job_is_reclaimed():
+    job = jobs.enqueue_email("Hi", "Body", ["x@e.com"])
+    Job.objects.filter(pk=job.pk).update(status=Job.STATUS_RUNNING, locked_at=timezone.now() - timedelta(minutes=1))
+    run_jobs()
+    assert mail.outbox == []
+
+    Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - jobs.LOCK_TIMEOUT - timedelta(seconds=1))
+    run_jobs()
+    assert len(mail.outbox) == 1
+
+
+def test_claims_do_not_overlap():
+    Job.objects.bulk_create([Job(kind=jobs.EMAIL, payload={}) for _ in range(5)])
+
+    first = jobs.claim(3)
+    second = jobs.claim(3)
+
+    assert len(first) == 3
+    assert len(second) == 2
+    assert not {j.pk for j in first} & {j.pk for j in second}
+
+
+def test_thousand_messages_drain_in_batches(django_assert_max_num_queries):
+    Job.objects.bulk_create([
+        Job(kind=jobs.EMAIL, payload={"subject": f"M{i}", "body": "Body", "to": [f"u{i}@e.com"]})
+        for i in range(1000)
+    ])
+
+    started = time.perf_counter()
+    # Per batch of 100: claim (UPDATE + SELECT) and one UPDATE to finish.
+    with django_assert_max_num_queries(35):
+        run_jobs()
+    elapsed = time.perf_counter() - started
+
+    assert len(mail.outbox) == 1000
+    assert len({m.subject for m in mail.outbox}) == 1000
+    assert not Job.objects.exclude(status=Job.STATUS_DONE).exists()
+    assert elapsed < 10
@@ -0,0 +1,181 @@
+import threading
+from io import StringIO
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, OperationalError
+from django.db.models import Sum
+from rest_framework.test import APIClient
+
+from core import points
+from core.models import Household, Task, PointsLedgerEntry, RewardRedemption
+from core.serializers import TaskSerializer
+from core.views import TaskViewSet
+
+User = get_user_model()
+
+
+def ledger_total(user):
+    return PointsLedgerEntry.objects.filter(user=user).aggregate(total=Sum("delta"))["total"] or 0
+
+
+def make_user(household, username="u", balance=0):
+    user = User.objects.create_user(
+        username=username, email=f"{username}@e.com", password="pass12345", household=household, role="admin"
+    )
+    if balance:
+        points.apply_entries(user, [PointsLedgerEntry(user=user, household=household, delta=balance, reason="adjustment")])
+    return user
+
+
+@pytest.mark.django_db
+def test_completion_round_trip_is_recorded():
+    household = Household.objects.create(name="H")
+    user = make_user(household)
+    task = Task.objects.create(household=household, title="T")
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    client.patch(f"/api/tasks/{task.id}/", {"completed": True}, format="json")
+    client.patch(f"/api/tasks/{task.id}/", {"completed": False}, format="json")
+
+    reasons = list(PointsLedgerEntry.objects.filter(user=user).order_by("id").values_list("reason", "delta"))
+    assert reasons == [("completion", 10), ("uncompletion", -10)]
+    user.refresh_from_db()
+    assert user.points_balance == ledger_total(user) == 0
+
+
+@pytest.mark.django_db
+def test_taking_back_spent_points_records_the_shortfall():
+    household = Household.objects.create(name="H")
+    user = make_user(household, balance=4)
+    task = Task.objects.create(household=household, title="T", completed=True)
+
+    assert points.record_completion(user, task, False) == -4
+
+    user.refresh_from_db()
+    assert user.points_balance == 0
+    assert ledger_total(user) == 0
+    assert PointsLedgerEntry.objects.filter(user=user, reason="adjustment", delta=6).exists()
+
+
+@pytest.mark.django_db
+def test_redeem_is_all_or_nothing():
+    household = Household.objects.create(name="H")
+    user = make_user(household, balance=20)
+
+    points.redeem(user, 15, "Ice cream")
+    with pytest.raises(points.InsufficientPoints):
+        points.redeem(user, 15)
+
+    assert points.current_balance(user) == 5 == ledger_total(user)
+    assert RewardRedemption.objects.filter(user=user).count() == 1
+    assert PointsLedgerEntry.objects.get(reason="redemption").redemption.points_redeemed == 15
+
+
+@pytest.mark.django_db
+def test_rebuild_command_restores_balances_from_ledger():
+    household = Household.objects.create(name="H")
+    users = [make_user(household, f"u{i}", balance=10 * i) for i in range(5)]
+    User.objects.filter(pk__in=[users[1].pk, users[3].pk]).update(points_balance=999)
+
+    dry = StringIO()
+    call_command("rebuild_points_balances", "--dry-run", "--batch-size", "2", stdout=dry)
+    assert "would fix 2" in dry.getvalue()
+    assert User.objects.get(pk=users[1].pk).points_balance == 999
+
+    out = StringIO()
+    call_command("rebuild_points_balances", "--batch-size", "2", stdout=out)
+    assert "Checked 5 users, fixed 2" in out.getvalue()
+    for user in users:
+        assert points.current_balance(user) == ledger_total(user)
+
+
+@pytest.mark.django_db
+def test_racing_completions_of_one_task_award_points_once():
+    """Two requests that both loaded the task before either saved it."""
+    household = Household.objects.create(name="H")
+    user = make_user(household)
+    task = Task.objects.create(household=household, title="T")
+    request = SimpleNamespace(user=user)
+
+    stale_copies = [Task.objects.get(pk=task.pk), Task.objects.get(pk=task.pk)]
+    for stale in stale_copies:
+        serializer = TaskSerializer(stale, data={"completed": True}, partial=True, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        TaskViewSet(request=request).perform_update(serializer)
+
+    assert points.current_balance(user) == 10 == ledger_total(user)
+
+
+def run_concurrently(workers, target):
+    """Run target(i) on `workers` threads at once; each thread uses its own connection."""
+    barrier = threading.Barrier(workers)
+    errors = []
+
+    def run(i):
+        try:
+            barrier.wait()
+            target(i)
+        except Exception as exc:  # pragma: no cover - surfaced below
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors, errors
+
+
+def retry_locked(fn):
+    # The shared-cache in-memory SQLite test database reports writer
+    # contention as an error ("database table is locked", or a failed FTS5
+    # vtable constructor) instead of waiting. A real client would retry,
+    # so do the same.
+    while True:
+        try:
+            return fn()
+        except OperationalError as exc:
+            if "locked" not in str(exc) and "vtable constructor failed" not in str(exc):
+                raise
+
+
+@pytest.mark.django_db(transaction=True)
+def test_balances_stay_exact_under_contention():
+    household = Household.objects.create(name="H")
+    user = make_user(household, balance=100)
+    tasks = Task.objects.bulk_create([Task(household=household, title=f"T{i}") for i in range(20)])
+    redeemed = []
+    lock = threading.Lock()
+
+    def work(i):
+        if i % 3 < 2:
+            # Every task is completed by two racing threads: points are awarded once.
+            retry_locked(lambda: toggle(tasks[i // 3]))
+        else:
+            try:
+                retry_locked(lambda: points.redeem(user, 7))
+            except points.InsufficientPoints:
+                return
+            with lock:
+                redeemed.append(7)
+
+    def toggle(task):
+        client = APIClient()
+        client.force_authenticate(user=User.objects.get(pk=user.pk))
+        res = client.patch(f"/api/tasks/{task.id}/", {"completed": True}, format="json")
+        assert res.status_code == 200
+
+    run_concurrently(60, work)
+
+    completed = Task.objects.filter(completed=True).count()
+    assert completed == 20
+    expected = 100 + 10 * completed - sum(redeemed)
+    assert points.current_balance(user) == expected
+    assert ledger_total(user) == expected
+    assert PointsLedgerEntry.objects.filter(reason="completion").count() == completed
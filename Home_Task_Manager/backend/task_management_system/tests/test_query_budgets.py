@@ -0,0 +1,47 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.endpoints import ENDPOINTS, EXCLUDED, client_for, route_names, send
+from tests.synthetic import build_household
+
+pytestmark = pytest.mark.django_db
+
+
+def test_every_route_is_benchmarked_or_excluded():
+    covered = {name.split(":")[0] for name in ENDPOINTS}
+    assert route_names() == covered | EXCLUDED.keys()
+    assert not covered & EXCLUDED.keys()
+
+
+def count_queries(h, name):
+    call = ENDPOINTS[name](h)
+    client = client_for(h, call)
+    with CaptureQueriesContext(connection) as queries:
+        send(client, call)
+    return len(queries)
+
+
+@pytest.fixture(params=["locmem", "database"])
+def cache_backend(request, settings):
+    # Production defaults to the database cache, where cache reads are queries too.
+    if request.param == "database":
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                                       "LOCATION": "django_cache"}}
+        call_command("createcachetable", verbosity=0)
+    return request.param
+
+
+@pytest.mark.parametrize("name", sorted(ENDPOINTS))
+def test_query_count_does_not_grow_with_the_household(name, cache_backend):
+    small = build_household(10, name="Small")
+    large = build_household(300, name="Large", seed=1)
+
+    # Warm household-scoped caches first; the second call is the steady state.
+    counts = []
+    for h in (small, large):
+        count_queries(h, name)
+        counts.append(count_queries(h, name))
+
+    assert counts[0] == counts[1], f"{name}: {counts[0]} queries for 10 tasks, {counts[1]} for 300"
@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Household, Task, Member, Pet, Category
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(connection.vendor != "sqlite", reason="EXPLAIN QUERY PLAN output is SQLite specific"),
+]
+
+
+@pytest.fixture
+def households():
+    """
+    Several households with a realistic mix of open / completed tasks,
+    followed by ANALYZE so the planner sees real statistics.
+    """
+    now = timezone.now()
+    households = [Household.objects.create(name=f"H{i}") for i in range(20)]
+
+    rows = []
+    for h in households:
+        Member.objects.create(household=h, name="Alex")
+        Pet.objects.create(household=h, name="Rex")
+        Category.objects.create(household=h, name="Kitchen")
+        for i in range(100):
+            done = i % 10 != 0
+            rows.append(
+                Task(
+                    household=h,
+                    title=f"Task {i}",
+                    completed=done,
+                    completed_at=now - timedelta(days=i) if done else None,
+                    due_date=now + timedelta(days=i - 50),
+                    start_at=now + timedelta(days=i - 51) if i % 3 == 0 else None,
+                )
+            )
+    Task.objects.bulk_create(rows)
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+    return households
+
+
+def assert_uses_index(qs, index_name):
+    plan = qs.explain()
+    # "USING INDEX x" or "USING COVERING INDEX x" are both fine
+    assert f"INDEX {index_name}" in plan, plan
+    assert "SCAN " not in plan, plan
+
+
+def test_task_list_uses_created_index(households):
+    qs = Task.objects.filter(household=households[0]).order_by("-created_at", "-id")
+    assert_uses_index(qs, "core_task_hh_created_idx")
+    assert "TEMP B-TREE" not in qs.explain()
+
+
+def test_task_list_cursor_page_uses_created_index(households):
+    last = Task.objects.filter(household=households[0]).order_by("-created_at", "-id")[49]
+    qs = (
+        Task.objects.filter(household=households[0])
+        .order_by("-created_at", "-id")
+        .filter(created_at__lte=last.created_at)
+        .exclude(created_at=last.created_at, id__gte=last.id)[:51]
+    )
+    assert_uses_index(qs, "core_task_hh_created_idx")
+    assert "TEMP B-TREE" not in qs.explain()
+
+
+def test_dashboard_lists_use_open_due_index(households):
+    now = timezone.now()
+    qs = Task.objects.filter(household=households[0])
+
+    overdue = qs.filter(completed=False, due_date__lt=now).order_by("due_date")[:10]
+    upcoming = qs.filter(completed=False, due_date__gte=now).order_by("due_date")[:10]
+
+    for q in (overdue, upcoming):
+        assert_uses_index(q, "core_task_hh_open_due_idx")
+        assert "TEMP B-TREE" not in q.explain()
+
+
+def test_dashboard_completed_this_week_uses_partial_index(households):
+    start_of_week = timezone.now() - timedelta(days=7)
+    qs = Task.objects.filter(household=households[0], completed=True, completed_at__gte=start_of_week)
+    assert_uses_index(qs, "core_task_hh_completed_at_idx")
+
+
+def test_calendar_range_uses_household_indexes(households):
+    now = timezone.now()
+    start_dt, end_dt = now - timedelta(days=15), now + timedelta(days=15)
+    qs = Task.objects.filter(household=households[0]).filter(
+        Q(start_at__isnull=False, due_date__isnull=False, start_at__lt=end_dt, due_date__gte=start_dt)
+        | Q(start_at__isnull=True, due_date__isnull=False, due_date__gte=start_dt, due_date__lt=end_dt)
+    )
+    plan = qs.explain()
+    assert "SCAN " not in plan, plan
+    assert "core_task_hh_" in plan, plan
+
+
+@pytest.mark.parametrize(
+    "model, index_name",
+    [
+        (Member, "core_member_hh_name_idx"),
+        (Pet, "core_pet_hh_name_idx"),
+        (Category, "core_category_hh_name_idx"),
+    ],
+)
+def test_name_ordered_lists_use_household_name_index(households, model, index_name):
+    qs = model.objects.filter(household=households[0]).order_by("name")
+    assert_uses_index(qs, index_name)
+    assert "TEMP B-TREE" not in qs.explain()
@@ -0,0 +1,178 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.timezone import make_aware
+from rest_framework.test import APIClient
+
+from core import recurrence
+from core.models import Household, Member, PointsLedgerEntry, Task
+
+pytestmark = pytest.mark.django_db
+User = get_user_model()
+
+YEAR = "/api/calendar/tasks/?start=2026-01-01&end=2027-01-01"
+
+
+@pytest.fixture
+def household():
+    return Household.objects.create(name="H")
+
+
+@pytest.fixture
+def user(household):
+    return User.objects.create_user(username="u", email="u@e.com", password="pass12345", household=household,
+                                    role="admin")
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def bins(household):
+    member = Member.objects.create(household=household, name="Alex")
+    # Mondays and Thursdays at 7:00 local time, from Thursday 1 January 2026
+    return Task.objects.create(household=household, title="Bins", assignee_member=member, repeat="weekly",
+                               repeat_weekdays=[0, 3], due_date=make_aware(datetime(2026, 1, 1, 7, 0)))
+
+
+def local(*args):
+    return make_aware(datetime(*args))
+
+
+def series(**fields):
+    return Task(due_date=local(2026, 1, 31, 9, 0), **fields)
+
+
+def test_rules():
+    daily = series(repeat="daily", repeat_interval=2, repeat_until=date(2026, 2, 6))
+    assert list(recurrence.occurrences(daily)) == [
+        local(2026, 1, 31, 9), local(2026, 2, 2, 9), local(2026, 2, 4, 9), local(2026, 2, 6, 9)
+    ]
+
+    weekly = series(repeat="weekly", repeat_weekdays=[1, 5], repeat_count=3)  # Saturday 31 Jan
+    assert list(recurrence.occurrences(weekly)) == [local(2026, 1, 31, 9), local(2026, 2, 3, 9), local(2026, 2, 7, 9)]
+
+    # No 31st in February or April
+    monthly = series(repeat="monthly", repeat_count=3)
+    assert list(recurrence.occurrences(monthly)) == [local(2026, 1, 31, 9), local(2026, 3, 31, 9), local(2026, 5, 31, 9)]
+
+
+def test_occurrences_keep_local_time_across_dst_and_jump_to_the_window():
+    daily = series(repeat="daily")
+    start = local(2026, 3, 28)
+
+    found = list(recurrence.occurrences(daily, start, start + timedelta(days=3)))
+
+    # Clocks go forward on 29 March in Dublin
+    assert [timezone.localtime(due).hour for due in found] == [9, 9, 9]
+    assert found[0] == local(2026, 3, 28, 9)
+
+
+def test_calendar_expands_series_within_the_window_only(client, bins):
+    res = client.get("/api/calendar/tasks/?start=2026-03-01&end=2026-03-08")
+
+    assert res.status_code == 200
+    rows = res.json()
+    assert [(row["id"], row["series"], row["title"], row["repeat"]) for row in rows] == [(None, bins.id, "Bins", "")] * 2
+    assert [row["occurrence_at"] for row in rows] == [row["due_date"] for row in rows]
+    assert timezone.localtime(datetime.fromisoformat(rows[0]["due_date"])).date() == date(2026, 3, 2)
+
+    compact = client.get("/api/calendar/tasks/?start=2026-03-01&end=2026-03-08&compact=true").json()
+    assert [(row["id"], row["series"], row["assignee"]["name"]) for row in compact] == [(None, bins.id, "Alex")] * 2
+
+
+def test_a_year_of_occurrences_comes_from_one_row(client, bins, django_assert_num_queries):
+    # Range state, the rows in range, the series and their stored occurrences
+    with django_assert_num_queries(4):
+        res = client.get(YEAR + "&compact=true")
+
+    assert len(res.json()) == 105
+    assert Task.objects.count() == 1
+
+
+def test_completing_an_occurrence_stores_it_and_credits_points(client, user, bins):
+    when = local(2026, 3, 5, 7)
+
+    res = client.post(f"/api/tasks/{bins.id}/occurrences/", {"occurrence_at": when.isoformat(), "completed": True},
+                      format="json")
+
+    assert res.status_code == 201
+    stored = Task.objects.get(pk=res.json()["id"])
+    assert (stored.series_id, stored.occurrence_at, stored.completed, stored.repeat) == (bins.id, when, True, "")
+    assert stored.completed_at is not None
+    assert PointsLedgerEntry.objects.get(task=stored).user == user
+
+    rows = client.get("/api/calendar/tasks/?start=2026-03-01&end=2026-03-08").json()
+    assert [(row["id"], row["completed"]) for row in rows] == [(None, False), (stored.id, True)]
+
+    again = client.post(f"/api/tasks/{bins.id}/occurrences/", {"occurrence_at": when.isoformat(), "title": "Recycling"},
+                        format="json")
+    assert again.status_code == 200
+    assert again.json()["id"] == stored.id and again.json()["title"] == "Recycling"
+
+
+def test_only_real_occurrences_of_a_series_can_be_stored(client, bins, household):
+    wednesday = local(2026, 3, 4, 7).isoformat()
+    plain = Task.objects.create(household=household, title="Once", due_date=local(2026, 3, 4, 7))
+
+    assert client.post(f"/api/tasks/{bins.id}/occurrences/", {"occurrence_at": wednesday}, format="json").status_code == 400
+    assert client.post(f"/api/tasks/{plain.id}/occurrences/", {"occurrence_at": wednesday}, format="json").status_code == 400
+    assert client.post(f"/api/tasks/{bins.id}/occurrences/", {}, format="json").status_code == 400
+
+
+def test_deleted_occurrences_stay_deleted(client, bins):
+    monday, thursday = local(2026, 3, 2, 7), local(2026, 3, 5, 7)
+    week = "/api/calendar/tasks/?start=2026-03-01&end=2026-03-08"
+
+    res = client.delete(f"/api/tasks/{bins.id}/occurrences/?occurrence_at={monday.isoformat().replace('+', '%2B')}")
+    assert res.status_code == 204
+
+    stored = client.post(f"/api/tasks/{bins.id}/occurrences/", {"occurrence_at": thursday.isoformat()}, format="json")
+    assert client.delete(f"/api/tasks/{stored.json()['id']}/").status_code == 204
+
+    assert client.get(week).json() == []
+    bins.refresh_from_db()
+    assert len(bins.repeat_skipped) == 2
+
+
+def test_a_series_is_completed_one_occurrence_at_a_time(client, bins):
+    res = client.patch(f"/api/tasks/{bins.id}/", {"completed": True}, format="json")
+
+    assert res.status_code == 400
+    assert "completed" in res.json()
+
+
+def test_repeating_needs_a_due_date_and_weekdays_need_weekly(client):
+    res = client.post("/api/tasks/", {"title": "x", "repeat": "daily"}, format="json")
+    assert res.status_code == 400 and "due_date" in res.json()
+
+    res = client.post("/api/tasks/", {"title": "x", "repeat": "daily", "repeat_weekdays": [1],
+                                      "due_date": "2026-03-01T09:00:00Z"}, format="json")
+    assert res.status_code == 400 and "repeat_weekdays" in res.json()
+
+
+def test_dashboard_lists_missed_and_upcoming_occurrences(client, household, monkeypatch):
+    now = local(2026, 3, 4, 12)
+    monkeypatch.setattr(timezone, "now", lambda: now)
+    Task.objects.create(household=household, title="Water plants", repeat="daily", due_date=local(2026, 1, 1, 8))
+
+    body = client.get("/api/dashboard/").json()
+
+    # Only the last week's missed occurrences count as overdue
+    assert [row["due_date"][:10] for row in body["overdue"]] == [f"2026-02-{d}" for d in (26, 27, 28)] + [
+        f"2026-03-0{d}" for d in (1, 2, 3, 4)
+    ]
+    assert len(body["upcoming"]) == 10 and body["upcoming"][0]["due_date"].startswith("2026-03-05")
+    assert all(row["id"] is None and row["series"] for row in body["overdue"] + body["upcoming"])
+
+
+def test_day_counts_include_occurrences(client, bins):
+    res = client.get("/api/calendar/day-counts/?start=2026-03-01&end=2026-03-08")
+
+    assert [day["total"] for day in res.json()["days"]] == [0, 1, 0, 0, 1, 0, 0]
@@ -0,0 +1,85 @@
+import logging
+import re
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient
+from rest_framework import renderers, serializers
+from rest_framework.test import APIClient
+
+from core.models import Household, Task
+from core.timing import instrument
+
+pytestmark = pytest.mark.django_db
+User = get_user_model()
+
+SERVER_TIMING = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries", serialize;dur=[\d.]+, total;dur=[\d.]+')
+
+
+@pytest.fixture
+def timing(settings):
+    settings.REQUEST_TIMING = True
+    settings.REQUEST_TIMING_SLOW_MS = 60_000
+    settings.REQUEST_TIMING_MAX_QUERIES = 30
+
+
+@pytest.fixture
+def client():
+    household = Household.objects.create(name="H")
+    user = User.objects.create_user(username="u", email="u@e.com", password="pass12345", household=household)
+    Task.objects.bulk_create([Task(household=household, title=f"T{i}") for i in range(5)])
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def test_server_timing_header_and_log_record(timing, client, caplog, django_assert_num_queries):
+    client.get("/api/tasks/")  # the process's first search backend lookup checks for the FTS table
+
+    with caplog.at_level(logging.INFO, logger="core.timing"):
+        with django_assert_num_queries(1):
+            res = client.get("/api/tasks/")
+
+    assert res.status_code == 200
+    assert SERVER_TIMING.fullmatch(res["Server-Timing"]).group(1) == "1"
+    [record] = caplog.records
+    assert record.levelno == logging.INFO
+    assert record.timing["path"] == "/api/tasks/"
+    assert record.timing["queries"] == 1
+    assert record.timing["serialize_ms"] > 0
+    assert record.timing["total_ms"] >= record.timing["db_ms"]
+
+
+def test_requests_over_the_query_threshold_are_flagged_with_top_statements(timing, settings, client, caplog):
+    settings.REQUEST_TIMING_MAX_QUERIES = 0
+
+    with caplog.at_level(logging.INFO, logger="core.timing"):
+        client.get("/api/tasks/")
+
+    [record] = caplog.records
+    assert record.levelno == logging.WARNING
+    [statement] = record.timing["top_statements"]
+    assert statement["sql"].startswith("SELECT") and '"core_task"' in statement["sql"]
+    assert statement["count"] == 1
+
+
+def test_async_views_are_timed_too(timing):
+    response = async_to_sync(AsyncClient().get)("/api/events/")
+
+    assert response.status_code == 401
+    assert SERVER_TIMING.fullmatch(response["Server-Timing"])
+
+
+def test_timing_needs_no_patched_drf_classes():
+    instrument()
+
+    assert not hasattr(renderers.JSONRenderer.render, "__wrapped__")
+    assert not hasattr(serializers.Serializer.data.fget, "__wrapped__")
+    assert not hasattr(serializers.ListSerializer.data.fget, "__wrapped__")
+
+
+def test_nothing_is_added_when_turned_off(settings, client):
+    settings.REQUEST_TIMING = False
+
+    assert "Server-Timing" not in client.get("/api/tasks/")
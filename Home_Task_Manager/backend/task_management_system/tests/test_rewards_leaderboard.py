@@ -0,0 +1,123 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import points
+from core.models import Household, PointsLedgerEntry
+
+pytestmark = pytest.mark.django_db
+User = get_user_model()
+
+
+@pytest.fixture
+def household():
+    return Household.objects.create(name="H")
+
+
+@pytest.fixture
+def user(household):
+    return User.objects.create_user(
+        username="u", email="u@e.com", password="pass12345", household=household,
+        first_name="Una", last_name="Byrne",
+    )
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def credit(user, amount, days_ago=0):
+    entry = PointsLedgerEntry(
+        user_id=user.pk, household_id=user.household_id,
+        delta=amount, reason=PointsLedgerEntry.REASON_COMPLETION,
+    )
+    points.apply_entries(user, [entry])
+    if days_ago:
+        PointsLedgerEntry.objects.filter(pk=entry.pk).update(
+            created_at=timezone.now() - timedelta(days=days_ago)
+        )
+
+
+def test_all_time_board_is_ranked_in_one_query(client, household, user, django_assert_num_queries):
+    other = User.objects.create_user(username="sam", email="s@e.com", password="pass12345", household=household)
+    credit(user, 10)
+    credit(other, 30)
+    User.objects.create_user(username="x", email="x@e.com", password="pass12345",
+                             household=Household.objects.create(name="Other"), points_balance=99)
+
+    with django_assert_num_queries(1):
+        data = client.get("/api/rewards/summary/").json()
+
+    assert data["period"] == "all"
+    assert data["household_total_points"] == 40
+    assert data["leaderboard"] == [
+        {"id": other.pk, "name": "sam", "points": 30, "role": other.role},
+        {"id": user.pk, "name": "Una Byrne", "points": 10, "role": user.role},
+    ]
+
+
+@pytest.mark.parametrize("period", ["all", "week", "month"])
+def test_cache_hit_runs_no_queries(client, user, django_assert_num_queries, period):
+    credit(user, 10)
+    first = client.get(f"/api/rewards/summary/?period={period}")
+    assert first.status_code == 200
+
+    with django_assert_num_queries(0):
+        second = client.get(f"/api/rewards/summary/?period={period}")
+
+    assert second.json() == first.json()
+
+
+def test_points_change_invalidates(client, user):
+    client.get("/api/rewards/summary/")
+    client.get("/api/rewards/summary/?period=week")
+
+    res = client.post("/api/tasks/", {"title": "Dishes"}, format="json")
+    client.patch(f"/api/tasks/{res.json()['id']}/", {"completed": True}, format="json")
+
+    assert client.get("/api/rewards/summary/").json()["leaderboard"][0]["points"] == 10
+    assert client.get("/api/rewards/summary/?period=week").json()["household_total_points"] == 10
+
+
+def test_user_rename_invalidates(client, user):
+    assert client.get("/api/rewards/summary/").json()["leaderboard"][0]["name"] == "Una Byrne"
+
+    user.first_name = ""
+    user.last_name = ""
+    user.save()
+
+    assert client.get("/api/rewards/summary/").json()["leaderboard"][0]["name"] == "u"
+
+
+def test_windowed_boards_only_count_task_points_in_window(client, household, user):
+    other = User.objects.create_user(username="sam", email="s@e.com", password="pass12345", household=household)
+    credit(user, 50, days_ago=40)
+    credit(user, 10)
+    credit(other, 20)
+    points.redeem(other, 5)
+
+    for period in ("week", "month"):
+        data = client.get(f"/api/rewards/summary/?period={period}").json()
+        assert [(row["id"], row["points"]) for row in data["leaderboard"]] == [(other.pk, 20), (user.pk, 10)]
+        assert data["household_total_points"] == 30
+
+
+def test_unknown_period_is_rejected(client):
+    assert client.get("/api/rewards/summary/?period=year").status_code == 400
+
+
+def test_board_read_before_commit_is_not_kept(client, household, user, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        credit(user, 10)
+        # Stands in for another process, which still sees the old balance.
+        User.objects.filter(pk=user.pk).update(points_balance=0)
+        assert client.get("/api/rewards/summary/").json()["household_total_points"] == 0
+        User.objects.filter(pk=user.pk).update(points_balance=10)
+
+    assert client.get("/api/rewards/summary/").json()["household_total_points"] == 10
@@ -0,0 +1,137 @@
+import io
+from datetime import date, datetime, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from django.utils.timezone import make_aware
+from rest_framework.test import APIClient
+
+from core.models import CompletionRollup, Household, Member, PointsLedgerEntry, Task
+
+pytestmark = pytest.mark.django_db
+User = get_user_model()
+
+
+@pytest.fixture
+def household():
+    return Household.objects.create(name="H")
+
+
+@pytest.fixture
+def user(household):
+    return User.objects.create_user(username="u", email="u@e.com", password="pass12345", household=household,
+                                    role="admin")
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def rollups():
+    return list(CompletionRollup.objects.order_by("day", "member_id").values_list("member_id", "day", "completed",
+                                                                                 "points"))
+
+
+def toggle(client, task, completed):
+    assert client.patch(f"/api/tasks/{task.pk}/", {"completed": completed}, format="json").status_code == 200
+
+
+def stats(client):
+    return client.get("/api/dashboard/").json()["stats"]
+
+
+def test_completion_toggles_update_the_days_rollup(client, household):
+    alex = Member.objects.create(household=household, name="Alex")
+    tasks = [Task.objects.create(household=household, title=f"T{i}", assignee_member=alex) for i in range(3)]
+    today = timezone.localdate()
+
+    for task in tasks:
+        toggle(client, task, True)
+    toggle(client, tasks[0], False)
+
+    assert rollups() == [(alex.pk, today, 2, 20)]
+    assert stats(client) == {"completed_this_week": 2, "pending_rewards": 2}
+
+    # The backfill recomputes exactly what was maintained incrementally.
+    call_command("backfill_completion_rollups", stdout=io.StringIO())
+    assert rollups() == [(alex.pk, today, 2, 20)]
+
+
+def test_every_way_of_storing_a_completed_task_counts(client, household):
+    now = timezone.now()
+    Task.objects.bulk_create([Task(household=household, title=f"B{i}", completed=True, completed_at=now)
+                              for i in range(3)])
+    Task.objects.create(household=household, title="Old", completed=True, completed_at=now - timedelta(days=30))
+    assert client.post("/api/tasks/", {"title": "Done", "completed": True}, format="json").status_code == 201
+    res = client.post("/api/tasks/bulk/", {"operations": [{"op": "create", "data": {"title": "X", "completed": True}}]},
+                      format="json")
+    assert res.status_code == 200
+
+    assert stats(client) == {"completed_this_week": 5, "pending_rewards": 6}
+
+
+def test_backfill_counts_completed_tasks_the_ledger_never_saw(client, household):
+    Task.objects.bulk_create([Task(household=household, title=f"T{i}", completed=True) for i in range(5)])
+    CompletionRollup.objects.all().delete()
+    old = Task.objects.create(household=household, title="Old")
+    Task.objects.filter(pk=old.pk).update(completed=True, completed_at=make_aware(datetime(2026, 3, 2, 23, 30)))
+
+    call_command("backfill_completion_rollups", "--household", str(household.pk), stdout=io.StringIO())
+
+    # Stored without completed_at, they count on the day they were created.
+    assert rollups() == [(None, date(2026, 3, 2), 1, 10), (None, timezone.localdate(), 5, 50)]
+    assert stats(client)["pending_rewards"] == 6
+    assert not PointsLedgerEntry.objects.exists()
+
+
+def test_deleting_and_reassigning_move_the_counts(client, household):
+    alex = Member.objects.create(household=household, name="Alex")
+    sam = Member.objects.create(household=household, name="Sam")
+    today = timezone.localdate()
+    tasks = [Task.objects.create(household=household, title=f"T{i}", assignee_member=alex) for i in range(3)]
+    for task in tasks:
+        toggle(client, task, True)
+
+    assert client.patch(f"/api/tasks/{tasks[0].pk}/", {"assignee_member": sam.pk}, format="json").status_code == 200
+    assert client.delete(f"/api/tasks/{tasks[1].pk}/").status_code == 204
+    assert rollups() == [(alex.pk, today, 1, 10), (sam.pk, today, 1, 10)]
+
+    assert client.delete(f"/api/member-items/{alex.pk}/").status_code == 204
+    assert rollups() == [(None, today, 1, 10), (sam.pk, today, 1, 10)]
+    assert stats(client) == {"completed_this_week": 2, "pending_rewards": 2}
+
+
+def test_trends_bucket_rollups_by_week_and_month(client, household, monkeypatch):
+    monkeypatch.setattr(timezone, "now", lambda: make_aware(datetime(2026, 3, 11, 12)))
+    alex = Member.objects.create(household=household, name="Alex")
+    for who, day, completed in [(alex, date(2026, 3, 9), 2), (None, date(2026, 3, 10), 1),
+                                (alex, date(2026, 3, 1), 1), (alex, date(2026, 1, 20), 4)]:
+        CompletionRollup.objects.create(household=household, member=who, day=day, completed=completed,
+                                        points=10 * completed)
+
+    weekly = client.get("/api/dashboard/trends/?count=3").json()
+    assert weekly["period"] == "week"
+    assert [(b["start"], b["completed"], b["points"]) for b in weekly["buckets"]] == [
+        ("2026-02-23", 1, 10), ("2026-03-02", 0, 0), ("2026-03-09", 3, 30)
+    ]
+    assert weekly["buckets"][-1]["members"] == [
+        {"member": None, "completed": 1, "points": 10}, {"member": alex.pk, "completed": 2, "points": 20}
+    ]
+
+    monthly = client.get("/api/dashboard/trends/?period=month&count=3").json()
+    assert [(b["start"], b["completed"]) for b in monthly["buckets"]] == [
+        ("2026-01-01", 4), ("2026-02-01", 0), ("2026-03-01", 4)
+    ]
+
+    assert client.get("/api/dashboard/trends/?period=year").status_code == 400
+    assert client.get("/api/dashboard/trends/?count=x").status_code == 400
+
+
+def test_trends_read_one_query(client, household, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        client.get("/api/dashboard/trends/?period=month&count=24")
@@ -0,0 +1,166 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from core import changes
+from core.models import Category, Household, Member, Pet, SyncChange, Task
+
+pytestmark = pytest.mark.django_db
+User = get_user_model()
+
+URL = "/api/sync/"
+
+
+@pytest.fixture
+def household():
+    return Household.objects.create(name="H")
+
+
+@pytest.fixture
+def user(household):
+    return User.objects.create_user(username="u", email="u@e.com", password="pass12345", household=household)
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def sync(client, cursor=None, **params):
+    if cursor:
+        params["since"] = cursor
+    res = client.get(URL, params)
+    assert res.status_code == 200, res.data
+    return res.data
+
+
+def test_first_sync_downloads_the_household(client, household):
+    category = Category.objects.create(household=household, name="Chores")
+    Member.objects.create(household=household, name="Ann")
+    Pet.objects.create(household=household, name="Rex")
+    Task.objects.create(household=household, title="Bins", category=category)
+
+    data = sync(client)
+
+    assert [c["name"] for c in data["categories"]] == ["Chores"]
+    assert [m["name"] for m in data["members"]] == ["Ann"]
+    assert [p["name"] for p in data["pets"]] == ["Rex"]
+    assert [t["title"] for t in data["tasks"]] == ["Bins"]
+    assert data["has_more"] is False and data["reset"] is False
+
+
+def test_only_changes_since_the_cursor_are_returned(client, household):
+    tasks = [Task.objects.create(household=household, title=f"T{i}") for i in range(5)]
+    cursor = sync(client)["cursor"]
+
+    tasks[1].title = "Renamed"
+    tasks[1].save()
+    deleted_id = tasks[2].pk
+    tasks[2].delete()
+    Pet.objects.create(household=household, name="Rex")
+
+    data = sync(client, cursor)
+    assert [t["title"] for t in data["tasks"]] == ["Renamed"]
+    assert data["deleted"]["tasks"] == [deleted_id]
+    assert [p["name"] for p in data["pets"]] == ["Rex"]
+
+    # Nothing new: same cursor, empty lists.
+    again = sync(client, data["cursor"])
+    assert again["cursor"] == data["cursor"]
+    assert again["tasks"] == [] and again["deleted"]["tasks"] == []
+
+
+def test_repeated_edits_are_sent_once(client, household):
+    task = Task.objects.create(household=household, title="A")
+    cursor = sync(client)["cursor"]
+    for title in ("B", "C", "D"):
+        task.title = title
+        task.save()
+
+    data = sync(client, cursor)
+    assert [t["title"] for t in data["tasks"]] == ["D"]
+    assert SyncChange.objects.filter(kind="task", object_id=task.pk).count() == 1
+
+
+def test_changes_are_paged_in_sequence_order(client, household):
+    for i in range(7):
+        Task.objects.create(household=household, title=f"T{i}")
+
+    seen, cursor = [], None
+    while True:
+        data = sync(client, cursor, limit=3)
+        seen += [t["title"] for t in data["tasks"]]
+        cursor = data["cursor"]
+        if not data["has_more"]:
+            break
+    assert seen == [f"T{i}" for i in range(7)]
+
+
+def test_bulk_operations_are_tracked(client, household):
+    tasks = [Task.objects.create(household=household, title=f"T{i}") for i in range(3)]
+    cursor = sync(client)["cursor"]
+
+    res = client.post("/api/tasks/bulk/", {"operations": [
+        {"op": "create", "data": {"title": "New"}},
+        {"op": "complete", "id": tasks[0].pk},
+        {"op": "delete", "id": tasks[1].pk},
+    ]}, format="json")
+    assert res.status_code == 200
+
+    data = sync(client, cursor)
+    assert sorted(t["title"] for t in data["tasks"]) == ["New", "T0"]
+    assert data["deleted"]["tasks"] == [tasks[1].pk]
+
+
+def test_deleting_an_assignee_resends_its_tasks(client, household):
+    pet = Pet.objects.create(household=household, name="Rex")
+    task = Task.objects.create(household=household, title="Walk", assignee_pet=pet)
+    cursor = sync(client)["cursor"]
+    pet_id = pet.pk
+
+    pet.delete()
+
+    data = sync(client, cursor)
+    assert data["deleted"]["pets"] == [pet_id]
+    assert [(t["id"], t["assignee_pet"]) for t in data["tasks"]] == [(task.pk, None)]
+
+
+def test_households_are_isolated(client, household):
+    other = Household.objects.create(name="Other")
+    Task.objects.create(household=other, title="Secret")
+    Task.objects.create(household=household, title="Mine")
+
+    assert [t["title"] for t in sync(client)["tasks"]] == ["Mine"]
+
+
+def test_member_moving_household_leaves_a_tombstone(client, household):
+    member = Member.objects.create(household=household, name="Ann")
+    cursor = sync(client)["cursor"]
+
+    member = Member.objects.get(pk=member.pk)
+    member.household = Household.objects.create(name="New home")
+    member.save()
+
+    assert sync(client, cursor)["deleted"]["members"] == [member.pk]
+
+
+def test_cursor_from_another_household_resets(client, user, household):
+    Task.objects.create(household=household, title="Mine")
+    other = Household.objects.create(name="Other")
+    stale = changes.format_cursor(other.pk, 5)
+
+    data = sync(client, stale)
+    assert data["reset"] is True
+    assert [t["title"] for t in data["tasks"]] == ["Mine"]
+
+
+def test_bad_cursor_is_rejected(client):
+    assert client.get(URL, {"since": "nope"}).status_code == 400
+
+
+def test_deleting_a_household_records_nothing(household):
+    Task.objects.create(household=household, title="T")
+    household.delete()
+    assert not SyncChange.objects.exists()
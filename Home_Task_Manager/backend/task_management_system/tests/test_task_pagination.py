@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Household, Task, Category
+
+pytestmark = pytest.mark.django_db
+User = get_user_model()
+
+
+@pytest.fixture
+def household():
+    return Household.objects.create(name="H")
+
+
+@pytest.fixture
+def client(household):
+    user = User.objects.create_user(username="u", email="u@e.com", password="pass12345", household=household)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def make_tasks(household, count, **kwargs):
+    tasks = Task.objects.bulk_create(
+        [Task(household=household, title=f"Task {i}", **kwargs) for i in range(count)]
+    )
+    # Force timestamp ties so the id tie-breaker is exercised.
+    base = timezone.now()
+    for i, task in enumerate(tasks):
+        Task.objects.filter(pk=task.pk).update(created_at=base - timedelta(minutes=i // 3))
+    return tasks
+
+
+def walk(client, url):
+    ids = []
+    while url:
+        res = client.get(url)
+        assert res.status_code == 200
+        body = res.json()
+        ids.extend(t["id"] for t in body["results"])
+        url = body["next"]
+    return ids
+
+
+def test_pages_cover_every_task_once_in_order(client, household):
+    make_tasks(household, 23)
+
+    ids = walk(client, "/api/tasks/?page_size=5")
+
+    expected = list(
+        Task.objects.filter(household=household).order_by("-created_at", "-id").values_list("id", flat=True)
+    )
+    assert ids == expected
+
+
+def test_pagination_respects_filters(client, household):
+    category = Category.objects.create(household=household, name="Kitchen")
+    make_tasks(household, 7, category=category)
+    make_tasks(household, 6, completed=True)
+
+    assert len(walk(client, f"/api/tasks/?page_size=2&category={category.id}")) == 7
+    assert len(walk(client, "/api/tasks/?page_size=4&completed=true")) == 6
+
+
+def test_later_pages_cost_the_same_as_the_first(client, household, django_assert_max_num_queries):
+    make_tasks(household, 30)
+
+    url = "/api/tasks/?page_size=5"
+    for _ in range(6):
+        with django_assert_max_num_queries(2):
+            res = client.get(url)
+        url = res.json()["next"]
+    assert url is None
+
+
+def test_invalid_cursor_is_404(client):
+    assert client.get("/api/tasks/?cursor=not-a-cursor").status_code == 404
+
+
+def test_unpaginated_opt_in_returns_plain_list(client, household):
+    make_tasks(household, 3)
+
+    res = client.get("/api/tasks/?paginate=false")
+
+    assert isinstance(res.json(), list)
+    assert len(res.json()) == 3
@@ -0,0 +1,118 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from rest_framework.test import APIClient
+
+from core.models import Household, Task, Category
+from core.search import get_search_backend, ensure_sqlite_triggers, IContainsSearch
+
+pytestmark = pytest.mark.django_db
+User = get_user_model()
+
+
+@pytest.fixture
+def household():
+    return Household.objects.create(name="H")
+
+
+@pytest.fixture
+def client(household):
+    user = User.objects.create_user(username="u", email="u@e.com", password="pass12345", household=household)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def search(client, query, **params):
+    res = client.get("/api/tasks/", {"search": query, "paginate": "false", **params})
+    assert res.status_code == 200
+    return [t["title"] for t in res.json()]
+
+
+def test_prefix_matching(client, household):
+    Task.objects.create(household=household, title="Wash the dishes")
+    Task.objects.create(household=household, title="Walk the dog")
+
+    assert search(client, "dis") == ["Wash the dishes"]
+    assert sorted(search(client, "wa")) == ["Walk the dog", "Wash the dishes"]
+    assert search(client, "wash dis") == ["Wash the dishes"]
+
+
+def test_title_matches_rank_above_description_matches(client, household):
+    Task.objects.create(household=household, title="Tidy up", description="vacuum the hallway")
+    Task.objects.create(household=household, title="Vacuum the lounge")
+
+    assert search(client, "vacuum") == ["Vacuum the lounge", "Tidy up"]
+
+
+def test_index_follows_updates_and_deletes(client, household):
+    task = Task.objects.create(household=household, title="Mow lawn")
+    assert search(client, "mow") == ["Mow lawn"]
+
+    task.title = "Rake leaves"
+    task.save()
+    assert search(client, "mow") == []
+    assert search(client, "rake") == ["Rake leaves"]
+
+    Task.objects.filter(pk=task.pk).update(description="and the patio")
+    assert search(client, "patio") == ["Rake leaves"]
+
+    task.delete()
+    assert search(client, "rake") == []
+
+
+def test_search_is_household_scoped_and_composes_with_filters(client, household):
+    kitchen = Category.objects.create(household=household, name="Kitchen")
+    Task.objects.create(household=household, title="Clean oven", category=kitchen)
+    Task.objects.create(household=household, title="Clean car")
+    Task.objects.create(household=Household.objects.create(name="Other"), title="Clean windows")
+
+    assert sorted(search(client, "clean")) == ["Clean car", "Clean oven"]
+    assert search(client, "clean", category=kitchen.id) == ["Clean oven"]
+
+
+def test_search_works_with_cursor_pagination(client, household):
+    for i in range(5):
+        Task.objects.create(household=household, title=f"Laundry {i}")
+
+    res = client.get("/api/tasks/", {"search": "laund", "page_size": 3})
+    body = res.json()
+    assert len(body["results"]) == 3
+    assert len(client.get(body["next"]).json()["results"]) == 2
+
+
+def test_paginated_search_is_newest_first_not_ranked(client, household):
+    Task.objects.create(household=household, title="Vacuum the lounge")
+    Task.objects.create(household=household, title="Tidy up", description="vacuum the hallway")
+
+    res = client.get("/api/tasks/", {"search": "vacuum", "page_size": 1})
+    first = res.json()
+    second = client.get(first["next"]).json()
+    assert [t["title"] for t in first["results"] + second["results"]] == ["Tidy up", "Vacuum the lounge"]
+    assert search(client, "vacuum") == ["Vacuum the lounge", "Tidy up"]
+
+
+def test_punctuation_only_query_falls_back_to_icontains(client, household):
+    Task.objects.create(household=household, title="Buy milk (2L)")
+
+    assert search(client, "(") == ["Buy milk (2L)"]
+
+
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="FTS5 query plan is SQLite specific")
+def test_sqlite_search_uses_fts_index(household):
+    backend = get_search_backend()
+    assert not isinstance(backend, IContainsSearch)
+
+    plan = backend.search(Task.objects.filter(household=household), "dish").explain()
+    assert "VIRTUAL TABLE INDEX" in plan, plan
+
+
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="FTS5 triggers are SQLite specific")
+def test_missing_sqlite_triggers_are_restored_and_index_rebuilt(client, household):
+    with connection.cursor() as cursor:
+        cursor.execute("DROP TRIGGER core_task_fts_insert")
+    Task.objects.create(household=household, title="Water plants")
+
+    ensure_sqlite_triggers(connection)
+
+    assert search(client, "water") == ["Water plants"]
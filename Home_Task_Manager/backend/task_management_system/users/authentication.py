@@ -0,0 +1,199 @@
+"""
+Stateless JWT authentication.
+
+Tokens carry household_id, role, auth_provider and token_version claims
+(see ClaimsRefreshToken), so authenticating a request costs no query:
+ClaimsJWTAuthentication returns a ClaimsUser backed by the token. Reading
+anything the token doesn't carry (email, points_balance, get_full_name(),
+...) loads the full User once; views that write to the user take
+full_user(request.user).
+
+Changing a user's role or household must call bump_token_version(): tokens
+minted before that stop authenticating, and the client refreshes to get
+tokens with the new claims. The current version is cached for
+TOKEN_VERSION_CACHE_TIMEOUT, and each process also keeps what it read for
+TOKEN_VERSION_LOCAL_TIMEOUT, so that with the database cache an
+authenticated request doesn't cost a cache-table query either. Another
+process may therefore accept an outdated token for up to
+TOKEN_VERSION_LOCAL_TIMEOUT (TOKEN_VERSION_CACHE_TIMEOUT with a
+per-process cache backend).
+"""
+import threading
+
+from cachetools import TTLCache
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.models import Household
+
+User = get_user_model()
+
+CLAIMS = ("household_id", "role", "auth_provider", "token_version")
+
+TOKEN_VERSION_CACHE_TIMEOUT = 60
+TOKEN_VERSION_LOCAL_TIMEOUT = 5
+
+# token version key -> version, in this process only
+local_token_versions = TTLCache(maxsize=10000, ttl=TOKEN_VERSION_LOCAL_TIMEOUT)
+_local_lock = threading.Lock()
+
+
+def _token_version_key(user_id):
+    return f"user:{user_id}:token_version"
+
+
+def current_token_version(user_id):
+    key = _token_version_key(user_id)
+    with _local_lock:
+        version = local_token_versions.get(key)
+    if version is not None:
+        return version
+
+    version = cache.get(key)
+    if version is None:
+        version = (
+            User.objects.filter(pk=user_id, is_active=True)
+            .values_list("token_version", flat=True)
+            .first()
+        )
+        if version is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        cache.set(key, version, timeout=TOKEN_VERSION_CACHE_TIMEOUT)
+    with _local_lock:
+        local_token_versions[key] = version
+    return version
+
+
+def bump_token_version(user_id):
+    """Invalidate every token issued to the user so far."""
+    User.objects.filter(pk=user_id).update(token_version=F("token_version") + 1)
+    key = _token_version_key(user_id)
+
+    def forget():
+        cache.delete(key)
+        with _local_lock:
+            local_token_versions.pop(key, None)
+
+    forget()
+    # A request racing this transaction may have cached the old version.
+    transaction.on_commit(forget)
+
+
+def add_claims(token, user):
+    for claim in CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token whose access tokens inherit the user's claims."""
+
+    @classmethod
+    def for_user(cls, user):
+        return add_claims(super().for_user(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Mints the new access token with the user's current claims rather than
+    the ones copied from login, so a refresh picks up role / household
+    changes (and a bumped token_version).
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user = User.objects.filter(pk=refresh[api_settings.USER_ID_CLAIM], is_active=True).first()
+        if user is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        return {"access": str(add_claims(refresh.access_token, user))}
+
+
+class ClaimsUser(TokenUser):
+    """request.user for claims-bearing tokens."""
+
+    def __str__(self):
+        return f"ClaimsUser {self.id}"
+
+    @cached_property
+    def household_id(self):
+        return self.token["household_id"]
+
+    @cached_property
+    def role(self):
+        return self.token["role"]
+
+    @cached_property
+    def auth_provider(self):
+        return self.token["auth_provider"]
+
+    @cached_property
+    def user(self):
+        return User.objects.get(pk=self.id)
+
+    @cached_property
+    def household(self):
+        if self.household_id is None:
+            return None
+        return Household.objects.filter(pk=self.household_id).first()
+
+    @property
+    def username(self):
+        return self.user.username
+
+    def check_password(self, raw_password):
+        return self.user.check_password(raw_password)
+
+    def __getattr__(self, attr):
+        if attr.startswith("_") or attr in ("token", "user"):
+            raise AttributeError(attr)
+        return getattr(self.user, attr)
+
+
+def full_user(user):
+    """The User model instance behind request.user."""
+    return user.user if isinstance(user, ClaimsUser) else user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if "token_version" not in validated_token:
+            # Issued before claims were added: fall back to loading the user.
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken("Token contained no recognizable user identification") from e
+
+        if validated_token["token_version"] != current_token_version(user_id):
+            raise AuthenticationFailed("Token is out of date", code="token_outdated")
+        return ClaimsUser(validated_token)
+
+
+def authenticate_request(request, allow_query_token=False):
+    """
+    Authenticate a plain Django request (for views outside DRF, such as the
+    async views). Returns (user, validated token), or None if no token was
+    sent; raises InvalidToken / AuthenticationFailed for a bad one.
+    """
+    auth = ClaimsJWTAuthentication()
+    header = auth.get_header(request)
+    if header:
+        raw_token = auth.get_raw_token(header)
+    elif allow_query_token:
+        raw_token = request.GET.get("access_token", "").encode()
+    else:
+        raw_token = None
+    if not raw_token:
+        return None
+    token = auth.get_validated_token(raw_token)
+    return auth.get_user(token), token
@@ -35,3 +35,7 @@ class User(AbstractUser):
     )
 
     points_balance = models.IntegerField(default=0)
+
+    # Carried in JWTs; bumping it invalidates the user's existing tokens
+    # (see users.authentication).
+    token_version = models.PositiveIntegerField(default=0)
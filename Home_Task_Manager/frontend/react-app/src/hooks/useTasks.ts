@@ -42,6 +42,8 @@ type TaskFilters = {
 
 function buildQuery(filters: TaskFilters = {}): string {
   const params = new URLSearchParams();
+  // The tasks page renders the whole filtered list, so opt out of cursor pagination.
+  params.set("paginate", "false");
   if (filters.search) params.set("search", filters.search);
   if (filters.category != null) params.set("category", String(filters.category));
   if (filters.assignee_member != null)
@@ -52,8 +54,7 @@ function buildQuery(filters: TaskFilters = {}): string {
     params.set("completed", filters.completed ? "true" : "false");
   if (filters.priority) params.set("priority", filters.priority);
 
-  const qs = params.toString();
-  return qs ? `?${qs}` : "";
+  return `?${params.toString()}`;
 }
 
 // READ
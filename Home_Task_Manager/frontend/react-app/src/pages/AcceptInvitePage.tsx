@@ -56,6 +56,10 @@ export default function AcceptInvitePage() {
         return;
       }
 
+      // Tokens carry the household and role, so swap in the new ones.
+      if (data.access) localStorage.setItem("access", data.access);
+      if (data.refresh) localStorage.setItem("refresh", data.refresh);
+
       setStatus("success");
       setMessage("Invite accepted! Redirecting to dashboard…");
 